@@ -0,0 +1,116 @@
+"""Microbenchmark: decoding 1,000 raw search results into JiraEpic vs EpicRecord.
+
+Compares the current mapping (jira.resources.Issue -> JiraEpic, then reading all EPIC_FIELDS) with the raw JSON path
+(EpicRecord.from_raw) on synthetic epics shaped like the projected search response.
+
+Run with: python -m benchmarks.record_decoding
+"""
+
+import gc
+import statistics
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+import jira.resources as jira_resources
+
+from jira_bot.lib.core.jira_connections import JiraEpic
+from jira_bot.lib.core.jira_records import EpicRecord
+from jira_bot.lib.tools.constants import CUSTOM_FIELD_MAPPING, EPIC_DESC_COLUMNS, EPIC_FIELDS
+
+N_ISSUES = 1000
+REPEATS = 5
+
+
+def make_raw_epic(index: int) -> Dict[str, Any]:
+    """Build a raw epic payload similar to a projected search result."""
+    header = "||" + "||".join(EPIC_DESC_COLUMNS) + "||"
+    values = {column: f"value-{index}-{column}" for column in EPIC_DESC_COLUMNS}
+    values.update(uuid=f"00000000-0000-0000-0000-{index:012d}", last_updated="2024-01-30 09:15:00")
+    row = "|" + "|".join(values[column] for column in EPIC_DESC_COLUMNS) + "|"
+    fields: Dict[str, Any] = {
+        "summary": f"Protocol {index}",
+        "description": f"Some text\n{header}\n{row}\n",
+        "created": "2024-01-31T10:00:00.000+0000",
+        "updated": "2024-02-01T11:30:00.000+0000",
+        "labels": ["2024", "DEU", "WW"],
+        "status": {"id": "11921", "name": "In Execution", "statusCategory": {"name": "In Progress"}},
+        "comment": {"total": 3, "comments": []},
+        "duedate": "2024-12-31",
+        "lastViewed": None,
+        "watches": {"watchCount": 2, "isWatching": False},
+        "creator": {"emailAddress": "creator@example.com"},
+        "assignee": {"emailAddress": "assignee@example.com"},
+        "components": [{"self": "https://jira/rest/api/2/component/1", "id": "1", "name": "Trials"}],
+        "issuetype": {"name": "Epic"},
+    }
+    for name, field_id in CUSTOM_FIELD_MAPPING.items():
+        if field_id.isdigit():
+            fields[f"customfield_{field_id}"] = {"value": f"{name}-{index}", "emailAddress": "user@example.com"}
+    fields[f"customfield_{CUSTOM_FIELD_MAPPING['Protocol ID']}"] = f"2024-DEU-WW-{index:05d}-01"
+    return {"id": str(10000 + index), "key": f"TM-{index}", "self": f"https://jira/issue/{index}", "fields": fields}
+
+
+def build_epics(raw_issues: List[Dict[str, Any]]) -> List[JiraEpic]:
+    options = {"server": "https://jira"}
+    return [JiraEpic(issue=jira_resources.Issue(options=options, session=None, raw=raw)) for raw in raw_issues]
+
+
+def build_records(raw_issues: List[Dict[str, Any]]) -> List[EpicRecord]:
+    return [EpicRecord.from_raw(raw) for raw in raw_issues]
+
+
+def decode_with_resources(raw_issues: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    epics = build_epics(raw_issues)
+    return [{field: getattr(epic, field) for field in EPIC_FIELDS} for epic in epics]
+
+
+def decode_with_records(raw_issues: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    records = build_records(raw_issues)
+    return [{field: getattr(record, field) for field in EPIC_FIELDS} for record in records]
+
+
+def readable(value: Any) -> Any:
+    return [str(item) for item in value] if isinstance(value, list) else value
+
+
+def measure_time(decode: Callable, raw_issues: List[Dict[str, Any]]) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        gc.collect()
+        start = time.perf_counter()
+        decode(raw_issues)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def measure_memory(build: Callable, raw_issues: List[Dict[str, Any]]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    objects = build(raw_issues)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return current
+
+
+def main() -> None:
+    raw_issues = [make_raw_epic(index) for index in range(N_ISSUES)]
+    expected, decoded = decode_with_resources(raw_issues[:1])[0], decode_with_records(raw_issues[:1])[0]
+    # components are jira resources on JiraEpic and ComponentRecords on EpicRecord, compared by name
+    mismatches = [field for field in EPIC_FIELDS if readable(expected[field]) != readable(decoded[field])]
+    assert not mismatches, f"Record values differ from JiraEpic for {mismatches}"
+
+    resource_time = measure_time(decode_with_resources, raw_issues)
+    record_time = measure_time(decode_with_records, raw_issues)
+    resource_memory = measure_memory(build_epics, raw_issues)
+    record_memory = measure_memory(build_records, raw_issues)
+
+    print(f"per {N_ISSUES} epics      time (ms)   retained memory (KiB)")
+    print(f"JiraEpic (resources) {resource_time * 1000:9.1f}   {resource_memory / 1024:12.1f}")
+    print(f"EpicRecord (raw)     {record_time * 1000:9.1f}   {record_memory / 1024:12.1f}")
+    print(f"speed-up             {resource_time / record_time:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import os
-from typing import Optional
+from typing import List, Optional
 from prefect import flow, get_run_logger
+from prefect.utilities.annotations import quote
 from jira_bot import tasks
 from enum import Enum
 
@@ -12,16 +13,38 @@ class JiraIssueType(str, Enum):
 
 
 @flow(name="x-trias-jira-bot-flow", validate_parameters=False)
-def flow(jira_issue_key: Optional[str] = None, jira_issue_type: JiraIssueType = JiraIssueType.EPIC):
-    """Jira-bot flow"""
+def flow(
+    jira_issue_key: Optional[str] = None,
+    jira_issue_type: JiraIssueType = JiraIssueType.EPIC,
+    use_issue_store: bool = False,
+    incremental: bool = False,
+    epic_keys: Optional[List[str]] = None,
+    issue_keys: Optional[List[str]] = None,
+    protocol_uuids: Optional[List[str]] = None,
+    trial_uuids: Optional[List[str]] = None,
+    max_concurrency: int = 1,
+):
+    """Jira-bot flow
+
+    Given epic keys, issue keys, protocol UUIDs or trial UUIDs (or an Epic or Trial jira_issue_key), only those
+    tickets are reconciled, e.g. right after an upstream ETL flow wrote their sources. use_issue_store serves the
+    full runs' searches from the persistent issue store (tables created by the migrations in migrations/).
+    incremental full runs only reconcile the tickets whose sources or Jira tickets changed since the last run, their
+    watermarks are kept in the table of migrations/005_reconcile_state.sql.
+    max_concurrency > 1 reconciles that many epics (and then issues) at a time and loads the epics of a full run
+    with the async Jira client.
+    """
     from jira_bot.tasks import enable_loguru_support, get_aws_credentials, get_current_region
-    from jira_bot.lib.query.database import get_engine
+    from jira_bot.lib.query import database
+    from jira_bot.lib.query.database import QueryCache, get_engine
+    from jira_bot.lib.query.run_targets import RunTargets
     from jira_bot.lib.tools.constants import (
         XTRIAS_DB_PARAMS,
         JIRA_SERVER_URL,
         JIRA_TOKEN,
         PROJECT_ID,
         ACTIVE_PROTOCOL_FILTER_ID,
+        SEARCH_MAX_WORKERS,
     )
 
     logger = get_run_logger()
@@ -29,37 +52,153 @@ def flow(jira_issue_key: Optional[str] = None, jira_issue_type: JiraIssueType =
     aws_region = get_current_region()
     session = get_aws_credentials(aws_region, os.environ["RUN_ENV"])
     engine = get_engine(os.environ["TRIAS_DB"], session, XTRIAS_DB_PARAMS)
-    trias_jira = tasks.initialize_trias_jira(JIRA_SERVER_URL, JIRA_TOKEN, PROJECT_ID)
-    trias_epics = tasks.initialize_trias_epics(trias_jira)
-    trias_filter = tasks.get_trias_protocol_filter(trias_jira, ACTIVE_PROTOCOL_FILTER_ID)
-    logger.info("Trias filter: %s", trias_filter.raw["jql"])
-    trias_issues = tasks.initialize_trias_issues(trias_jira)
-    trias_subtasks = tasks.initialize_trias_subtasks(trias_jira)
-    epics = trias_epics.get_epics(trias_filter.raw["jql"])
-    logger.info("Found number of epics: %s", len(epics))
-    if jira_issue_type == JiraIssueType.EPIC:
-        # Manage epics
-        for epic in epics:
-            if jira_issue_key and epic.epic_key != jira_issue_key:
-                continue
-
-            logger.info(f"Processing epic {epic.epic_key}")
-            tasks.rename_flow_run(f"{epic.epic_key}-{epic.epic_name}")
-            tasks.manage_epic(trias_jira, trias_epics, trias_issues, trias_subtasks, engine, epic)
-            issues = trias_issues.get_issues_for_epic(epic.epic_key)
-            for issue in issues:
-                tasks.manage_subtasks_for_issue(
-                    trias_jira, trias_epics, trias_issues, trias_subtasks, engine, issue.issue_key
-                )
-
-            if jira_issue_key:
-                break
+    # a new query cache per run, the source rows it caches are only refreshed by its TTLs
+    database.set_query_cache(QueryCache())
+    targets = RunTargets(epic_keys or [], issue_keys or [], protocol_uuids or [], trial_uuids or [])
+    if jira_issue_key and jira_issue_type == JiraIssueType.EPIC:
+        targets.epic_keys.append(jira_issue_key)
+    elif jira_issue_key and jira_issue_type == JiraIssueType.TRIAL:
+        targets.issue_keys.append(jira_issue_key)
+    # with the issue store only tickets updated since the last run are downloaded from Jira. Targeted runs search
+    # different keys every time, each search would be a new scope downloaded in full
+    full_run = not targets and jira_issue_type == JiraIssueType.EPIC
+    store_engine = engine if use_issue_store and full_run else None
+    # the Jira clients are passed to tasks with quote(): prefect would otherwise hand each task a copy rebuilt from
+    # the dataclass fields, with a new Jira connection and without the run-wide governor and caches
+    trias_jira = tasks.initialize_trias_jira(JIRA_SERVER_URL, JIRA_TOKEN, PROJECT_ID, store_engine)
+    trias_epics = tasks.initialize_trias_epics(quote(trias_jira))
+    trias_issues = tasks.initialize_trias_issues(quote(trias_jira))
+    trias_subtasks = tasks.initialize_trias_subtasks(quote(trias_jira))
+    if jira_issue_type == JiraIssueType.SUBTASK:
+        tasks.manage_subtasks_for_issue(
+            quote(trias_jira), quote(trias_epics), quote(trias_issues), quote(trias_subtasks), engine, jira_issue_key
+        )
+    elif targets or jira_issue_type == JiraIssueType.EPIC:
+        if targets:
+            # targeted runs look the tickets up by key instead of searching all epics of the filter
+            targets = tasks.resolve_run_targets(engine, targets)
+            epics = trias_epics.get_epics_by_keys(targets.epic_keys)
+            issues = trias_issues.get_issues_by_keys(targets.issue_keys)
+            plan = None
+        else:
+            trias_filter = tasks.get_trias_protocol_filter(quote(trias_jira), ACTIVE_PROTOCOL_FILTER_ID)
+            logger.info("Trias filter: %s", trias_filter.raw["jql"])
+            if max_concurrency > 1 and store_engine is None:
+                epics = tasks.search_epics_async(quote(trias_jira), quote(trias_epics), trias_filter.raw["jql"])
+            else:
+                epics = trias_epics.get_epics(trias_filter.raw["jql"], max_workers=SEARCH_MAX_WORKERS)
+            issues = []
+            # incremental runs only reconcile tickets whose sources or Jira tickets changed since the last run
+            plan = tasks.plan_reconciliation(engine) if incremental else None
+        logger.info("Found number of epics: %s", len(epics))
+        # quote() passes the epics by reference, so the values they parse and cache are shared by all tasks
+        tasks.resolve_jira_users(quote(trias_jira), quote(epics))
+        # Load all issues and subtasks of the epics up front instead of searching per epic/issue
+        hierarchy = tasks.prefetch_jira_hierarchy(quote(trias_jira), quote(epics))
+        # Load the source table rows of all epics with one query per table instead of several per epic/trial
+        source_index = tasks.preload_source_tables(
+            engine, quote([epic for epic in epics if plan is None or plan.includes_epic(epic)])
+        )
+        # Stored content fingerprints turn most change checks into a dictionary lookup, the rest is compared in bulk
+        fingerprints = tasks.preload_fingerprints(engine, quote(hierarchy))
+        # tickets that were not fully reconciled, the run then keeps the reconcile watermark so they are retried
+        failed = []
+        if max_concurrency > 1:
+            # the epics first, so the subtasks of the issues they create are reconciled in the second pass
+            failed += tasks.manage_epics_concurrently(
+                quote(trias_jira),
+                quote(trias_epics),
+                quote(trias_issues),
+                quote(trias_subtasks),
+                engine,
+                quote([epic for epic in epics if plan is None or plan.includes_epic(epic)]),
+                quote(hierarchy),
+                quote(source_index),
+                quote(fingerprints),
+                max_concurrency,
+            )
+            issue_keys = [
+                issue.issue_key
+                for epic in epics
+                for issue in hierarchy.issues_for_epic(epic.epic_key)
+                if plan is None or plan.includes_issue(issue, hierarchy.subtasks_for_issue(issue.issue_key))
+            ]
+            failed += tasks.manage_subtasks_concurrently(
+                quote(trias_jira),
+                quote(trias_epics),
+                quote(trias_issues),
+                quote(trias_subtasks),
+                engine,
+                issue_keys,
+                quote(hierarchy),
+                quote(source_index),
+                quote(fingerprints),
+                max_concurrency,
+            )
+        else:
+            # Manage epics
+            for epic in epics:
+                if plan is None or plan.includes_epic(epic):
+                    logger.info(f"Processing epic {epic.epic_key}")
+                    tasks.rename_flow_run(f"{epic.epic_key}-{epic.epic_name}")
+                    # quote() passes the shared index by reference so new tickets registered by a task stay visible
+                    if not tasks.manage_epic(
+                        quote(trias_jira),
+                        quote(trias_epics),
+                        quote(trias_issues),
+                        quote(trias_subtasks),
+                        engine,
+                        quote(epic),
+                        quote(hierarchy),
+                        quote(source_index),
+                        quote(fingerprints),
+                    ):
+                        failed.append(epic.epic_key)
+                for issue in list(hierarchy.issues_for_epic(epic.epic_key)):
+                    if plan is not None and not plan.includes_issue(
+                        issue, hierarchy.subtasks_for_issue(issue.issue_key)
+                    ):
+                        continue
+                    if not tasks.manage_subtasks_for_issue(
+                        quote(trias_jira),
+                        quote(trias_epics),
+                        quote(trias_issues),
+                        quote(trias_subtasks),
+                        engine,
+                        issue.issue_key,
+                        quote(hierarchy),
+                        quote(source_index),
+                        quote(fingerprints),
+                    ):
+                        failed.append(issue.issue_key)
+        # issues of a targeted epic were reconciled with it
+        for issue in issues:
+            if issue.epic_link not in hierarchy.epics:
+                if not tasks.manage_issue(
+                    quote(trias_jira),
+                    quote(trias_epics),
+                    quote(trias_issues),
+                    quote(trias_subtasks),
+                    engine,
+                    issue.issue_key,
+                ):
+                    failed.append(issue.issue_key)
+        if failed:
+            logger.warning("Not all tickets were reconciled, see the errors of: %s", ", ".join(failed))
+        if plan is not None and failed:
+            logger.warning("The reconcile watermark is kept, the next run reconciles the same changes again.")
+        elif plan is not None:
+            tasks.commit_reconciliation(engine, plan)
     elif jira_issue_type == JiraIssueType.TRIAL:
-        pass
-    elif jira_issue_type == JiraIssueType.SUBTASK:
-        tasks.manage_subtasks_for_issue(trias_jira, trias_epics, trias_issues, trias_subtasks, engine, jira_issue_key)
+        logger.error("A Trial run needs a jira_issue_key, issue_keys or trial_uuids.")
     else:
         logger.error(f"Invalid Jira issue type: {jira_issue_type}")
+    logger.info(f"Jira request governor: {trias_jira.governor.metrics()}")
+    logger.info(f"Jira user directory: {trias_jira.user_directory.stats()}")
+    logger.info(f"Jira identity map: {trias_jira.identity_map.stats()}")
+    logger.info(f"Database query cache: {database.query_cache.stats()}")
+    database.set_query_cache(None)
+    trias_jira.user_directory.save()
 
 if __name__ == "__main__":
     env = os.environ.get("ENV", "dev")
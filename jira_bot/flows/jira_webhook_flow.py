@@ -0,0 +1,40 @@
+import os
+from prefect import flow, get_run_logger
+from prefect.utilities.annotations import quote
+from jira_bot import tasks
+from jira_bot.lib.tools.constants import WEBHOOK_PORT
+
+
+@flow(name="x-trias-jira-bot-webhook-flow", validate_parameters=False)
+def webhook_flow(port: int = WEBHOOK_PORT):
+    """Jira-bot event mode: receive Jira webhooks and reconcile only the tickets that changed."""
+    from jira_bot.tasks import enable_loguru_support, get_aws_credentials, get_current_region
+    from jira_bot.lib.core.event_handler import EventHandler, ProtocolManagerDispatcher, WebhookReceiver
+    from jira_bot.lib.core.protocol_manager import ProtocolManager
+    from jira_bot.lib.query.database import get_engine
+    from jira_bot.lib.tools.constants import XTRIAS_DB_PARAMS, JIRA_SERVER_URL, JIRA_TOKEN, PROJECT_ID
+
+    logger = get_run_logger()
+    enable_loguru_support()
+    aws_region = get_current_region()
+    session = get_aws_credentials(aws_region, os.environ["RUN_ENV"])
+    engine = get_engine(os.environ["TRIAS_DB"], session, XTRIAS_DB_PARAMS)
+    # quote() hands the tasks this client rather than a rebuilt copy (see jira_bot_flow)
+    trias_jira = tasks.initialize_trias_jira(JIRA_SERVER_URL, JIRA_TOKEN, PROJECT_ID)
+    trias_epics = tasks.initialize_trias_epics(quote(trias_jira))
+    trias_issues = tasks.initialize_trias_issues(quote(trias_jira))
+    trias_subtasks = tasks.initialize_trias_subtasks(quote(trias_jira))
+
+    protocol_manager = ProtocolManager(trias_jira, trias_epics, trias_issues, trias_subtasks, engine)
+    event_handler = EventHandler(dispatch=ProtocolManagerDispatcher(protocol_manager))
+    logger.info("Starting Jira webhook receiver on port %s", port)
+    WebhookReceiver(event_handler, port=port, secret=os.environ.get("JIRA_WEBHOOK_SECRET")).serve_forever()
+
+
+if __name__ == "__main__":
+    os.environ["AWS_REGION"] = "eu-central-1"
+    os.environ["RUN_ENV"] = "local"
+    os.environ["AWS_DEFAULT_REGION"] = os.environ["AWS_REGION"]
+    os.environ["TRIAS_DB"] = "rds!db-3d5b6fc7-6a0f-4109-84d5-a9c2a2068110"
+
+    webhook_flow()
@@ -0,0 +1,184 @@
+"""Asyncio Jira client for overlapping the API round trips of a run."""
+
+import asyncio
+from dataclasses import dataclass, field
+from io import BytesIO
+from typing import Any, Dict, List, Optional
+
+import httpx
+import jira.resources as jira_resources
+from loguru import logger
+
+from jira_bot.lib.core.rate_limiter import RequestGovernor
+from jira_bot.lib.tools.constants import (
+    ASYNC_MAX_CONNECTIONS,
+    ASYNC_REQUEST_TIMEOUT,
+    SEARCH_PAGE_SIZE,
+    THROTTLED_STATUS_CODES,
+)
+
+API_PATH = "/rest/api/2"
+AGILE_API_PATH = "/rest/agile/1.0"
+
+
+@dataclass
+class AsyncTriasJira:
+    """Async counterpart of TriasJira built on a pooled keep-alive httpx client.
+
+    Covers the endpoints used by the bot (search, issue, update, transitions, attachments, issue creation and epic
+    links). Issues are returned as jira.resources.Issue objects so they map to JiraEpic/JiraIssue/JiraSubTask like
+    the results of the synchronous client. Pass a custom transport to run against a stub server in tests, and the
+    governor of the synchronous client to share one rate limit between both.
+    """
+
+    server_url: str
+    token: str
+    project_id: int
+    max_connections: int = ASYNC_MAX_CONNECTIONS
+    http2: bool = False
+    verify: bool = False
+    timeout: float = ASYNC_REQUEST_TIMEOUT
+    transport: Optional[httpx.AsyncBaseTransport] = None
+    governor: RequestGovernor = field(default_factory=RequestGovernor)
+    _client: Optional[httpx.AsyncClient] = field(default=None, init=False, repr=False)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Lazily create the shared client so it is bound to the running event loop."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.server_url,
+                headers={"Authorization": f"Bearer {self.token}", "Accept": "application/json"},
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                http2=self.http2,
+                verify=self.verify,
+                timeout=self.timeout,
+                transport=self.transport,
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self) -> "AsyncTriasJira":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    async def _request(self, method: str, path: str, **kwargs: Any) -> Any:
+        """Send a request and return the decoded JSON body (None for empty responses).
+
+        Throttled requests are retried, except uploads: their file objects are consumed by the first attempt.
+        """
+        max_attempts = 1 if "files" in kwargs else self.governor.max_retries + 1
+        for attempt in range(max_attempts):
+            await asyncio.to_thread(self.governor.acquire)
+            try:
+                response = await self.client.request(method, path, **kwargs)
+            except Exception:
+                self.governor.release(None, {})
+                raise
+            retry_after = self.governor.release(response.status_code, response.headers)
+            if response.status_code not in THROTTLED_STATUS_CODES or attempt == max_attempts - 1:
+                break
+            await response.aclose()
+            delay = self.governor.backoff(attempt, retry_after)
+            logger.warning(f"Jira throttled {method} {path} ({response.status_code}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+        response.raise_for_status()
+        return response.json() if response.content else None
+
+    def to_issue(self, raw: Dict[str, Any]) -> jira_resources.Issue:
+        """Wrap a raw issue payload in a jira Issue resource."""
+        return jira_resources.Issue(options={"server": self.server_url}, session=None, raw=raw)
+
+    async def search_issues(
+        self,
+        jql_query: str,
+        start_at: int = 0,
+        max_results: int = SEARCH_PAGE_SIZE,
+        fields: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """Run a single page of a JQL search and return the raw response."""
+        payload = {
+            "jql": jql_query,
+            "startAt": start_at,
+            "maxResults": max_results,
+            "fields": fields if fields else ["*all"],
+        }
+        return await self._request("POST", f"{API_PATH}/search", json=payload)
+
+    async def search_all(
+        self,
+        jql_query: str,
+        fields: Optional[List[str]] = None,
+        page_size: int = SEARCH_PAGE_SIZE,
+    ) -> List[jira_resources.Issue]:
+        """Run a JQL search, requesting all pages after the first one concurrently."""
+        first_page = await self.search_issues(jql_query, 0, page_size, fields)
+        raw_issues = list(first_page["issues"])
+        step = len(raw_issues)
+        if step and step < first_page["total"]:
+            pages = await asyncio.gather(
+                *[
+                    self.search_issues(jql_query, start_at, page_size, fields)
+                    for start_at in range(step, first_page["total"], step)
+                ]
+            )
+            seen_keys = {raw["key"] for raw in raw_issues}
+            for page in pages:
+                for raw in page["issues"]:
+                    if raw["key"] not in seen_keys:
+                        seen_keys.add(raw["key"])
+                        raw_issues.append(raw)
+        return [self.to_issue(raw) for raw in raw_issues]
+
+    async def issue(self, issue_key: str, fields: Optional[List[str]] = None) -> jira_resources.Issue:
+        """Get a single issue by its key."""
+        params = {"fields": ",".join(fields)} if fields else None
+        return self.to_issue(await self._request("GET", f"{API_PATH}/issue/{issue_key}", params=params))
+
+    async def update_issue(self, issue_key: str, fields: Dict[str, Any]) -> None:
+        """Update fields of an issue without re-fetching it."""
+        await self._request("PUT", f"{API_PATH}/issue/{issue_key}", json={"fields": fields})
+
+    async def transitions(self, issue_key: str) -> List[Dict[str, Any]]:
+        """Get the transitions currently available for an issue."""
+        response = await self._request("GET", f"{API_PATH}/issue/{issue_key}/transitions")
+        return response["transitions"]
+
+    async def transition_issue(self, issue_key: str, transition_id: str) -> None:
+        """Apply a workflow transition to an issue."""
+        await self._request(
+            "POST", f"{API_PATH}/issue/{issue_key}/transitions", json={"transition": {"id": str(transition_id)}}
+        )
+
+    async def create_issue(self, fields: Dict[str, Any]) -> str:
+        """Create an issue and return its key."""
+        response = await self._request("POST", f"{API_PATH}/issue", json={"fields": fields})
+        logger.info(f"Ticket created: {response['key']}")
+        return response["key"]
+
+    async def add_attachment(self, issue_key: str, attachment: BytesIO, filename: str) -> None:
+        """Attach a file to an issue."""
+        await self._request(
+            "POST",
+            f"{API_PATH}/issue/{issue_key}/attachments",
+            headers={"X-Atlassian-Token": "no-check"},
+            files={"file": (filename, attachment)},
+        )
+
+    async def add_issues_to_epic(self, epic_key: str, issue_keys: List[str]) -> None:
+        """Link issues to an epic."""
+        await self._request("POST", f"{AGILE_API_PATH}/epic/{epic_key}/issue", json={"issues": issue_keys})
+
+    async def search_users(self, user: str) -> List[Dict[str, Any]]:
+        """Search users by name or email."""
+        return await self._request("GET", f"{API_PATH}/user/search", params={"username": user})
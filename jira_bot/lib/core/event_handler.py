@@ -0,0 +1,219 @@
+"""Webhook-driven event mode: reconcile only the Jira tickets that changed."""
+
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from loguru import logger
+
+from jira_bot.lib.tools.constants import (
+    CUSTOM_FIELD_MAPPING,
+    EPIC_ISSUE_TYPE,
+    HANDLED_WEBHOOK_EVENTS,
+    JIRA_USER,
+    SUBTASK_ISSUE_TYPE,
+    TRIAL_ISSUE_TYPE,
+    WEBHOOK_COALESCE_SECONDS,
+    WEBHOOK_PATH,
+    WEBHOOK_PORT,
+)
+
+if TYPE_CHECKING:
+    from jira_bot.lib.core.protocol_manager import ProtocolManager
+
+
+@dataclass(frozen=True)
+class JiraEvent:
+    """A Jira issue event reduced to what is needed to reconcile the ticket."""
+
+    event_type: str
+    issue_key: str
+    issue_type: str
+    parent_key: Optional[str] = None
+    epic_key: Optional[str] = None
+
+
+def parse_webhook_payload(payload: dict) -> Optional[JiraEvent]:
+    """Parse a Jira webhook payload into a JiraEvent, None for events the bot does not handle.
+
+    Events caused by the bot's own technical user are ignored so that its updates do not trigger new reconciliations.
+    """
+    event_type = payload.get("webhookEvent")
+    if event_type not in HANDLED_WEBHOOK_EVENTS:
+        return None
+    if (payload.get("user") or {}).get("name") == JIRA_USER:
+        return None
+
+    issue = payload.get("issue") or {}
+    fields = issue.get("fields") or {}
+    if not issue.get("key"):
+        return None
+    return JiraEvent(
+        event_type=event_type,
+        issue_key=issue["key"],
+        issue_type=(fields.get("issuetype") or {}).get("name", ""),
+        parent_key=(fields.get("parent") or {}).get("key"),
+        epic_key=fields.get(f"customfield_{CUSTOM_FIELD_MAPPING['Epic Link']}"),
+    )
+
+
+@dataclass
+class EventCoalescer:
+    """Collect events and release at most one per issue key once its window has passed.
+
+    Repeated events for a key inside the window are merged into the latest one; the window starts at the first event
+    so a steady stream of updates cannot postpone reconciliation indefinitely.
+    """
+
+    window: float = WEBHOOK_COALESCE_SECONDS
+    _pending: Dict[str, Tuple[float, JiraEvent]] = field(default_factory=dict, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def add(self, event: JiraEvent) -> None:
+        """Add an event, merging it with a pending event for the same key."""
+        with self._lock:
+            first_seen = self._pending[event.issue_key][0] if event.issue_key in self._pending else time.monotonic()
+            self._pending[event.issue_key] = (first_seen, event)
+
+    def drain(self, force: bool = False) -> List[JiraEvent]:
+        """Remove and return the events whose window has passed (all events if force is set)."""
+        now = time.monotonic()
+        with self._lock:
+            ready = [key for key, (first_seen, _) in self._pending.items() if force or now - first_seen >= self.window]
+            return [self._pending.pop(key)[1] for key in ready]
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+
+@dataclass
+class EventHandler:
+    """Turn webhook payloads into JiraEvents, coalesce them and hand them to a dispatcher."""
+
+    dispatch: Optional[Callable[[JiraEvent], None]] = None
+    coalescer: EventCoalescer = field(default_factory=EventCoalescer)
+
+    def handle(self, payload: dict) -> Optional[JiraEvent]:
+        """Parse a payload and queue the resulting event; returns the event (None if ignored)."""
+        event = parse_webhook_payload(payload)
+        if event is None:
+            logger.debug(f"Ignoring webhook event {payload.get('webhookEvent')}")
+            return None
+        self.coalescer.add(event)
+        return event
+
+    def flush(self, force: bool = False) -> int:
+        """Dispatch every event whose coalescing window has passed, returns the number dispatched."""
+        events = self.coalescer.drain(force)
+        for event in events:
+            if self.dispatch is None:
+                continue
+            try:
+                self.dispatch(event)
+            except Exception as e:
+                logger.error(f"Failed to reconcile {event.issue_type} {event.issue_key}: {e}")
+        return len(events)
+
+    def run_dispatcher(self, stop: threading.Event, poll_interval: float = 1.0) -> None:
+        """Flush ready events until stop is set, then flush everything still pending."""
+        while not stop.wait(poll_interval):
+            self.flush()
+        self.flush(force=True)
+
+
+@dataclass
+class ProtocolManagerDispatcher:
+    """Reconcile the epic, issue or subtask an event refers to through ProtocolManager."""
+
+    protocol_manager: "ProtocolManager"
+
+    def __call__(self, event: JiraEvent) -> None:
+        # the ticket changed in Jira, and whatever the long-running process loaded for earlier events may have been
+        # edited since as well; failures are reported per event instead of piling up for the life of the process
+        self.protocol_manager.trias_jira.identity_map.clear()
+        self.protocol_manager.failures.clear()
+        self.reconcile(event)
+        if self.protocol_manager.failures:
+            logger.warning(
+                f"Not all tickets were reconciled after {event.event_type} on {event.issue_key}, see the errors of: "
+                f"{', '.join(self.protocol_manager.failures)}"
+            )
+
+    def reconcile(self, event: JiraEvent) -> None:
+        """Reconcile the ticket of an event, or the subtasks of its parent for subtask events."""
+        if event.issue_type == EPIC_ISSUE_TYPE:
+            logger.info(f"Reconciling epic {event.issue_key} after {event.event_type}")
+            epic = self.protocol_manager.trias_epics.get_epic_by_key(event.issue_key)
+            self.protocol_manager.manage_single_epic(epic)
+        elif event.issue_type == SUBTASK_ISSUE_TYPE and event.parent_key:
+            logger.info(f"Reconciling subtasks of {event.parent_key} after {event.event_type} on {event.issue_key}")
+            self.protocol_manager.manage_subtasks_for_issue(event.parent_key)
+        elif event.issue_type == TRIAL_ISSUE_TYPE:
+            logger.info(f"Reconciling trial {event.issue_key} after {event.event_type}")
+            issue = self.protocol_manager.trias_issues.get_issue_by_key(event.issue_key)
+            if issue is None:
+                logger.warning(f"Trial {event.issue_key} not found in Jira, nothing to reconcile")
+                return
+            self.protocol_manager.manage_single_issue(issue)
+        else:
+            logger.debug(f"No reconciliation for {event.issue_type} {event.issue_key}")
+
+
+def make_webhook_request_handler(event_handler: EventHandler, secret: Optional[str] = None) -> type:
+    """Build a request handler class that feeds Jira webhook POSTs into the event handler."""
+
+    class WebhookRequestHandler(BaseHTTPRequestHandler):
+        def do_POST(self) -> None:
+            url = urlparse(self.path)
+            if url.path != WEBHOOK_PATH:
+                self.send_response(404)
+                self.end_headers()
+                return
+            if secret and parse_qs(url.query).get("token", [None])[0] != secret:
+                self.send_response(403)
+                self.end_headers()
+                return
+            try:
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            except json.JSONDecodeError:
+                self.send_response(400)
+                self.end_headers()
+                return
+            event_handler.handle(payload)
+            self.send_response(202)
+            self.end_headers()
+
+        def log_message(self, format: str, *args) -> None:
+            logger.debug(format % args)
+
+    return WebhookRequestHandler
+
+
+@dataclass
+class WebhookReceiver:
+    """Small HTTP server receiving Jira webhooks and dispatching coalesced events in a background thread."""
+
+    event_handler: EventHandler
+    host: str = "0.0.0.0"
+    port: int = WEBHOOK_PORT
+    secret: Optional[str] = None
+
+    def serve_forever(self) -> None:
+        """Serve webhooks until interrupted."""
+        stop = threading.Event()
+        dispatcher = threading.Thread(target=self.event_handler.run_dispatcher, args=(stop,), daemon=True)
+        request_handler = make_webhook_request_handler(self.event_handler, self.secret)
+        server = ThreadingHTTPServer((self.host, self.port), request_handler)
+        dispatcher.start()
+        logger.info(f"Listening for Jira webhooks on {self.host}:{self.port}{WEBHOOK_PATH}")
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+            stop.set()
+            dispatcher.join()
+
@@ -1,61 +1,147 @@
 from urllib.parse import urljoin
-from dataclasses import dataclass
-from typing import List, Optional, Union
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple, Union
 import datetime
+import json
 import re
+import threading
 import dateutil.parser
 from jira import JIRA
+from jira.client import ResultList
 import jira.resources as jira_resources
 from loguru import logger
 
+from jira_bot.lib.core.rate_limiter import RequestGovernor, install_governor
+from jira_bot.lib.core.user_directory import UserDirectory
 from jira_bot.lib.tools.constants import (
     CUSTOM_FIELD_MAPPING,
+    EPIC_FIELDS,
     EPIC_ISSUE_TYPE,
+    EPIC_LINK_FIELD,
+    ISSUE_FIELDS,
     ISSUE_TYPE_FIELD,
+    KEY_FIELD,
+    MAX_JQL_LENGTH,
+    PARENT_FIELD,
     PROJECT_FIELD,
+    PROPERTY_JIRA_FIELDS,
     RESOLUTION_FIELD,
+    SEARCH_MAX_WORKERS,
+    SEARCH_PAGE_SIZE,
+    SUBTASK_FIELDS,
     UNRESOLVED_RESOLUTION,
 )
 
+if TYPE_CHECKING:
+    from jira_bot.lib.query.issue_store import IssueStore
+
+
+def build_field_projection(properties: List[str]) -> List[str]:
+    """Build the minimal list of Jira fields needed to read the given JiraEntity properties.
+
+    :param properties: Property names, e.g. EPIC_FIELDS.
+    :return: Sorted list of Jira field ids to pass as `fields=` on reads.
+    """
+    jira_fields = {"issuetype"}
+    for prop in properties:
+        for field_name in PROPERTY_JIRA_FIELDS.get(prop, []):
+            field_id = CUSTOM_FIELD_MAPPING.get(field_name, field_name)
+            jira_fields.add(f"customfield_{field_id}" if field_id.isdigit() else field_id)
+    return sorted(jira_fields)
+
+
+EPIC_JIRA_FIELDS = build_field_projection(EPIC_FIELDS + ["description", "epic_name"])
+ISSUE_JIRA_FIELDS = build_field_projection(ISSUE_FIELDS + ["description"])
+SUBTASK_JIRA_FIELDS = build_field_projection(SUBTASK_FIELDS + ["description"])
+# enough to drive transitions and to get an issue handle for updates
+STATUS_JIRA_FIELDS = build_field_projection(["status_id"])
+# fields a workflow transition may change
+TRANSITION_CHANGED_FIELDS = ["status", "resolution", "resolutiondate", "updated"]
+
+
+HEADER_CELL_PATTERN = re.compile(r"\|\|+")
+ROW_CELL_PATTERN = re.compile(r"\|+")
+
+
+def parse_description_table(description: str) -> Dict[str, str]:
+    """Parse the wiki-markup table of a ticket description into a column -> value mapping."""
+    column_names = []
+    data_rows = []
+    for line in description.splitlines():
+        line = line.strip()
+        if line.startswith("||"):
+            column_names.extend(col.strip() for col in HEADER_CELL_PATTERN.split(line) if col.strip())
+        elif line.startswith("|"):
+            data_rows.extend(cell.strip() for cell in ROW_CELL_PATTERN.split(line) if cell.strip())
+
+    table = {}
+    for index, column_name in enumerate(column_names[: len(data_rows)]):
+        table.setdefault(column_name, data_rows[index])
+    return table
+
+
+def read_custom_field(fields: dict, field_name: str, nested_field: Optional[str] = None) -> Optional[str]:
+    """Read a custom field from the raw `fields` payload of a Jira issue given the logical field name."""
+    custom_field = fields.get(f"customfield_{CUSTOM_FIELD_MAPPING[field_name]}", {})
+    if nested_field:
+        return custom_field.get(nested_field) if custom_field else None
+    if isinstance(custom_field, (str, float, int)):
+        return custom_field
+    return custom_field.get("value") if custom_field else None
+
 
 @dataclass
 class JiraEntity:
-    """Base class representing a Jira Entity."""
+    """Base class representing a Jira Entity.
+
+    Values derived from the issue (description table, custom fields, parsed timestamps) are computed once and cached
+    until the underlying issue is refreshed.
+    """
 
     issue: jira_resources.Issue
 
+    def __post_init__(self):
+        # plain attributes rather than dataclass fields, so copies rebuilt from the fields (as prefect does with task
+        # arguments) start with an empty cache
+        self._cache: Dict[Any, Any] = {}
+        self._cached_raw: Optional[dict] = None
+
+    def refresh(self, issue: jira_resources.Issue) -> None:
+        """Replace the underlying issue, e.g. after re-fetching it, and drop all cached values."""
+        self.issue = issue
+        self._cache.clear()
+
+    def _cached(self, key: Any, compute: Callable[[], Any]) -> Any:
+        """Return a cached value, computing it on first access for the current issue payload."""
+        # jira resources swap in a new raw dict when they reload, which invalidates the cache too
+        if self._cached_raw is not self.issue.raw:
+            self._cache.clear()
+            self._cached_raw = self.issue.raw
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
     def _get_custom_field_value(self, field_name: str, nested_field: Optional[str] = None) -> Optional[str]:
         """Extract the value for a custom field from a Jira issue given the logical field name."""
-        custom_field_id = CUSTOM_FIELD_MAPPING[field_name]
-        custom_field = self.issue.raw.get("fields", {}).get(f"customfield_{custom_field_id}", {})
-        if nested_field:
-            return custom_field.get(nested_field) if custom_field else None
-        if isinstance(custom_field, (str, float, int)):
-            return custom_field
-        return custom_field.get("value") if custom_field else None
+        return self._cached(
+            ("custom_field", field_name, nested_field),
+            lambda: read_custom_field(self.issue.raw.get("fields", {}), field_name, nested_field),
+        )
 
     def _extract_from_description(self, field_name: str) -> Optional[str]:
         """Extract a specific field value from the description, can be any column from the description table."""
+        return self._cached("description_table", self._parse_description).get(field_name)
+
+    def _parse_description(self) -> Dict[str, str]:
         if not self.description:
             logger.warning(f"No description found for issue {self.issue.key}")
-            return None
-
-        lines = [line.strip() for line in self.description.splitlines() if line.strip()]
-        column_names = []
-        data_rows = []
-
-        for line in lines:
-            if line.startswith("||"):
-                columns = [col.strip() for col in re.split(r"\|\|+", line) if col.strip()]
-                column_names.extend(columns)
-            elif line.startswith("|"):
-                row_data = [cell.strip() for cell in re.split(r"\|+", line) if cell.strip()]
-                data_rows.extend(row_data)
+            return {}
+        return parse_description_table(self.description)
 
-        if field_name in column_names:
-            index = column_names.index(field_name)
-            return data_rows[index] if index < len(data_rows) else None
-        return None
+    def _parse_timestamp(self, key: str, timestamp: Optional[str]) -> Optional[datetime.datetime]:
+        """Parse a timestamp once per issue payload."""
+        return self._cached(("timestamp", key), lambda: dateutil.parser.parse(timestamp) if timestamp else None)
 
     @property
     def description(self) -> Optional[str]:
@@ -70,14 +156,12 @@ class JiraEntity:
     @property
     def created(self) -> datetime.date:
         """Date Jira issue was originally created."""
-        creation_timestamp = self.issue.fields.created
-        return dateutil.parser.parse(creation_timestamp).date()
+        return self._parse_timestamp("created", self.issue.fields.created).date()
 
     @property
     def updated(self) -> datetime.date:
         """Date Jira issue was last updated."""
-        update_timestamp = self.issue.fields.updated
-        return dateutil.parser.parse(update_timestamp).date()
+        return self._parse_timestamp("updated", self.issue.fields.updated).date()
 
     @property
     def labels(self) -> List[str]:
@@ -158,8 +242,7 @@ class JiraEpic(JiraEntity):
     @property
     def last_updated(self) -> Optional[datetime.date]:
         """Get the last updated timestamp from the description."""
-        last_updated_str = self._extract_from_description("last_updated")
-        return dateutil.parser.parse(last_updated_str) if last_updated_str else None
+        return self._parse_timestamp("last_updated", self._extract_from_description("last_updated"))
 
     @property
     def protocol_id(self) -> Optional[str]:
@@ -290,8 +373,7 @@ class JiraIssue(JiraEntity):
     @property
     def last_updated(self) -> Optional[datetime.date]:
         """Get the last updated timestamp from the description."""
-        last_updated_str = self._extract_from_description("last_updated")
-        return dateutil.parser.parse(last_updated_str) if last_updated_str else None
+        return self._parse_timestamp("last_updated", self._extract_from_description("last_updated"))
 
     @property
     def epic_link(self) -> Optional[str]:
@@ -414,21 +496,142 @@ class SearchFilter:
         return self.to_jql() is not None
 
 
+def chunk_keys_for_jql(field_name: str, keys: List[str], max_length: int = MAX_JQL_LENGTH) -> Iterator[str]:
+    """Split a list of issue keys into `"<field>" in (...)` clauses that each stay under max_length characters.
+
+    :param field_name: Field to filter on, e.g. "Epic Link" or "parent".
+    :param keys: Issue keys to include in the clauses.
+    :param max_length: Maximum length of a single clause.
+    :return: Iterator over partial JQL query strings.
+    """
+    base_length = len(SearchFilter(field_name=field_name, field_values=[""]).to_jql()) - 2
+    chunk: List[str] = []
+    chunk_length = base_length
+    for key in keys:
+        key_length = len(key) + 2  # quotes
+        if chunk and chunk_length + len(", ") + key_length > max_length:
+            yield SearchFilter(field_name=field_name, field_values=chunk).to_jql()
+            chunk, chunk_length = [], base_length
+        chunk_length += key_length + (len(", ") if chunk else 0)
+        chunk.append(key)
+    if chunk:
+        yield SearchFilter(field_name=field_name, field_values=chunk).to_jql()
+
+
+def total_unknown(page: ResultList) -> bool:
+    """Whether Jira left the total out of a search page, ResultList then reports the length of the page instead."""
+    return page.total == len(page) and (page.startAt > 0 or 0 < page.maxResults <= len(page))
+
+
+def page_has_more(page: ResultList, end: int) -> bool:
+    """Whether a search has more results after a page that ends at the given offset.
+
+    :param page: The page returned by search_issues.
+    :param end: Offset of the first issue after the page.
+    :return: True if another page has to be requested.
+    """
+    if page.isLast is not None:
+        return not page.isLast
+    if total_unknown(page):
+        # without a total only a full page may be followed by more results
+        return len(page) >= page.maxResults
+    return end < page.total
+
+
+@dataclass
+class IssueIdentityMap:
+    """Per-run map of issue key to the latest loaded issue payload.
+
+    Remembers which fields of an issue have been loaded, so a lookup only hits when all requested fields are known.
+    Payloads loaded later for the same key (searches, GETs with other projections) are merged in, writes by the bot
+    patch the entry and status transitions drop the fields they change.
+    """
+
+    def __post_init__(self):
+        self._issues: Dict[str, Tuple[dict, Optional[FrozenSet[str]]]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key: str, fields: Optional[List[str]] = None) -> Optional[dict]:
+        """Raw payload of an issue if all requested fields are loaded (all fields if None), else None."""
+        with self._lock:
+            raw, known_fields = self._issues.get(key, (None, frozenset()))
+            if raw is not None and (known_fields is None or (fields is not None and known_fields.issuperset(fields))):
+                self.hits += 1
+                return raw
+            self.misses += 1
+            return None
+
+    def store(self, raw: dict, fields: Optional[List[str]] = None) -> dict:
+        """Merge a freshly loaded payload into the map and return the merged payload.
+
+        :param raw: Raw issue payload.
+        :param fields: Fields the payload was loaded with, None if all fields were loaded.
+        """
+        with self._lock:
+            old_raw, old_fields = self._issues.get(raw["key"], ({}, frozenset()))
+            merged = {**old_raw, **raw, "fields": {**old_raw.get("fields", {}), **raw.get("fields", {})}}
+            known_fields = None if fields is None or old_fields is None else old_fields | frozenset(fields)
+            self._issues[raw["key"]] = (merged, known_fields)
+            return merged
+
+    def patch(self, key: str, fields: Dict[str, Any]) -> None:
+        """Apply field values written by the bot to a loaded issue."""
+        with self._lock:
+            if key in self._issues:
+                raw, known_fields = self._issues[key]
+                patched = {**raw, "fields": {**raw.get("fields", {}), **fields}}
+                self._issues[key] = (patched, None if known_fields is None else known_fields | frozenset(fields))
+
+    def invalidate(self, key: str, fields: Optional[List[str]] = None) -> None:
+        """Forget some fields of an issue (the whole issue if fields is None) so they are loaded again."""
+        with self._lock:
+            if key not in self._issues:
+                return
+            raw, known_fields = self._issues[key]
+            if fields is None:
+                del self._issues[key]
+                return
+            stale = frozenset(fields)
+            remaining = {name: value for name, value in raw.get("fields", {}).items() if name not in stale}
+            known_fields = known_fields if known_fields is not None else frozenset(raw.get("fields", {}))
+            self._issues[key] = ({**raw, "fields": remaining}, known_fields - stale)
+
+    def clear(self) -> None:
+        """Forget all issues, e.g. before a long-running process reconciles the next batch of changes."""
+        with self._lock:
+            self._issues.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Lookup hits and misses and number of loaded issues."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "issues": len(self._issues)}
+
+
 @dataclass
 class TriasJira:
     server_url: str
     token: str
     project_id: int
+    issue_store: Optional["IssueStore"] = None
 
     def __post_init__(self):
+        # run-wide state is kept out of the dataclass fields, tasks get the client itself (quoted) and share it
+        self.governor = RequestGovernor()
+        self.user_directory = UserDirectory()
+        self.identity_map = IssueIdentityMap()
         self.jira_connection = self.jira_connect()
+        # throttling and retries are handled by the governor instead of the jira session's fixed backoff
+        install_governor(self.jira_connection._session, self.governor)
+        self.write_buffer = JiraWriteBuffer(self)
 
     def jira_connect(self):
         options = {
             "server": self.server_url,
             "verify": False,  # Adjust as necessary for SSL verification
         }
-        return JIRA(options=options, token_auth=self.token)
+        return JIRA(options=options, token_auth=self.token, max_retries=0)
     
     def epic_jql_query(self) -> str:
         """Build the JQL query for retrieving unresolved epics.
@@ -462,6 +665,259 @@ class TriasJira:
 
         return jql_query
 
+    def paginate_search(
+        self,
+        jql_query: str,
+        page_size: int = SEARCH_PAGE_SIZE,
+        prefetch: bool = True,
+        fields: Optional[List[str]] = None,
+    ) -> Iterator[jira_resources.Issue]:
+        """Yield every issue matching a JQL query, page by page.
+        :param jql_query: The JQL query to run.
+        :param page_size: Number of issues requested per page.
+        :param prefetch: Fetch the next page in the background while the current one is consumed.
+        :param fields: Jira fields to return, defaults to all fields.
+        :return: An iterator over the matching JIRA issues.
+        """
+
+        def fetch_page(start_at: int) -> ResultList:
+            page = self.jira_connection.search_issues(
+                jql_query,
+                startAt=start_at,
+                maxResults=page_size,
+                fields=fields if fields else "*all",
+                use_post=True,
+            )
+            self.remember(page, fields)
+            return page
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            start_at = 0
+            page = fetch_page(start_at)
+            while page:
+                start_at += len(page)
+                has_more = page_has_more(page, start_at)
+                next_page = executor.submit(fetch_page, start_at) if has_more and prefetch else None
+                yield from page
+                if not has_more:
+                    break
+                page = next_page.result() if next_page else fetch_page(start_at)
+
+    def search_concurrent(
+        self,
+        jql_query: str,
+        page_size: int = SEARCH_PAGE_SIZE,
+        max_workers: int = SEARCH_MAX_WORKERS,
+        fields: Optional[List[str]] = None,
+    ) -> List[jira_resources.Issue]:
+        """Run a JQL search and fetch all pages after the first one in parallel.
+
+        The first response reports the total, the remaining offsets are then requested on a bounded worker pool and
+        merged in order. If issues moved between pages while fetching (duplicates or a changed total), or the first
+        response has no total, the search falls back to a sequential walk so that no issue is lost.
+        :param jql_query: The JQL query to run.
+        :param page_size: Number of issues requested per page.
+        :param max_workers: Maximum number of pages requested at the same time.
+        :param fields: Jira fields to return, defaults to all fields.
+        :return: A list of all matching JIRA issues.
+        """
+
+        def fetch_page(start_at: int) -> ResultList:
+            page = self.jira_connection.search_issues(
+                jql_query,
+                startAt=start_at,
+                maxResults=page_size,
+                fields=fields if fields else "*all",
+                use_post=True,
+            )
+            self.remember(page, fields)
+            return page
+
+        first_page = fetch_page(0)
+        if not page_has_more(first_page, len(first_page)):
+            return list(first_page)
+        if total_unknown(first_page):
+            logger.info("Search returned no total to plan the pages with, fetching them sequentially.")
+            return self.search_all(jql_query, page_size, fields=fields)
+
+        # Jira may cap maxResults below the requested page size, so step by what it actually returned
+        offsets = range(len(first_page), first_page.total, len(first_page))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pages = [first_page, *executor.map(fetch_page, offsets)]
+
+        issues = []
+        seen_keys = set()
+        for page in pages:
+            for issue in page:
+                if issue.key not in seen_keys:
+                    seen_keys.add(issue.key)
+                    issues.append(issue)
+
+        if len(issues) != pages[-1].total or any(page.total != first_page.total for page in pages):
+            logger.warning(
+                f"Search results changed while fetching pages concurrently ({len(issues)} of {pages[-1].total}), "
+                "falling back to a sequential search."
+            )
+            return self.search_all(jql_query, page_size, fields=fields)
+        return issues
+
+    def to_issue(self, raw: dict) -> jira_resources.Issue:
+        """Wrap a raw issue payload in a jira Issue resource bound to this connection."""
+        return jira_resources.Issue(self.jira_connection._options, self.jira_connection._session, raw=raw)
+
+    def update_issue_fields(self, issue_key: str, fields: Dict[str, Any]) -> None:
+        """Set fields of an issue with a single PUT.
+
+        jira's Issue.update loads the whole issue again after its PUT, and the client has no public call for the PUT
+        alone. This is the only write that goes through the connection's session directly; the governor installed on
+        the session still throttles and retries it.
+        :param issue_key: Key of the issue.
+        :param fields: Field values as sent to Jira, e.g. description and labels.
+        """
+        self.jira_connection._session.put(
+            self.jira_connection._get_url(f"issue/{issue_key}"), data=json.dumps({"fields": fields})
+        )
+
+    def remember(self, issues: List[jira_resources.Issue], fields: Optional[List[str]] = None) -> None:
+        """Add loaded issues to the identity map.
+        :param issues: Issues returned by Jira.
+        :param fields: Fields the issues were loaded with, None if all fields were loaded.
+        """
+        for issue in issues:
+            self.identity_map.store(issue.raw, fields)
+
+    def get_issue(self, issue_key: str, fields: Optional[List[str]] = None) -> jira_resources.Issue:
+        """Get an issue by key, from the identity map if the requested fields have been loaded during this run.
+        :param issue_key: Key of the issue.
+        :param fields: Jira fields to return, defaults to all fields.
+        :return: The JIRA issue.
+        """
+        raw = self.identity_map.lookup(issue_key, fields)
+        if raw is None:
+            issue = self.jira_connection.issue(issue_key, fields=",".join(fields) if fields else None)
+            raw = self.identity_map.store(issue.raw, fields)
+        return self.to_issue(raw)
+
+    def synced_search(self, jql_query: str, fields: Optional[List[str]] = None) -> List[jira_resources.Issue]:
+        """Get all results of a JQL search, through the issue store if one is configured.
+        :param jql_query: The JQL query to run.
+        :param fields: Jira fields to return, defaults to all fields.
+        :return: A list of all matching JIRA issues.
+        """
+        if self.issue_store is None:
+            return self.search_all(jql_query, fields=fields)
+        issues = [self.to_issue(raw) for raw in self.issue_store.sync(self, jql_query, fields)]
+        self.remember(issues, fields)
+        return issues
+
+    def search_all(
+        self, jql_query: str, page_size: int = SEARCH_PAGE_SIZE, fields: Optional[List[str]] = None
+    ) -> List[jira_resources.Issue]:
+        """Run a JQL search and collect every page of results.
+        :param jql_query: The JQL query to run.
+        :param page_size: Number of issues requested per page.
+        :param fields: Jira fields to return, defaults to all fields.
+        :return: A list of all matching JIRA issues.
+        """
+        return list(self.paginate_search(jql_query, page_size, fields=fields))
+
+    def search_by_keys(self, keys: Iterable[str], fields: Optional[List[str]] = None) -> List[jira_resources.Issue]:
+        """Get the issues with the given keys with chunked "key in (...)" searches instead of one request per key.
+        :param keys: Keys of the issues, unknown keys are left out of the result.
+        :param fields: Jira fields to return, defaults to all fields.
+        :return: A list of the found JIRA issues.
+        """
+        issues = []
+        for clause in chunk_keys_for_jql(KEY_FIELD, sorted(set(keys))):
+            issues += self.search_all(clause, fields=fields)
+        return issues
+
+
+@dataclass
+class JiraWriteBuffer:
+    """Per-run buffer that coalesces field updates into one PUT per ticket.
+
+    Staged fields are applied to the entity right away, so the rest of the run (change checks, database upserts)
+    sees the post-update state without re-fetching the ticket. Fields staged for the same key before a flush are
+    merged and written with a single request, without the reload of all fields that jira's Issue.update does
+    afterwards. Fields that already hold the staged value are not sent, so a ticket without real changes is not
+    written at all. After the PUTs, the `updated` timestamps Jira gave the written tickets are read back with one
+    search (the database rows store them, a stale timestamp would show up as a change in the next run). A flush of n
+    written tickets therefore costs n + 1 requests: a ticket flushed on its own, like flush_ticket does before its
+    database write, costs two. A failed write restores the entity and is reported by flush, so the caller can leave
+    the ticket's database row alone. When epics are reconciled on several threads, a flush without keys only writes
+    the tickets staged by the calling thread.
+    """
+
+    trias_jira: TriasJira
+    _pending: Dict[str, Tuple[JiraEntity, jira_resources.Issue, Dict[str, Any]]] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _staged_by: Dict[str, int] = field(default_factory=dict, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def stage(self, entity: JiraEntity, fields: Dict[str, Any]) -> None:
+        """Queue field updates of a ticket and apply them to its entity.
+
+        :param entity: Epic, issue or subtask the fields belong to.
+        :param fields: Field values as sent to Jira, e.g. description and labels.
+        """
+        key = entity.issue.key
+        raw = entity.issue.raw
+        fields = {name: value for name, value in fields.items() if raw.get("fields", {}).get(name) != value}
+        if not fields:
+            logger.debug(f"No field of {key} changed, nothing staged.")
+            return
+        with self._lock:
+            # the issue as loaded from Jira is kept to restore the entity if the write fails
+            _, loaded_issue, pending = self._pending.get(key, (entity, entity.issue, {}))
+            self._pending[key] = (entity, loaded_issue, {**pending, **fields})
+            self._staged_by[key] = threading.get_ident()
+        entity.refresh(self.trias_jira.to_issue({**raw, "fields": {**raw.get("fields", {}), **fields}}))
+        self.trias_jira.identity_map.patch(key, fields)
+
+    def flush(self, keys: Optional[List[str]] = None) -> List[str]:
+        """Write the pending updates of the given keys, one PUT per ticket.
+
+        :param keys: Keys of the tickets to write, defaults to all tickets staged by the calling thread.
+        :return: Keys of the tickets whose update failed.
+        """
+        with self._lock:
+            if keys is None:
+                keys = [key for key, thread_id in self._staged_by.items() if thread_id == threading.get_ident()]
+            writes = [(key, self._pending.pop(key)) for key in keys if key in self._pending]
+            for key, _ in writes:
+                del self._staged_by[key]
+        written, failed = {}, []
+        for key, (entity, loaded_issue, fields) in writes:
+            try:
+                self.trias_jira.update_issue_fields(key, fields)
+                logger.info(f"Ticket updated: {key} ({', '.join(fields)})")
+                written[key] = entity
+            except Exception as e:
+                logger.error(f"Failed to update ticket {key}: {e}")
+                entity.refresh(loaded_issue)
+                self.trias_jira.identity_map.invalidate(key)
+                failed.append(key)
+        if written:
+            self.read_back_updated(written)
+        return failed
+
+    def read_back_updated(self, entities: Dict[str, JiraEntity]) -> None:
+        """Set the `updated` timestamp Jira gave the written tickets on their entities."""
+        try:
+            issues = self.trias_jira.search_by_keys(list(entities), ["updated"])
+        except Exception as e:
+            logger.warning(f"Failed to read back the updated timestamp of {', '.join(entities)}: {e}")
+            for key in entities:
+                self.trias_jira.identity_map.invalidate(key, ["updated"])
+            return
+        for issue in issues:
+            entity = entities[issue.key]
+            raw = entity.issue.raw
+            updated = issue.raw.get("fields", {}).get("updated")
+            entity.refresh(self.trias_jira.to_issue({**raw, "fields": {**raw.get("fields", {}), "updated": updated}}))
+
 
 @dataclass
 class TriasEpics:
@@ -469,27 +925,38 @@ class TriasEpics:
 
     trias_jira: TriasJira
 
-    def get_epics(self, jql_query: str = None) -> List[JiraEpic]:
+    def iter_epics(self, jql_query: str = None, page_size: int = SEARCH_PAGE_SIZE) -> Iterator[JiraEpic]:
+        """Yield all unresolved epics from the JIRA project page by page.
+        :param jql_query: Optional JQL query, defaults to the unresolved epics of the project.
+        :param page_size: Number of epics requested per page.
+        :return: An iterator over JiraEpic instances.
+        """
+        if not jql_query:
+            jql_query = self.trias_jira.epic_jql_query()
+        try:
+            for epic in self.trias_jira.paginate_search(jql_query, page_size, fields=EPIC_JIRA_FIELDS):
+                yield self.map_to_jira_epic(epic)
+        except Exception as e:
+            logger.error(f"Failed to query for epics: {e}")
+            raise
+
+    def get_epics(self, jql_query: str = None, max_workers: int = 1) -> List[JiraEpic]:
         """Get all unresolved epics from the JIRA project.
+        :param jql_query: Optional JQL query, defaults to the unresolved epics of the project.
+        :param max_workers: Number of pages fetched in parallel, 1 walks the pages sequentially.
         :return: A list of JiraEpic instances representing the unresolved epics.
         """
+        if max_workers <= 1 and self.trias_jira.issue_store is None:
+            return list(self.iter_epics(jql_query))
+
         if not jql_query:
             jql_query = self.trias_jira.epic_jql_query()
-        start_at = 0
-        max_results = 50
-        all_epics = []
-
         try:
-            while True:
-                epics = self.trias_jira.jira_connection.search_issues(
-                    jql_query, startAt=start_at, maxResults=max_results
-                )
-                if not epics:
-                    break
-                all_epics.extend(epics)
-                start_at += max_results
-
-            return [self.map_to_jira_epic(epic) for epic in all_epics]
+            if self.trias_jira.issue_store is not None:
+                epics = self.trias_jira.synced_search(jql_query, fields=EPIC_JIRA_FIELDS)
+            else:
+                epics = self.trias_jira.search_concurrent(jql_query, max_workers=max_workers, fields=EPIC_JIRA_FIELDS)
+            return [self.map_to_jira_epic(epic) for epic in epics]
         except Exception as e:
             logger.error(f"Failed to query for epics: {e}")
             raise
@@ -500,12 +967,24 @@ class TriasEpics:
         :return: A JiraEpic instance representing the epic.
         """
         try:
-            epic = self.trias_jira.jira_connection.issue(epic_key)
+            epic = self.trias_jira.get_issue(epic_key, EPIC_JIRA_FIELDS)
             return self.map_to_jira_epic(epic)
         except Exception as e:
             logger.error(f"Failed to get epic by key {epic_key}: {e}")
             raise
 
+    def get_epics_by_keys(self, epic_keys: List[str]) -> List[JiraEpic]:
+        """Get the epics with the given keys.
+        :param epic_keys: The keys of the epics to query.
+        :return: A list of JiraEpic instances of the found epics.
+        """
+        try:
+            epics = self.trias_jira.search_by_keys(epic_keys, EPIC_JIRA_FIELDS)
+            return [self.map_to_jira_epic(epic) for epic in epics]
+        except Exception as e:
+            logger.error(f"Failed to get epics by keys {sorted(epic_keys)}: {e}")
+            raise
+
     def map_to_jira_epic(self, epic) -> JiraEpic:
         """Map a JIRA issue to a JiraEpic instance.
         :param epic: The JIRA epic issue to map.
@@ -520,26 +999,55 @@ class TriasIssues:
 
     trias_jira: TriasJira
 
+    def iter_all_issues(self, page_size: int = SEARCH_PAGE_SIZE) -> Iterator[JiraIssue]:
+        """Yield all issues from Jira page by page.
+        :param page_size: Number of issues requested per page.
+        :return: An iterator over JiraIssue instances.
+        """
+        jql_query = self.trias_jira.issue_jql_query()
+        try:
+            for issue in self.trias_jira.paginate_search(jql_query, page_size, fields=ISSUE_JIRA_FIELDS):
+                yield self.map_to_jira_issue(issue)
+        except Exception as e:
+            logger.error(f"Failed to query for get all issues: {e}")
+            raise
+
     def get_all_issues(self) -> List[JiraIssue]:
         """Get all issues from Jira.
         :return: A list of JiraIssue instances representing all issues.
         """
-        jql_query = self.trias_jira.issue_jql_query()
+        if self.trias_jira.issue_store is None:
+            return list(self.iter_all_issues())
         try:
-            issues = self.trias_jira.jira_connection.search_issues(jql_query)
+            issues = self.trias_jira.synced_search(self.trias_jira.issue_jql_query(), fields=ISSUE_JIRA_FIELDS)
             return [self.map_to_jira_issue(issue) for issue in issues]
         except Exception as e:
             logger.error(f"Failed to query for get all issues: {e}")
             raise
 
+    def iter_issues_for_epic(self, epic_key: str, page_size: int = SEARCH_PAGE_SIZE) -> Iterator[JiraIssue]:
+        """Yield all issues linked to a specific epic page by page.
+        :param epic_key: The key of the epic to query.
+        :param page_size: Number of issues requested per page.
+        :return: An iterator over JiraIssue instances linked to the epic.
+        """
+        jql_query = f'"Epic Link" = "{epic_key}"'
+        try:
+            for issue in self.trias_jira.paginate_search(jql_query, page_size, fields=ISSUE_JIRA_FIELDS):
+                yield self.map_to_jira_issue(issue)
+        except Exception as e:
+            logger.error(f"Failed to query for issues linked to epic {epic_key}: {e}")
+            raise
+
     def get_issues_for_epic(self, epic_key: str) -> List[JiraIssue]:
         """Get all issues linked to a specific epic.
         :param epic_key: The key of the epic to query.
         :return: A list of JiraIssue instances representing the issues linked to the epic.
         """
-        jql_query = f'"Epic Link" = "{epic_key}"'
+        if self.trias_jira.issue_store is None:
+            return list(self.iter_issues_for_epic(epic_key))
         try:
-            issues = self.trias_jira.jira_connection.search_issues(jql_query)
+            issues = self.trias_jira.synced_search(f'"Epic Link" = "{epic_key}"', fields=ISSUE_JIRA_FIELDS)
             return [self.map_to_jira_issue(issue) for issue in issues]
         except Exception as e:
             logger.error(f"Failed to query for issues linked to epic {epic_key}: {e}")
@@ -551,11 +1059,23 @@ class TriasIssues:
         :return: A JiraIssue instance representing the issue.
         """
         try:
-            issue = self.trias_jira.jira_connection.issue(issue_key)
+            issue = self.trias_jira.get_issue(issue_key, ISSUE_JIRA_FIELDS)
             return self.map_to_jira_issue(issue)
         except Exception as e:
             logger.error(f"Failed to get issue by key {issue_key}: {e}")
 
+    def get_issues_by_keys(self, issue_keys: List[str]) -> List[JiraIssue]:
+        """Get the issues with the given keys.
+        :param issue_keys: The keys of the issues to query.
+        :return: A list of JiraIssue instances of the found issues.
+        """
+        try:
+            issues = self.trias_jira.search_by_keys(issue_keys, ISSUE_JIRA_FIELDS)
+            return [self.map_to_jira_issue(issue) for issue in issues]
+        except Exception as e:
+            logger.error(f"Failed to get issues by keys {sorted(issue_keys)}: {e}")
+            raise
+
     def map_to_jira_issue(self, issue: jira_resources.Issue) -> JiraIssue:
         """Map a JIRA issue to a JiraIssue instance.
         :param issue: The JIRA issue to map.
@@ -570,15 +1090,30 @@ class TriasSubTasks:
 
     trias_jira: TriasJira
 
-    def get_subtasks_for_issue(self, issue_key: str) -> List[JiraIssue]:
-        """Get all subtasks linked to a specific issue.
+    def iter_subtasks_for_issue(self, issue_key: str, page_size: int = SEARCH_PAGE_SIZE) -> Iterator[JiraSubTask]:
+        """Yield all subtasks linked to a specific issue page by page.
         :param issue_key: The key of the issue to query.
-        :return: A list of JiraIssue instances representing the subtasks linked to the issue.
+        :param page_size: Number of subtasks requested per page.
+        :return: An iterator over JiraSubTask instances linked to the issue.
         """
         jql_query = f'parent = "{issue_key}"'
         try:
-            issues = self.trias_jira.jira_connection.search_issues(jql_query)
-            return [self.map_to_jira_issue(issue) for issue in issues]
+            for issue in self.trias_jira.paginate_search(jql_query, page_size, fields=SUBTASK_JIRA_FIELDS):
+                yield self.map_to_jira_issue(issue)
+        except Exception as e:
+            logger.error(f"Failed to query for subtasks linked to issue {issue_key}: {e}")
+            raise
+
+    def get_subtasks_for_issue(self, issue_key: str) -> List[JiraSubTask]:
+        """Get all subtasks linked to a specific issue.
+        :param issue_key: The key of the issue to query.
+        :return: A list of JiraSubTask instances representing the subtasks linked to the issue.
+        """
+        if self.trias_jira.issue_store is None:
+            return list(self.iter_subtasks_for_issue(issue_key))
+        try:
+            subtasks = self.trias_jira.synced_search(f'parent = "{issue_key}"', fields=SUBTASK_JIRA_FIELDS)
+            return [self.map_to_jira_issue(subtask) for subtask in subtasks]
         except Exception as e:
             logger.error(f"Failed to query for subtasks linked to issue {issue_key}: {e}")
             raise
@@ -589,7 +1124,7 @@ class TriasSubTasks:
         :return: A JiraIssue instance representing the issue.
         """
         try:
-            issue = self.trias_jira.jira_connection.issue(issue_key)
+            issue = self.trias_jira.get_issue(issue_key, SUBTASK_JIRA_FIELDS)
             return self.map_to_jira_issue(issue)
         except Exception as e:
             logger.error(f"Failed to get issue by key {issue_key}: {e}")
@@ -599,4 +1134,75 @@ class TriasSubTasks:
         :param issue: The JIRA issue to map.
         :return: A JiraIssue instance.
         """
-        return JiraSubTask(issue=issue)
\ No newline at end of file
+        return JiraSubTask(issue=issue)
+
+
+@dataclass
+class JiraHierarchy:
+    """In-memory epic -> issues -> subtasks index of the Jira board.
+
+    An epic or issue that has not been prefetched returns None, so callers can fall back to a direct search.
+    """
+
+    epics: Dict[str, JiraEpic] = field(default_factory=dict)
+    issues_by_epic: Dict[str, List[JiraIssue]] = field(default_factory=dict)
+    subtasks_by_issue: Dict[str, List[JiraSubTask]] = field(default_factory=dict)
+
+    def issues_for_epic(self, epic_key: str) -> Optional[List[JiraIssue]]:
+        """Get the prefetched issues linked to an epic."""
+        return self.issues_by_epic.get(epic_key)
+
+    def subtasks_for_issue(self, issue_key: str) -> Optional[List[JiraSubTask]]:
+        """Get the prefetched subtasks of an issue."""
+        return self.subtasks_by_issue.get(issue_key)
+
+    def add_issue(self, epic_key: str, issue: JiraIssue) -> None:
+        """Register an issue (e.g. a newly created one) under its epic."""
+        self.issues_by_epic.setdefault(epic_key, []).append(issue)
+        self.subtasks_by_issue.setdefault(issue.issue_key, [])
+
+    def add_subtask(self, issue_key: str, subtask: JiraSubTask) -> None:
+        """Register a subtask (e.g. a newly created one) under its parent issue."""
+        self.subtasks_by_issue.setdefault(issue_key, []).append(subtask)
+
+
+@dataclass
+class TriasHierarchy:
+    """Class for prefetching the issues and subtasks of many TRIAS epics in a few chunked searches."""
+
+    trias_jira: TriasJira
+    max_jql_length: int = MAX_JQL_LENGTH
+
+    def prefetch(self, epics: List[JiraEpic]) -> JiraHierarchy:
+        """Load all issues and subtasks below the given epics.
+        :param epics: The epics returned by TriasEpics.get_epics.
+        :return: A JiraHierarchy index of the epics, their issues and their subtasks.
+        """
+        hierarchy = JiraHierarchy(epics={epic.epic_key: epic for epic in epics})
+        for epic_key in hierarchy.epics:
+            hierarchy.issues_by_epic[epic_key] = []
+
+        try:
+            # sorted keys keep the chunks (and their issue store scopes) stable between runs
+            for clause in chunk_keys_for_jql(EPIC_LINK_FIELD, sorted(hierarchy.epics), self.max_jql_length):
+                for raw_issue in self.trias_jira.synced_search(clause, fields=ISSUE_JIRA_FIELDS):
+                    issue = JiraIssue(issue=raw_issue)
+                    if issue.epic_link in hierarchy.issues_by_epic:
+                        hierarchy.add_issue(issue.epic_link, issue)
+
+            issue_keys = sorted(hierarchy.subtasks_by_issue)
+            for clause in chunk_keys_for_jql(PARENT_FIELD, issue_keys, self.max_jql_length):
+                for raw_subtask in self.trias_jira.synced_search(clause, fields=SUBTASK_JIRA_FIELDS):
+                    subtask = JiraSubTask(issue=raw_subtask)
+                    if subtask.parent_issue in hierarchy.subtasks_by_issue:
+                        hierarchy.add_subtask(subtask.parent_issue, subtask)
+        except Exception as e:
+            logger.error(f"Failed to prefetch the issue hierarchy for {len(epics)} epics: {e}")
+            raise
+
+        logger.info(
+            f"Prefetched {len(issue_keys)} issues and "
+            f"{sum(len(subtasks) for subtasks in hierarchy.subtasks_by_issue.values())} subtasks "
+            f"for {len(hierarchy.epics)} epics."
+        )
+        return hierarchy
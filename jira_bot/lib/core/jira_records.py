@@ -0,0 +1,322 @@
+"""Compact records decoded straight from raw Jira search JSON.
+
+Building jira.resources.Issue objects for every search result is the dominant CPU and memory cost when a run touches
+thousands of tickets. The records below are slotted dataclasses decoded directly from the `issues` of a raw search
+response and expose the same properties as JiraEpic, JiraIssue and JiraSubTask, so they can be used wherever only
+the values (not the jira resource) are needed. iter_raw_issues is the raw search underneath them, also used by the
+issue store, which keeps the raw JSON of every result.
+"""
+
+import datetime
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+import dateutil.parser
+
+from jira_bot.lib.core.jira_connections import (
+    EPIC_JIRA_FIELDS,
+    ISSUE_JIRA_FIELDS,
+    SUBTASK_JIRA_FIELDS,
+    TriasJira,
+    parse_description_table,
+    read_custom_field,
+)
+from jira_bot.lib.tools.constants import SEARCH_PAGE_SIZE
+
+RecordT = TypeVar("RecordT", bound="JiraRecord")
+
+
+def _parse_date(timestamp: Optional[str]) -> Optional[datetime.date]:
+    """Date part of a Jira timestamp such as 2024-01-31T10:00:00.000+0000."""
+    if not timestamp:
+        return None
+    try:
+        return datetime.date.fromisoformat(timestamp[:10])
+    except ValueError:
+        return dateutil.parser.parse(timestamp).date()
+
+
+def _parse_datetime(timestamp: Optional[str]) -> Optional[datetime.datetime]:
+    if not timestamp:
+        return None
+    try:
+        return datetime.datetime.fromisoformat(timestamp)
+    except ValueError:
+        return dateutil.parser.parse(timestamp)
+
+
+def _email(value: Optional[dict]) -> Optional[str]:
+    return value.get("emailAddress") if value else None
+
+
+@dataclass(slots=True)
+class ComponentRecord:
+    """Project component of an epic, read like the jira Component resources of JiraEpic.components."""
+
+    id: Optional[str]
+    name: Optional[str]
+
+    def __str__(self) -> str:
+        return str(self.name)
+
+
+@dataclass(slots=True)
+class JiraRecord:
+    """Values shared by all Jira ticket records."""
+
+    key: str
+    id: str
+    description: Optional[str]
+    description_table: Dict[str, str]
+    summary: str
+    created: Optional[datetime.date]
+    updated: Optional[datetime.date]
+    labels: List[str]
+    status_name: Optional[str]
+    status_id: Optional[str]
+    status_category: Optional[str]
+    comments_count: int
+    due_date: Optional[str]
+    last_viewed: Optional[str]
+    watch_count: int
+    creator_email: Optional[str]
+    assignee_email: Optional[str]
+
+    @staticmethod
+    def common_values(raw: Dict[str, Any]) -> Dict[str, Any]:
+        """Decode the values shared by all ticket types from a raw issue payload."""
+        fields = raw.get("fields", {})
+        description = fields.get("description")
+        status = fields.get("status") or {}
+        comment = fields.get("comment")
+        watches = fields.get("watches")
+        return {
+            "key": raw["key"],
+            "id": raw["id"],
+            "description": description,
+            "description_table": parse_description_table(description) if description else {},
+            "summary": fields.get("summary"),
+            "created": _parse_date(fields.get("created")),
+            "updated": _parse_date(fields.get("updated")),
+            "labels": fields.get("labels") or [],
+            "status_name": status.get("name"),
+            "status_id": status.get("id"),
+            "status_category": (status.get("statusCategory") or {}).get("name"),
+            "comments_count": comment.get("total", 0) if comment else 0,
+            "due_date": fields.get("duedate"),
+            "last_viewed": fields.get("lastViewed"),
+            "watch_count": watches.get("watchCount", 0) if watches else 0,
+            "creator_email": _email(fields.get("creator")),
+            "assignee_email": _email(fields.get("assignee")),
+        }
+
+
+@dataclass(slots=True)
+class EpicRecord(JiraRecord):
+    """Record with the properties of a JiraEpic."""
+
+    protocol_uuid: Optional[str]
+    last_updated: Optional[datetime.datetime]
+    protocol_id: Optional[str]
+    epic_name: Optional[str]
+    requestor_email: Optional[str]
+    trial_engineer_email: Optional[str]
+    protocol_sheet: Optional[str]
+    executed_trials: Optional[str]
+    forcasted_costs: Optional[str]
+    country: Optional[str]
+    crop: Optional[str]
+    year_of_harvest: Optional[int]
+    business_case: Optional[str]
+    budget: Optional[float]
+    paid_costs: Optional[float]
+    planned_trials: Optional[float]
+    sponsor: Optional[str]
+    cost_sheet: Optional[str]
+    trial_type: Optional[str]
+    trial_objective: Optional[str]
+    components: List[ComponentRecord]
+
+    @property
+    def epic_id(self) -> str:
+        return self.id
+
+    @property
+    def epic_key(self) -> str:
+        return self.key
+
+    @property
+    def url_field(self) -> str:
+        return f"https://jira.digital-farming.com/browse/{self.key}"
+
+    @classmethod
+    def from_raw(cls, raw: Dict[str, Any]) -> "EpicRecord":
+        """Decode an epic from a raw issue payload."""
+        values = cls.common_values(raw)
+        fields = raw.get("fields", {})
+        table = values["description_table"]
+        return cls(
+            **values,
+            protocol_uuid=table.get("uuid"),
+            last_updated=_parse_datetime(table.get("last_updated")),
+            protocol_id=read_custom_field(fields, "Protocol ID"),
+            epic_name=read_custom_field(fields, "Epic Name"),
+            requestor_email=read_custom_field(fields, "Requestor", "emailAddress"),
+            trial_engineer_email=read_custom_field(fields, "Trial Engineer", "emailAddress"),
+            protocol_sheet=read_custom_field(fields, "Protocol Sheet"),
+            executed_trials=read_custom_field(fields, "Executed Trials"),
+            forcasted_costs=read_custom_field(fields, "Forcasted Costs"),
+            country=read_custom_field(fields, "Country"),
+            crop=read_custom_field(fields, "Crop"),
+            year_of_harvest=read_custom_field(fields, "Year of Harvest", "value"),
+            business_case=read_custom_field(fields, "Business Case"),
+            budget=read_custom_field(fields, "Budget"),
+            paid_costs=read_custom_field(fields, "Paid Costs"),
+            planned_trials=read_custom_field(fields, "Planned Trials"),
+            sponsor=read_custom_field(fields, "Sponsor"),
+            cost_sheet=read_custom_field(fields, "Cost Sheet"),
+            trial_type=read_custom_field(fields, "Trial Type", "value"),
+            trial_objective=read_custom_field(fields, "Trial Objective", "value"),
+            components=[
+                ComponentRecord(component.get("id"), component.get("name"))
+                for component in fields.get("components") or []
+            ],
+        )
+
+
+@dataclass(slots=True)
+class IssueRecord(JiraRecord):
+    """Record with the properties of a JiraIssue."""
+
+    trial_id: Optional[str]
+    trial_uuid: Optional[str]
+    last_updated: Optional[datetime.datetime]
+    epic_link: Optional[str]
+    requestor_email: Optional[str]
+    trial_engineer_email: Optional[str]
+    subtask_ids: List[str]
+    subtask_keys: List[str]
+
+    @property
+    def issue_id(self) -> str:
+        return self.id
+
+    @property
+    def issue_key(self) -> str:
+        return self.key
+
+    @classmethod
+    def from_raw(cls, raw: Dict[str, Any]) -> "IssueRecord":
+        """Decode a trial issue from a raw issue payload."""
+        values = cls.common_values(raw)
+        fields = raw.get("fields", {})
+        table = values["description_table"]
+        subtasks = fields.get("subtasks") or []
+        return cls(
+            **values,
+            trial_id=read_custom_field(fields, "Trial-ID"),
+            trial_uuid=table.get("uuid"),
+            last_updated=_parse_datetime(table.get("last_updated")),
+            epic_link=read_custom_field(fields, "Epic Link"),
+            requestor_email=read_custom_field(fields, "Requestor", "emailAddress"),
+            trial_engineer_email=read_custom_field(fields, "Trial Engineer", "emailAddress"),
+            subtask_ids=[subtask["id"] for subtask in subtasks],
+            subtask_keys=[subtask["key"] for subtask in subtasks],
+        )
+
+
+@dataclass(slots=True)
+class SubTaskRecord(JiraRecord):
+    """Record with the properties of a JiraSubTask."""
+
+    file_uuid: Optional[str]
+    trial_id: Optional[str]
+    trial_engineer_email: Optional[str]
+    parent_issue: Optional[str]
+
+    @property
+    def subtask_id(self) -> str:
+        return self.id
+
+    @property
+    def subtask_key(self) -> str:
+        return self.key
+
+    @classmethod
+    def from_raw(cls, raw: Dict[str, Any]) -> "SubTaskRecord":
+        """Decode a subtask from a raw issue payload."""
+        values = cls.common_values(raw)
+        fields = raw.get("fields", {})
+        return cls(
+            **values,
+            file_uuid=values["description_table"].get("file_uuid"),
+            trial_id=read_custom_field(fields, "Trial-ID"),
+            trial_engineer_email=read_custom_field(fields, "Trial Engineer"),
+            parent_issue=(fields.get("parent") or {}).get("key"),
+        )
+
+
+def iter_raw_issues(
+    trias_jira: TriasJira, jql_query: str, fields: Optional[List[str]] = None, page_size: int = SEARCH_PAGE_SIZE
+) -> Iterator[Dict[str, Any]]:
+    """Run a JQL search requesting raw JSON and yield the raw issues of every page, without building jira resources.
+
+    Pages are requested until Jira reports the last one, like TriasJira.paginate_search; a page that leaves out
+    isLast and total is followed by another request unless it is short.
+    """
+    start_at = 0
+    while True:
+        page = trias_jira.jira_connection.search_issues(
+            jql_query,
+            startAt=start_at,
+            maxResults=page_size,
+            fields=fields if fields else "*all",
+            json_result=True,
+            use_post=True,
+        )
+        raw_issues = page.get("issues", [])
+        yield from raw_issues
+        start_at += len(raw_issues)
+        if not raw_issues:
+            break
+        if page.get("isLast") is not None:
+            has_more = not page["isLast"]
+        elif page.get("total") is None:
+            has_more = len(raw_issues) >= page.get("maxResults", page_size)
+        else:
+            has_more = start_at < page["total"]
+        if not has_more:
+            break
+
+
+def iter_records(
+    trias_jira: TriasJira,
+    jql_query: str,
+    decode: Callable[[Dict[str, Any]], RecordT],
+    fields: List[str],
+    page_size: int = SEARCH_PAGE_SIZE,
+) -> Iterator[RecordT]:
+    """Run a JQL search requesting raw JSON and decode every result into a record."""
+    for raw in iter_raw_issues(trias_jira, jql_query, fields, page_size):
+        yield decode(raw)
+
+
+def iter_epic_records(
+    trias_jira: TriasJira, jql_query: str, page_size: int = SEARCH_PAGE_SIZE
+) -> Iterator[EpicRecord]:
+    """Yield EpicRecords for a JQL search."""
+    return iter_records(trias_jira, jql_query, EpicRecord.from_raw, EPIC_JIRA_FIELDS, page_size)
+
+
+def iter_issue_records(
+    trias_jira: TriasJira, jql_query: str, page_size: int = SEARCH_PAGE_SIZE
+) -> Iterator[IssueRecord]:
+    """Yield IssueRecords for a JQL search."""
+    return iter_records(trias_jira, jql_query, IssueRecord.from_raw, ISSUE_JIRA_FIELDS, page_size)
+
+
+def iter_subtask_records(
+    trias_jira: TriasJira, jql_query: str, page_size: int = SEARCH_PAGE_SIZE
+) -> Iterator[SubTaskRecord]:
+    """Yield SubTaskRecords for a JQL search."""
+    return iter_records(trias_jira, jql_query, SubTaskRecord.from_raw, SUBTASK_JIRA_FIELDS, page_size)
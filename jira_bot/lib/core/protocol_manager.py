@@ -1,14 +1,20 @@
 """Main module for managing protocols and associated JIRA tickets."""
 
-from dataclasses import dataclass
-from typing import List, Optional, Tuple
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
 import re
 import pandas as pd
 import sqlalchemy as sa
 from loguru import logger
 
 from jira_bot.lib.core.jira_connections import (
+    ISSUE_JIRA_FIELDS,
+    STATUS_JIRA_FIELDS,
+    SUBTASK_JIRA_FIELDS,
+    TRANSITION_CHANGED_FIELDS,
     JiraEpic,
+    JiraHierarchy,
     JiraIssue,
     TriasJira,
     TriasEpics,
@@ -17,12 +23,22 @@ from jira_bot.lib.core.jira_connections import (
     TriasSubTasks,
 )
 
+from jira_bot.lib.core.workflow import (
+    STANDARD_WORKFLOW,
+    SUBTASK_WORKFLOW,
+    TRANSITION_METADATA,
+    WorkflowPlanner,
+)
 from jira_bot.lib.query.database import (
-    get_record_by_name,
-    get_record_by_id,
+    UPSERT_TABLES,
+    fetch_all,
+    fetch_one,
     get_record_by_uuid,
     query_farm_field_names,
 )
+from jira_bot.lib.query.fingerprint import FINGERPRINT_TABLES, FingerprintIndex
+from jira_bot.lib.query.source_index import SourceIndex
+from jira_bot.lib.tools.comparator import COMPARATORS, FieldChange, merge_changes
 
 from jira_bot.lib.tools.constants import (
     CUSTOM_FIELD_MAPPING,
@@ -32,10 +48,8 @@ from jira_bot.lib.tools.constants import (
     ISSUE_FIELDS,
     EPIC_SCHEMA,
     ISSUE_SCHEMA,
-    STATUS_MAPPING,
-    WORKFLOW_TRANSITIONS,
-    SUBTASKS_WORKFLOW,
-    SUBTASKS_STATUS_MAPPING,
+    SUBTASK_ISSUE_TYPE,
+    TRIAL_ISSUE_TYPE,
     SUBTASK_FIELDS,
     SUBTASK_SCHEMA,
     EPIC_NAME_PATTERN,
@@ -44,21 +58,26 @@ from jira_bot.lib.tools.constants import (
     FIELD_PROTOCOL,
     FIELD_NAME,
     FIELD_TRIAL,
-    FIELD_CROP_SEASON_UUID,
     UPLOADED_CROPSEASON_UUID,
     FIELD_FILE_UUID,
-    FIELD_UUID,
+    FIELD_PROTOCOL_UUID,
+    UPLOADED_DATA_TABLE,
+    PROTOCOL_COLUMNS,
+    TRIAL_COLUMNS,
+    RECONCILE_MAX_CONCURRENCY,
 )
 
 from jira_bot.lib.tools.helper_functions import (
     create_jira_description,
     Trial,
     MapPlotter,
-    compare_fields,
     create_labels,
     search_user,
-    create_jira_ticket,
+    build_jira_ticket_fields,
+    create_jira_tickets,
+    update_records,
     upsert_record,
+    upsert_records,
 )
 
 # Trigger gobbler flow from here
@@ -72,45 +91,85 @@ from jira_bot.lib.tools.helper_functions import (
 
 @dataclass
 class ProtocolManager:
-    """Class for managing protocols and associated JIRA tickets."""
+    """Class for managing protocols and associated JIRA tickets.
+
+    Errors of a single ticket are logged and the next ticket is reconciled. The keys of the tickets that were not
+    created, updated or written to the database are kept in failures.
+    """
 
     trias_jira: TriasJira
     trias_epics: TriasEpics
     trias_issues: TriasIssues
     trias_subtasks: TriasSubTasks
     engine: sa.engine
+    hierarchy: Optional[JiraHierarchy] = None
+    source_index: Optional[SourceIndex] = None
+    fingerprints: Optional[FingerprintIndex] = None
+    failures: List[str] = field(default_factory=list)
 
     def manage_epics(self) -> None:
         """Fetch all JIRA epics, check against epic DB, and update as necessary."""
-        epics = self.trias_epics.get_epics()  # Get all epics from JIRA
-        for epic in epics:
+        # Start reconciling the first epics while later pages are still loading
+        for epic in self.trias_epics.iter_epics():
             self.manage_single_epic(epic)
 
     def manage_single_epic(self, epic: JiraEpic) -> None:
         """Manage a single JIRA epic."""
         try:
             if self.is_valid_epic_name(epic.protocol_id):
-                protocol_df = get_record_by_name(self.engine, FIELD_PROTOCOL, FIELD_NAME, epic.protocol_id)
-                if not protocol_df.empty:
+                if self.get_protocol(epic.protocol_id) is not None:
                     self.handle_existing_protocol(epic)
                 elif self.check_unseen_protocol_ids(epic.protocol_id, epic.protocol_id):
                     return
                 self.manage_trials_for_epic(epic)
         except Exception as e:
             logger.error(f"Error managing epic {epic.epic_key}: {e}")
+            self.failures.append(epic.epic_key)
+        finally:
+            self.failures.extend(self.trias_jira.write_buffer.flush())
+
+    async def manage_epics_concurrently(
+        self, epics: List[JiraEpic], max_concurrency: int = RECONCILE_MAX_CONCURRENCY
+    ) -> None:
+        """Reconcile epics on worker threads, at most max_concurrency at a time.
+
+        The epics share the run's hierarchy, source index and fingerprints; their tickets do not overlap, and the
+        Jira requests of all threads go through the governor of trias_jira.
+        """
+        await self.run_concurrently(self.manage_single_epic, epics, max_concurrency)
+
+    async def manage_subtasks_concurrently(
+        self, issue_keys: List[str], max_concurrency: int = RECONCILE_MAX_CONCURRENCY
+    ) -> None:
+        """Reconcile the subtasks of issues on worker threads, at most max_concurrency issues at a time."""
+        await self.run_concurrently(self.manage_subtasks_for_issue, issue_keys, max_concurrency)
+
+    @staticmethod
+    async def run_concurrently(manage: Callable[[Any], None], items: List[Any], max_concurrency: int) -> None:
+        """Call manage for every item on a worker thread, bounded by a semaphore of max_concurrency."""
+        semaphore = asyncio.Semaphore(max(max_concurrency, 1))
+
+        async def run(item: Any) -> None:
+            async with semaphore:
+                await asyncio.to_thread(manage, item)
+
+        await asyncio.gather(*(run(item) for item in items))
 
     def handle_existing_protocol(self, epic: JiraEpic) -> None:
         """Handle existing protocol in the database."""
-        epic_df = get_record_by_id(self.engine, "epics", "epic_id", epic.epic_id)
-        if not epic_df.empty:
+        if fetch_one(self.engine, "epics", "epic_id", epic.epic_id, ["epic_id"]) is not None:
             logger.info(
                 f"Epic {epic.epic_key} already exists in the database, will check if protocol has been updated"
             )
+            changes = self.epic_changes(epic)
+            # the update of a newer protocol writes the other changes of the epic as well
             if self.is_protocol_updated(epic):
-                self.update_epic_ticket_def("Epic ", epic, " protocol has been updated, will update the Epic")
-            if self.epic_changed(epic):
                 self.update_epic_ticket_def(
-                    "Epic ", epic, " has been altered, will update the ticket.", new_version=True
+                    "Epic ", epic, " protocol has been updated, will update the Epic", changes=changes
+                )
+            elif changes is None or changes:
+                self.update_epic_ticket_def(
+                    "Epic ", epic, " has been altered, will update the ticket.", new_version=True, changes=changes
                 )
         else:
             self.update_epic_ticket_def(
@@ -119,108 +178,216 @@ class ProtocolManager:
 
     def manage_subtasks_for_issue(self, issue_key: str) -> None:
         """Manage subtasks for a specific issue."""
-        issue = self.trias_issues.get_issue_by_key(issue_key)
-        cropseason_uuid = get_record_by_name(self.engine, FIELD_TRIAL, FIELD_NAME, issue.trial_id)[
-            FIELD_CROP_SEASON_UUID
-        ][0]
-        uploaded_data = get_record_by_uuid(self.engine, "uploaded_data", UPLOADED_CROPSEASON_UUID, cropseason_uuid)
-        if uploaded_data.empty:
-            logger.warning(f"No uploaded data found for {issue_key}.")
-            return
-        subtasks = self.trias_subtasks.get_subtasks_for_issue(issue_key)
-
-        self.create_or_update_subtasks(issue_key, uploaded_data, subtasks)
+        try:
+            issue = self.trias_issues.get_issue_by_key(issue_key)
+            if issue is None:
+                logger.error(f"Issue {issue_key} not found in Jira, its subtasks are not managed.")
+                self.failures.append(issue_key)
+                return
+            trial = self.get_trial(issue.trial_id)
+            if trial is None:
+                logger.warning(f"No trial {issue.trial_id} found for {issue_key}.")
+                return
+            cropseason_uuid = trial.crop_season_uuid
+            uploaded_data = self.get_uploaded_data(cropseason_uuid)
+            if uploaded_data.empty:
+                logger.warning(f"No uploaded data found for {issue_key}.")
+                return
+            subtasks = self.get_subtasks_for_issue(issue_key)
+            self.create_or_update_subtasks(issue_key, uploaded_data, subtasks)
+        except Exception as e:
+            logger.error(f"Error managing subtasks of issue {issue_key}: {e}")
+            self.failures.append(issue_key)
+        finally:
+            self.failures.extend(self.trias_jira.write_buffer.flush())
 
+    def manage_single_issue(self, issue: JiraIssue, epic: Optional[JiraEpic] = None) -> None:
+        """Update one trial ticket from its trial and manage its subtasks, without reconciling the rest of its epic."""
+        try:
+            trial = self.get_trial(issue.trial_id)
+            if trial is None:
+                logger.warning(f"No trial {issue.trial_id} found for {issue.issue_key}.")
+                return
+            if epic is None and issue.epic_link:
+                epic = self.trias_epics.get_epic_by_key(issue.epic_link)
+            if epic is not None:
+                self.handle_existing_issue(epic, issue, trial)
+            else:
+                logger.warning(f"Issue {issue.issue_key} is not linked to an epic, only its subtasks are managed.")
+        except Exception as e:
+            logger.error(f"Error managing issue {issue.issue_key}: {e}")
+            self.failures.append(issue.issue_key)
+        finally:
+            self.failures.extend(self.trias_jira.write_buffer.flush())
+        self.manage_subtasks_for_issue(issue.issue_key)
+
+    def get_issues_for_epic(self, epic_key: str) -> List[JiraIssue]:
+        """Get the issues of an epic from the prefetched hierarchy, falling back to a Jira search."""
+        if self.hierarchy is not None:
+            issues = self.hierarchy.issues_for_epic(epic_key)
+            if issues is not None:
+                return issues
+        return self.trias_issues.get_issues_for_epic(epic_key)
+
+    def get_subtasks_for_issue(self, issue_key: str) -> List[JiraSubTask]:
+        """Get the subtasks of an issue from the prefetched hierarchy, falling back to a Jira search."""
+        if self.hierarchy is not None:
+            subtasks = self.hierarchy.subtasks_for_issue(issue_key)
+            if subtasks is not None:
+                return subtasks
+        return self.trias_subtasks.get_subtasks_for_issue(issue_key)
 
     def create_or_update_subtasks(
         self, issue_key: str, uploaded_data: pd.DataFrame, subtasks: List[JiraSubTask]
     ) -> None:
         """Create new subtasks in Jira if they don't exist and update existing subtasks."""
+        new_rows = []
+        has_existing_rows = False
         for _, row in uploaded_data.iterrows():
-            if row[FIELD_FILE_UUID] not in [subtask.file_uuid for subtask in subtasks] and get_record_by_uuid(
-                self.engine, "sub_tasks", FIELD_FILE_UUID, row[FIELD_FILE_UUID]
-            ).empty:
-                subtask_id = self.create_subtask_in_jira(issue_key, row)
-                subtask = self.trias_subtasks.get_issue_by_key(subtask_id)
-                self.upsert_subtask(subtask)
+            if (
+                row[FIELD_FILE_UUID] not in [subtask.file_uuid for subtask in subtasks]
+                and fetch_one(self.engine, "sub_tasks", FIELD_FILE_UUID, row[FIELD_FILE_UUID], [FIELD_FILE_UUID])
+                is None
+            ):
+                new_rows.append(row)
             else:
-                for subtask in subtasks:
-                    if self.subtask_changed(subtask):
-                        self.upsert_subtask(subtask)
+                has_existing_rows = True
+
+        # the changes of all subtasks of the issue and all new ones are written in one batch
+        to_write = []
+        for subtask in subtasks if has_existing_rows else []:
+            changes = self.subtask_changes(subtask)
+            if changes is None or changes:
+                to_write.append((self.record("sub_tasks", subtask), changes))
+        for subtask_id in self.create_subtasks_in_jira(issue_key, new_rows):
+            if subtask_id is None:
+                continue
+            subtask = self.trias_subtasks.get_issue_by_key(subtask_id)
+            if self.hierarchy is not None:
+                self.hierarchy.add_subtask(issue_key, subtask)
+            to_write.append((self.record("sub_tasks", subtask), None))
+        self.write_changes("sub_tasks", to_write)
 
     def manage_trials_for_epic(self, epic: JiraEpic) -> None:
         """Query trials linked to an epic and create new tickets for any that have been updated or are not already created."""
-        try:
-            protocol_uuid = get_record_by_name(self.engine, FIELD_PROTOCOL, FIELD_NAME, epic.protocol_id)[
-                FIELD_UUID
-            ].iloc[0]
-        except Exception as e:
-            logger.error(f"Failed to get protocol UUID for {epic.protocol_id}: {e}")
+        protocol = self.get_protocol(epic.protocol_id)
+        if protocol is None:
+            logger.error(f"Failed to get protocol UUID for {epic.protocol_id}: protocol not found")
             return
-        trials = get_record_by_uuid(self.engine, "trial", "protocol_uuid", protocol_uuid)
-        existing_issues = self.trias_issues.get_issues_for_epic(epic.epic_key)
+        protocol_uuid = protocol.uuid
+        trials = self.get_trials_for_protocol(protocol_uuid)
+        existing_issues = self.get_issues_for_epic(epic.epic_key)
         existing_issue_dict = {issue.summary: issue for issue in existing_issues}
 
-        for trial in trials.itertuples(index=False):
+        new_trials = []
+        for trial in trials:
             if trial.name in existing_issue_dict:
                 self.handle_existing_issue(epic, existing_issue_dict[trial.name], trial)
             else:
                 logger.info(f"Creating new issue for trial {trial.name} in epic {epic.epic_key}")
-                self.create_new_issue(epic, trial)
+                new_trials.append(trial)
+        self.create_new_issues(epic, new_trials)
 
     def handle_existing_issue(self, epic: JiraEpic, existing_issue: JiraIssue, trial: Trial) -> None:
         """Handle an existing issue linked to an epic."""
         logger.info(f"Trial {trial.name} already exists in JIRA, checking for updates.")
+        # the issue holds the current Jira state (staged updates included), no need to re-fetch it for the upsert
+        changes = self.issue_changes(existing_issue)
         if self.is_trial_updated(existing_issue):
+            before = self.record("issues", existing_issue)
             self.update_jira_ticket(epic, existing_issue, trial)
-            existing_issue = self.trias_issues.get_issue_by_key(existing_issue.issue_key)
-            self.upsert_issue(existing_issue)
-        elif self.issue_changed(existing_issue):
-            existing_issue = self.trias_issues.get_issue_by_key(existing_issue.issue_key)
-            self.upsert_issue(existing_issue)
+            if not self.flush_ticket(existing_issue.issue_key):
+                return
+            after = self.record("issues", existing_issue)
+            self.write_changes("issues", [(after, None if changes is None else merge_changes(changes, before, after))])
+        elif changes is None or changes:
+            self.write_changes("issues", [(self.record("issues", existing_issue), changes)])
 
     def create_new_issue(self, epic: JiraEpic, trial: Trial) -> None:
         """Create a new issue linked to an epic."""
-        issue_key = self.create_jira_ticket_with_epic_link(epic, trial)
-        logger.info(f"New issue created for trial {trial.name}: {issue_key}")
-        self.trias_jira.jira_connection.add_issues_to_epic(epic.epic_key, [issue_key])
-        self.attach_images_or_maps(issue_key, trial)
+        self.create_new_issues(epic, [trial])
+
+    def create_new_issues(self, epic: JiraEpic, trials: List[Trial]) -> None:
+        """Create the issues of new trials in bulk and link them to the epic with a single request."""
+        if not trials:
+            return
+        assignee_info = search_user(self.trias_jira, epic.assignee_email)
+        logger.info(f"Assignee info: {assignee_info}")
+        field_list = [self.build_trial_ticket_fields(epic, trial, assignee_info) for trial in trials]
+        results = create_jira_tickets(self.trias_jira, field_list)
+
+        created = []
+        for trial, result in zip(trials, results):
+            if result.key is None:
+                logger.error(f"Failed to create issue for trial {trial.name} in epic {epic.epic_key}: {result.error}")
+                self.failures.append(trial.name)
+            else:
+                logger.info(f"New issue created for trial {trial.name}: {result.key}")
+                created.append((trial, result.key))
+        if not created:
+            return
+
+        try:
+            self.trias_jira.jira_connection.add_issues_to_epic(epic.epic_key, [key for _, key in created])
+        except Exception as e:
+            logger.error(f"Failed to link {len(created)} new issues to epic {epic.epic_key}: {e}")
+            self.failures.append(epic.epic_key)
+
         jira_transition_manager = JiraTransitionManager(self.trias_jira)
-        jira_transition_manager.transition_issue(issue_key, STATUS_WAITING_FOR_DATA)
-        new_issue = self.trias_issues.get_issue_by_key(issue_key)
-        self.upsert_issue(new_issue)
+        new_issues = []
+        for trial, issue_key in created:
+            self.attach_images_or_maps(issue_key, trial)
+            # load the whole projection once, the transition and the upsert below are then served by the identity map
+            self.trias_jira.get_issue(issue_key, ISSUE_JIRA_FIELDS)
+            jira_transition_manager.transition_issue(issue_key, STATUS_WAITING_FOR_DATA)
+            new_issue = self.trias_issues.get_issue_by_key(issue_key)
+            if self.hierarchy is not None:
+                self.hierarchy.add_issue(epic.epic_key, new_issue)
+            new_issues.append(new_issue)
+        self.upsert_issues(new_issues)
 
     def is_valid_epic_name(self, epic_name: str) -> bool:
         """Check if the epic name is valid."""
         return re.match(EPIC_NAME_PATTERN, epic_name) is not None
 
     def update_epic_ticket_def(
-        self, logger_f_string_1: str, epic: JiraEpic, logger_f_string_2: str, new_version: bool = False
+        self,
+        logger_f_string_1: str,
+        epic: JiraEpic,
+        logger_f_string_2: str,
+        new_version: bool = False,
+        changes: Optional[Dict[str, FieldChange]] = None,
     ) -> None:
+        """Update the Jira epic and write it to the database, only the changed columns if its changes are given."""
         logger.info(f"{logger_f_string_1}{epic.epic_key}{logger_f_string_2}")
+        before = self.record("epics", epic)
         self.update_epic_ticket(epic)
-        epic = self.trias_epics.get_epic_by_key(epic.epic_key)
-        self.upsert_epic(epic, new_version)
+        if not self.flush_ticket(epic.epic_key):
+            return
+        after = self.record("epics", epic)
+        self.write_changes(
+            "epics", [(after, None if changes is None else merge_changes(changes, before, after))], new_version
+        )
 
     def is_protocol_updated(self, epic: JiraEpic) -> bool:
         """Check if the protocol associated with the epic is updated."""
-        protocol_result = get_record_by_name(self.engine, FIELD_PROTOCOL, FIELD_NAME, epic.protocol_id)
-        if (
-            not protocol_result.empty
-            and epic.last_updated
-            and protocol_result["last_updated"].iloc[0] > epic.last_updated
-        ):
+        protocol = self.get_protocol(epic.protocol_id)
+        if protocol is not None and epic.last_updated and protocol.last_updated > epic.last_updated:
             logger.info(f"Found newer protocol for Epic {epic.epic_key}, description will be updated.")
             return True
         return False
 
     def epic_changed(self, epic: JiraEpic) -> bool:
         """Check if the epic has been updated."""
-        epics_db = get_record_by_id(self.engine, "epics", "epic_id", epic.epic_id)
-        if not epics_db.empty:
-            return compare_fields(epics_db, EPIC_FIELDS, epic, EPIC_SCHEMA)
-        logger.warning(f"Epic {epic.epic_key} not found in the database, will generate epic")
-        return True
+        changes = self.epic_changes(epic)
+        return changes is None or bool(changes)
+
+    def epic_changes(self, epic: JiraEpic) -> Optional[Dict[str, FieldChange]]:
+        """Changes of the epic against the database, None if it is not in the database."""
+        changes = self.field_changes("epics", self.record("epics", epic))
+        if changes is None:
+            logger.warning(f"Epic {epic.epic_key} not found in the database, will generate epic")
+        return changes
 
     def check_unseen_protocol_ids(self, epic_name: str, protocol_id: str) -> bool:
         """Check for new/unseen protocol IDs in epic names."""
@@ -228,13 +395,12 @@ class ProtocolManager:
         return True
 
     def update_epic_fields(self, epic: JiraEpic, new_description: str, labels: List[str]) -> None:
-        """Update the description and labels of a Jira epic."""
-        issue = self.trias_jira.jira_connection.issue(epic.epic_key)
-        issue.update(fields={"description": new_description, "labels": labels})
+        """Stage an update of the description and labels of a Jira epic, written when the write buffer is flushed."""
+        self.trias_jira.write_buffer.stage(epic, {"description": new_description, "labels": labels})
 
     def update_epic_ticket(self, epic: JiraEpic) -> None:
         """Update the JIRA epic ticket and the epic database."""
-        protocol_result = get_record_by_name(self.engine, FIELD_PROTOCOL, FIELD_NAME, epic.protocol_id)
+        protocol_result = self.get_protocol(epic.protocol_id)
         epic_description = create_jira_description(epic.description, protocol_result, EPIC_DESC_COLUMNS)
         labels = create_labels(epic)
         logger.info(f"Updating epic {epic.epic_id} with new description and labels {labels}.")
@@ -242,6 +408,15 @@ class ProtocolManager:
 
     def create_jira_ticket_with_epic_link(self, epic: JiraEpic, trial: Trial) -> Optional[str]:
         """Create a Jira ticket linked to an epic."""
+        assignee_info = search_user(self.trias_jira, epic.assignee_email)
+        logger.info(f"Assignee info: {assignee_info}")
+        results = create_jira_tickets(self.trias_jira, [self.build_trial_ticket_fields(epic, trial, assignee_info)])
+        if results[0].key is None:
+            logger.error(f"Failed to create ticket for trial {trial.name}: {results[0].error}")
+        return results[0].key
+
+    def build_trial_ticket_fields(self, epic: JiraEpic, trial: Trial, assignee_info: Tuple[str, str]) -> dict:
+        """Build the create payload of the Jira ticket of a trial."""
         labels = create_labels(epic)
         farm_field_labels = self.add_field_farm_as_labels(trial)
         labels = [label.replace(" ", "-") for label in labels]
@@ -254,13 +429,11 @@ class ProtocolManager:
             field_name=farm_field_labels[1],
         )
 
-        assignee_info = search_user(self.trias_jira, epic.assignee_email)
-        logger.info(f"Assignee info: {assignee_info}")
         if len(assignee_info) > 0:
             account_id, assignee_name = assignee_info[0], assignee_info[1]
         else:
             account_id, assignee_name = None, None
-        
+
         custom_fields = {
             f"customfield_{CUSTOM_FIELD_MAPPING['Trial-ID']}": trial.name,
             f"customfield_{CUSTOM_FIELD_MAPPING['Trial Engineer']}": {
@@ -269,8 +442,7 @@ class ProtocolManager:
             },
         }
 
-        return create_jira_ticket(
-            self.trias_jira,
+        return build_jira_ticket_fields(
             str(self.trias_jira.project_id),
             trial.name,
             ticket_description,
@@ -285,93 +457,233 @@ class ProtocolManager:
         """Update an existing Jira ticket linked to an epic."""
         ticket_description = create_jira_description(issue_exisitng.description, trial, TRIAL_DESC_COLUMNS, epic=False)
         fields = {"description": ticket_description}
-        try:
-            issue = self.trias_jira.jira_connection.issue(issue_exisitng.issue_key)
-            issue.update(fields=fields)
-            logger.info(f"Ticket updated for {epic.protocol_id}: {issue.key}")
-        except Exception as e:
-            logger.error(f"Failed to update ticket for {epic.epic_key}: {e}")
+        self.trias_jira.write_buffer.stage(issue_exisitng, fields)
+        logger.info(f"Ticket update staged for {epic.protocol_id}: {issue_exisitng.issue_key}")
 
     def is_trial_updated(self, issue_exisitng: JiraIssue) -> bool:
         """Check if the trial has been updated."""
-        trial_result = get_record_by_name(self.engine, FIELD_TRIAL, FIELD_NAME, issue_exisitng.summary)
-        if not trial_result.empty and trial_result["last_updated"].iloc[0] > issue_exisitng.last_updated:
+        trial = self.get_trial(issue_exisitng.summary)
+        if trial is not None and trial.last_updated > issue_exisitng.last_updated:
             logger.info(f"Found newer trial {issue_exisitng.summary}, description will be updated.")
             return True
         return False
 
     def issue_changed(self, issue: JiraIssue) -> bool:
         """Check if the issue has been updated."""
-        issues_db = get_record_by_id(self.engine, "issues", "issue_id", issue.issue_id)
-        if not issues_db.empty:
-            return compare_fields(issues_db, ISSUE_FIELDS, issue, ISSUE_SCHEMA)
-        logger.warning(f"Issue {issue.issue_key} not found in the database, will generate issue")
-        return True
+        changes = self.issue_changes(issue)
+        return changes is None or bool(changes)
+
+    def issue_changes(self, issue: JiraIssue) -> Optional[Dict[str, FieldChange]]:
+        """Changes of the issue against the database, None if it is not in the database."""
+        changes = self.field_changes("issues", self.record("issues", issue))
+        if changes is None:
+            logger.warning(f"Issue {issue.issue_key} not found in the database, will generate issue")
+        return changes
 
     def add_field_farm_as_labels(self, trial: Trial) -> List[str]:
         """Add farm and field labels to the JIRA ticket based on the protocol ID."""
-        field_name, farm_uuid = query_farm_field_names(self.engine, trial.field_uuid, "field")
-        farm_name = query_farm_field_names(self.engine, farm_uuid, "farm")
+        field_name, farm_uuid = self.get_farm_field_names(trial.field_uuid, "field")
+        farm_name = self.get_farm_field_names(farm_uuid, "farm")
         return [farm_name, field_name]
 
+    def get_protocol(self, protocol_name: str) -> Optional[sa.Row]:
+        """Get a protocol by name from the preloaded source index, falling back to the database."""
+        if self.source_index and self.source_index.has("protocol", protocol_name):
+            return self.source_index.protocol(protocol_name)
+        return fetch_one(self.engine, FIELD_PROTOCOL, FIELD_NAME, protocol_name, PROTOCOL_COLUMNS)
+
+    def get_trial(self, trial_name: str) -> Optional[sa.Row]:
+        """Get a trial by name from the preloaded source index, falling back to the database."""
+        if self.source_index and self.source_index.has("trial", trial_name):
+            return self.source_index.trial(trial_name)
+        return fetch_one(self.engine, FIELD_TRIAL, FIELD_NAME, trial_name, TRIAL_COLUMNS)
+
+    def get_trials_for_protocol(self, protocol_uuid: str) -> List[sa.Row]:
+        """Get the trials of a protocol from the preloaded source index, falling back to the database."""
+        if self.source_index and self.source_index.has("trials_of_protocol", protocol_uuid):
+            return self.source_index.trials_for_protocol(protocol_uuid)
+        return fetch_all(self.engine, FIELD_TRIAL, FIELD_PROTOCOL_UUID, protocol_uuid, TRIAL_COLUMNS)
+
+    def get_uploaded_data(self, cropseason_uuid: str) -> pd.DataFrame:
+        """Get the uploaded files of a crop season from the preloaded source index, falling back to the database."""
+        if self.source_index and self.source_index.has("uploaded_data", cropseason_uuid):
+            return self.source_index.uploaded_data(cropseason_uuid)
+        return get_record_by_uuid(self.engine, UPLOADED_DATA_TABLE, UPLOADED_CROPSEASON_UUID, cropseason_uuid)
+
+    def get_farm_field_names(self, uuid: str, entity: str):
+        """Get farm or field names from the preloaded source index, falling back to the database."""
+        if self.source_index and self.source_index.has(entity, uuid):
+            return self.source_index.farm_field_names(uuid, entity)
+        return query_farm_field_names(self.engine, uuid, entity)
+
     def create_subtask_in_jira(self, parent_issue_key: str, subtask_data: pd.Series) -> Optional[str]:
         """Create a subtask in Jira."""
-        parent_issue = self.trias_jira.jira_connection.issue(parent_issue_key)
+        return self.create_subtasks_in_jira(parent_issue_key, [subtask_data])[0]
+
+    def create_subtasks_in_jira(self, parent_issue_key: str, rows: List[pd.Series]) -> List[Optional[str]]:
+        """Create the subtasks of uploaded files in bulk under one parent issue.
+
+        :param parent_issue_key: Key of the parent issue.
+        :param rows: Uploaded data rows, one per subtask.
+        :return: Key of the new subtask of each row, None where the creation failed.
+        """
+        if not rows:
+            return []
+        parent_issue = self.trias_jira.get_issue(parent_issue_key, ISSUE_JIRA_FIELDS)
         labels = parent_issue.fields.labels
         if parent_issue.fields.assignee:
             assignee = parent_issue.fields.assignee.name
         else:
             assignee = None
 
-        summary = f"{parent_issue.fields.summary}_{subtask_data['type']}"
-        description = create_jira_description(
-            None,
-            subtask_data.to_frame().T,
-            columns=subtask_data.index.tolist(),
-            epic=False,
-        )
-
-        custom_fields = {}
-
-        new_subtask_key = create_jira_ticket(
-            self.trias_jira,
-            str(self.trias_jira.project_id),
-            summary,
-            description,
-            "Sub-task",
-            parent_issue_key,
-            labels,
-            assignee,
-            custom_fields,
-        )
+        field_list = []
+        for subtask_data in rows:
+            summary = f"{parent_issue.fields.summary}_{subtask_data['type']}"
+            description = create_jira_description(
+                None,
+                subtask_data.to_frame().T,
+                columns=subtask_data.index.tolist(),
+                epic=False,
+            )
+            field_list.append(
+                build_jira_ticket_fields(
+                    str(self.trias_jira.project_id),
+                    summary,
+                    description,
+                    "Sub-task",
+                    parent_issue_key,
+                    labels,
+                    assignee,
+                    {},
+                )
+            )
 
-        if new_subtask_key:
-            jira_transition_manager = JiraTransitionManager(self.trias_jira)
-            jira_transition_manager.transition_issue(new_subtask_key, STATUS_WAITING)
-        return new_subtask_key
+        jira_transition_manager = JiraTransitionManager(self.trias_jira)
+        new_subtask_keys = []
+        for subtask_data, result in zip(rows, create_jira_tickets(self.trias_jira, field_list)):
+            if result.key is None:
+                logger.error(
+                    f"Failed to create subtask for file {subtask_data[FIELD_FILE_UUID]} "
+                    f"of issue {parent_issue_key}: {result.error}"
+                )
+                self.failures.append(parent_issue_key)
+            else:
+                self.trias_jira.get_issue(result.key, SUBTASK_JIRA_FIELDS)
+                jira_transition_manager.transition_issue(result.key, STATUS_WAITING)
+            new_subtask_keys.append(result.key)
+        return new_subtask_keys
 
     def subtask_changed(self, subtask: JiraSubTask) -> bool:
         """Check if the subtask has been updated."""
-        subtasks_db = get_record_by_uuid(self.engine, "sub_tasks", FIELD_FILE_UUID, subtask.file_uuid)
-        if not subtasks_db.empty:
-            return compare_fields(subtasks_db, SUBTASK_FIELDS, subtask, SUBTASK_SCHEMA)
-        logger.warning(f"Subtask {subtask.subtask_key} not found in the database, will generate subtask")
+        changes = self.subtask_changes(subtask)
+        return changes is None or bool(changes)
+
+    def subtask_changes(self, subtask: JiraSubTask) -> Optional[Dict[str, FieldChange]]:
+        """Changes of the subtask against the database, None if it is not in the database."""
+        changes = self.field_changes("sub_tasks", self.record("sub_tasks", subtask))
+        if changes is None:
+            logger.warning(f"Subtask {subtask.subtask_key} not found in the database, will generate subtask")
+        return changes
+
+    def record(self, table_name: str, entity: Any) -> Dict[str, Any]:
+        """Tracked field values of an epic, issue or subtask, keyed by column of its mirror table."""
+        return {field: getattr(entity, field) for field in FINGERPRINT_TABLES[table_name]["fields"]}
+
+    def field_changes(self, table_name: str, record: dict) -> Optional[Dict[str, FieldChange]]:
+        """Changes of a ticket against its mirror row, None if the ticket is not in the database.
+
+        The preloaded fingerprints and batch comparison answer most tickets, the others are compared on their own.
+        """
+        if self.fingerprints is not None:
+            changes = self.fingerprints.changes(table_name, record)
+            if changes is not None:
+                return changes
+        comparator = COMPARATORS[table_name]
+        db_rows = fetch_all(self.engine, table_name, comparator.key, record[comparator.key])
+        if not db_rows:
+            return None
+        return comparator.diff([record], db_rows)[str(record[comparator.key])]
+
+    def flush_ticket(self, key: str) -> bool:
+        """Write the staged updates of a ticket to Jira before its row is written, False if the update failed."""
+        if key in self.trias_jira.write_buffer.flush([key]):
+            logger.warning(f"{key} was not updated in Jira, its database row is left unchanged.")
+            self.failures.append(key)
+            return False
         return True
 
+    def write_changes(
+        self,
+        table_name: str,
+        changed_records: List[Tuple[dict, Optional[Dict[str, FieldChange]]]],
+        new_version: bool = False,
+    ) -> bool:
+        """Write tickets to their mirror table: the changed columns of known rows, whole records for new ones.
+
+        :param table_name: epics, issues or sub_tasks.
+        :param changed_records: Records with their changes, None for records that are not in the database yet.
+        :param new_version: Store the written records as a new version.
+        :return: False if any of the writes failed. Only written records are remembered as unchanged, the others are
+            added to the failures.
+        """
+        id_column = UPSERT_TABLES[table_name]["id_column"]
+        new_records = [record for record, changes in changed_records if changes is None]
+        updates = [(record, changes) for record, changes in changed_records if changes]
+        new_version_ids = [record[id_column] for record, _ in changed_records] if new_version else []
+        written = True
+        if new_records:
+            if upsert_records(self.engine, table_name, new_records, new_version_ids):
+                self.remember_fingerprints(table_name, new_records)
+            else:
+                self.failures.extend(str(record[id_column]) for record in new_records)
+                written = False
+        if updates:
+            if update_records(self.engine, table_name, updates, new_version_ids):
+                self.remember_fingerprints(table_name, [record for record, _ in updates])
+            else:
+                self.failures.extend(str(record[id_column]) for record, _ in updates)
+                written = False
+        return written
+
+    def remember_fingerprints(self, table_name: str, records: List[dict]) -> None:
+        """Keep the preloaded fingerprints in line with the records written during the run."""
+        if self.fingerprints is not None:
+            for record in records:
+                self.fingerprints.remember(table_name, record)
+
     def upsert_issue(self, issue: JiraIssue) -> None:
         """Upsert the issue information into the database."""
         issue_dict = {field: getattr(issue, field) for field in ISSUE_FIELDS}
-        upsert_record(self.engine, "issues", issue_dict, issue.issue_id, "issue_id", ISSUE_SCHEMA)
+        if upsert_record(self.engine, "issues", issue_dict, issue.issue_id, "issue_id", ISSUE_SCHEMA):
+            self.remember_fingerprints("issues", [issue_dict])
+        else:
+            self.failures.append(issue.issue_key)
 
     def upsert_epic(self, epic: JiraEpic, new_version: bool = False) -> None:
         """Upsert the epic information into the database."""
         epic_dict = {field: getattr(epic, field) for field in EPIC_FIELDS}
-        upsert_record(self.engine, "epics", epic_dict, epic.epic_id, "epic_id", EPIC_SCHEMA, new_version)
+        if upsert_record(self.engine, "epics", epic_dict, epic.epic_id, "epic_id", EPIC_SCHEMA, new_version):
+            self.remember_fingerprints("epics", [epic_dict])
+        else:
+            self.failures.append(epic.epic_key)
 
     def upsert_subtask(self, subtask: JiraSubTask) -> None:
         """Upsert the subtask information into the database."""
         subtask_dict = {field: getattr(subtask, field) for field in SUBTASK_FIELDS}
-        upsert_record(self.engine, "sub_tasks", subtask_dict, subtask_dict["subtask_key"], "subtask_key", SUBTASK_SCHEMA)
+        subtask_key = subtask_dict["subtask_key"]
+        if upsert_record(self.engine, "sub_tasks", subtask_dict, subtask_key, "subtask_key", SUBTASK_SCHEMA):
+            self.remember_fingerprints("sub_tasks", [subtask_dict])
+        else:
+            self.failures.append(subtask_key)
+
+    def upsert_issues(self, issues: List[JiraIssue]) -> None:
+        """Upsert the information of several issues into the database in one transaction."""
+        if issues:
+            records = [{field: getattr(issue, field) for field in ISSUE_FIELDS} for issue in issues]
+            if upsert_records(self.engine, "issues", records):
+                self.remember_fingerprints("issues", records)
+            else:
+                self.failures.extend(issue.issue_key for issue in issues)
 
     def attach_images_or_maps(self, ticket_key: str, trial: Trial) -> None:
         """Attach map images to a JIRA ticket."""
@@ -405,9 +717,14 @@ class ProtocolManager:
 
 @dataclass
 class JiraTransitionManager:
-    """Class for managing Jira issue transitions."""
+    """Class for managing Jira issue transitions.
+
+    Transitions follow the precomputed shortest path through the workflow. Set verify_transitions to check each hop
+    against the transitions Jira offers (fetched once per issue type and status and cached for the run).
+    """
 
     trias_jira: TriasJira
+    verify_transitions: bool = False
 
     def update_status(self, issue_key: str, transition_id: str) -> None:
         """Update the status of a Jira issue."""
@@ -415,52 +732,56 @@ class JiraTransitionManager:
 
     def transition_issue(self, issue_key: str, target_status: str) -> None:
         """Transition an issue to the target status."""
-        issue = self.trias_jira.jira_connection.issue(issue_key)
+        issue = self.trias_jira.get_issue(issue_key, STATUS_JIRA_FIELDS)
         current_status_id = issue.fields.status.id
 
-        if issue.fields.issuetype.name == "Sub-task":
+        if issue.fields.issuetype.name == SUBTASK_ISSUE_TYPE:
             self.transition_subtask(issue_key, current_status_id, target_status)
         else:
-            self.transition_standard_issue(issue_key, current_status_id, target_status)
+            self.transition_standard_issue(issue_key, current_status_id, target_status, issue.fields.issuetype.name)
 
-    def transition_standard_issue(self, issue_key: str, current_status_id: str, target_status: str) -> None:
+    def transition_standard_issue(
+        self, issue_key: str, current_status_id: str, target_status: str, issue_type: str = TRIAL_ISSUE_TYPE
+    ) -> None:
         """Transition a standard issue to the target status."""
-        target_status_id = STATUS_MAPPING[target_status]  # Get the target status ID from the mapping
-
-        while current_status_id != target_status_id:
-            if current_status_id in WORKFLOW_TRANSITIONS:
-                possible_transitions = WORKFLOW_TRANSITIONS[current_status_id]
-                if target_status in possible_transitions:
-                    next_transition_id = possible_transitions[target_status]
-                else:
-                    # If the direct transition is not available, take the first available transition
-                    next_transition_id = list(possible_transitions.values())[0]
-                logger.info(
-                    f"Transitioning issue {issue_key} from {current_status_id} to next status with transition ID {next_transition_id}"
-                )
-                self.update_status(issue_key, next_transition_id)
-                issue = self.trias_jira.jira_connection.issue(issue_key)
-                current_status_id = issue.fields.status.id
-            else:
-                raise ValueError(f"No transition defined for status ID {current_status_id}")
+        self.execute_plan(issue_key, issue_type, STANDARD_WORKFLOW, current_status_id, target_status)
 
     def transition_subtask(self, issue_key: str, current_status_id: str, target_status: str) -> None:
         """Transition a subtask to the target status."""
-        target_status_id = SUBTASKS_STATUS_MAPPING[target_status]  # Get the target status ID from the subtask mapping
-
-        while current_status_id != target_status_id:
-            if current_status_id not in SUBTASKS_WORKFLOW:
-                raise ValueError(f"No transition defined for status ID {current_status_id}")
-            possible_transitions = SUBTASKS_WORKFLOW[current_status_id]
-            next_transition_id = (
-                possible_transitions[target_status_id]
-                if target_status_id in possible_transitions
-                else list(possible_transitions.values())[0]
-            )
-            logger.info(possible_transitions)
+        self.execute_plan(issue_key, SUBTASK_ISSUE_TYPE, SUBTASK_WORKFLOW, current_status_id, target_status)
+
+    def execute_plan(
+        self,
+        issue_key: str,
+        issue_type: str,
+        planner: WorkflowPlanner,
+        current_status_id: str,
+        target_status: str,
+    ) -> None:
+        """Execute the shortest transition path to the target status and verify the final status once."""
+        path = planner.plan(current_status_id, target_status)
+        if not path:
+            return
+        for transition_id, next_status_id in path:
+            if self.verify_transitions:
+                available = TRANSITION_METADATA.available(
+                    self.trias_jira.jira_connection, issue_key, issue_type, current_status_id
+                )
+                if str(transition_id) not in available:
+                    raise ValueError(
+                        f"Transition {transition_id} is not available for {issue_key} in status {current_status_id}"
+                    )
             logger.info(
-                f"Transitioning sub-task { issue_key} from {current_status_id} to next status with transition ID {next_transition_id}"
+                f"Transitioning {issue_key} from {current_status_id} to {next_status_id} "
+                f"with transition ID {transition_id}"
+            )
+            self.update_status(issue_key, transition_id)
+            current_status_id = next_status_id
+
+        self.trias_jira.identity_map.invalidate(issue_key, TRANSITION_CHANGED_FIELDS)
+        issue = self.trias_jira.get_issue(issue_key, sorted({*STATUS_JIRA_FIELDS, *TRANSITION_CHANGED_FIELDS}))
+        if current_status_id not in (issue.fields.status.id, issue.fields.status.name):
+            logger.error(
+                f"Issue {issue_key} ended in status {issue.fields.status.name} instead of {target_status} "
+                f"after {len(path)} transitions"
             )
-            self.update_status(issue_key, next_transition_id)
-            issue = self.trias_jira.jira_connection.issue(issue_key)
-            current_status_id = issue.fields.status.id
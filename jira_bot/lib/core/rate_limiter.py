@@ -0,0 +1,229 @@
+"""Adaptive request governor shared by all Jira calls of a run.
+
+Combines a token bucket (request rate) with an AIMD limit on the number of requests in flight. Throttled responses
+(429/503) halve both and are retried after Retry-After or a jittered exponential backoff; successful responses grow
+them again, so throughput settles at the highest rate the server tolerates. Jira Data Center X-RateLimit-* headers
+are used to align the bucket with the server's own limiter.
+"""
+
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime as dt
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Mapping, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from loguru import logger
+
+from jira_bot.lib.tools.constants import (
+    GOVERNOR_BACKOFF_BASE_SECONDS,
+    GOVERNOR_BACKOFF_MAX_SECONDS,
+    GOVERNOR_INITIAL_CONCURRENCY,
+    GOVERNOR_INITIAL_RATE,
+    GOVERNOR_MAX_CONCURRENCY,
+    GOVERNOR_MAX_RATE,
+    GOVERNOR_MAX_RETRIES,
+    GOVERNOR_MIN_RATE,
+    THROTTLED_STATUS_CODES,
+)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header given as seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        try:
+            return max(0.0, (parsedate_to_datetime(value) - dt.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+
+
+@dataclass
+class TokenBucket:
+    """Thread-safe token bucket refilled at `rate` tokens per second."""
+
+    rate: float
+    capacity: float
+    _tokens: float = field(init=False)
+    _updated: float = field(init=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def __post_init__(self):
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """Take a token, blocking until one is available. Returns the time waited in seconds."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def drain(self) -> None:
+        """Empty the bucket, e.g. when the server reports no remaining requests."""
+        with self._lock:
+            self._refill()
+            self._tokens = 0.0
+
+
+@dataclass
+class RequestGovernor:
+    """Rate limiter with Retry-After handling and AIMD concurrency tuning for Jira requests."""
+
+    rate: float = GOVERNOR_INITIAL_RATE
+    min_rate: float = GOVERNOR_MIN_RATE
+    max_rate: float = GOVERNOR_MAX_RATE
+    concurrency: float = GOVERNOR_INITIAL_CONCURRENCY
+    max_concurrency: int = GOVERNOR_MAX_CONCURRENCY
+    max_retries: int = GOVERNOR_MAX_RETRIES
+    backoff_base: float = GOVERNOR_BACKOFF_BASE_SECONDS
+    backoff_max: float = GOVERNOR_BACKOFF_MAX_SECONDS
+
+    def __post_init__(self):
+        self.bucket = TokenBucket(rate=self.rate, capacity=max(1.0, self.rate))
+        self._in_flight = 0
+        self._condition = threading.Condition()
+        self._counters: Dict[str, float] = {
+            "requests": 0,
+            "throttled": 0,
+            "retries": 0,
+            "failed": 0,
+            "wait_seconds": 0.0,
+        }
+
+    def acquire(self) -> None:
+        """Block until the request may be sent (a slot in flight and a token are available)."""
+        start = time.monotonic()
+        with self._condition:
+            while self._in_flight >= int(self.concurrency):
+                self._condition.wait()
+            self._in_flight += 1
+        self.bucket.acquire()
+        with self._condition:
+            self._counters["requests"] += 1
+            self._counters["wait_seconds"] += time.monotonic() - start
+
+    def release(self, status_code: Optional[int], headers: Mapping[str, str]) -> Optional[float]:
+        """Record the outcome of a request and adapt the limits.
+
+        :return: Seconds to wait before retrying a throttled request, None if the response was not throttled.
+        """
+        throttled = status_code in THROTTLED_STATUS_CODES
+        with self._condition:
+            self._in_flight -= 1
+            if throttled:
+                # multiplicative decrease
+                self._counters["throttled"] += 1
+                self.concurrency = max(1.0, self.concurrency / 2)
+                self._set_rate(self.rate / 2)
+            elif status_code is not None and status_code < 500:
+                # additive increase, roughly +1 request in flight per window of successful requests
+                self.concurrency = min(float(self.max_concurrency), self.concurrency + 1 / self.concurrency)
+                self._set_rate(self.rate + 0.1)
+            self._apply_rate_limit_headers(headers)
+            self._condition.notify_all()
+        return parse_retry_after(headers.get("Retry-After")) if throttled else None
+
+    def _set_rate(self, rate: float) -> None:
+        self.rate = min(self.max_rate, max(self.min_rate, rate))
+        self.bucket.rate = self.rate
+        self.bucket.capacity = max(1.0, self.rate)
+
+    def _apply_rate_limit_headers(self, headers: Mapping[str, str]) -> None:
+        """Align the bucket with Jira Data Center's X-RateLimit-* headers when they are present."""
+        try:
+            fill_rate = float(headers["X-RateLimit-FillRate"])
+            interval = float(headers.get("X-RateLimit-Interval-Seconds", 1))
+            self._set_rate(min(self.rate, fill_rate / interval))
+        except (KeyError, ValueError, ZeroDivisionError):
+            pass
+        if headers.get("X-RateLimit-Remaining") == "0":
+            self.bucket.drain()
+
+    def backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        """Delay before the next attempt: Retry-After if given, else exponential backoff with full jitter."""
+        jittered = random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+        return max(retry_after, jittered) if retry_after is not None else jittered
+
+    def send(self, send_request: Callable[[], requests.Response], retryable: bool = True) -> requests.Response:
+        """Send a request through the governor, retrying throttled responses.
+
+        :param send_request: Sends the request once and returns its response.
+        :param retryable: False for requests whose body cannot be sent again (streams, multipart encoders), their
+            throttled response is returned as is.
+        """
+        for attempt in range(self.max_retries + 1 if retryable else 1):
+            self.acquire()
+            try:
+                response = send_request()
+            except Exception:
+                self.release(None, {})
+                with self._condition:
+                    self._counters["failed"] += 1
+                raise
+            retry_after = self.release(response.status_code, response.headers)
+            if retry_after is None and response.status_code not in THROTTLED_STATUS_CODES:
+                return response
+            if not retryable or attempt == self.max_retries:
+                break
+            # release the connection of the throttled response to the pool before sending again
+            response.close()
+            delay = self.backoff(attempt, retry_after)
+            logger.warning(
+                f"Jira throttled {response.request.method if response.request else ''} request "
+                f"({response.status_code}), retrying in {delay:.1f}s"
+            )
+            with self._condition:
+                self._counters["retries"] += 1
+            time.sleep(delay)
+        with self._condition:
+            self._counters["failed"] += 1
+        return response
+
+    def metrics(self) -> Dict[str, float]:
+        """Current limiter state and counters."""
+        with self._condition:
+            return {
+                **self._counters,
+                "rate": round(self.rate, 2),
+                "concurrency_limit": int(self.concurrency),
+                "in_flight": self._in_flight,
+            }
+
+
+class GovernedHTTPAdapter(HTTPAdapter):
+    """requests adapter that sends every request through a RequestGovernor."""
+
+    def __init__(self, governor: RequestGovernor, **kwargs):
+        super().__init__(pool_maxsize=governor.max_concurrency, **kwargs)
+        self.governor = governor
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        # only bodies that are sent from memory can be replayed, streamed bodies are consumed by the first attempt
+        retryable = request.body is None or isinstance(request.body, (bytes, str))
+        return self.governor.send(lambda: super(GovernedHTTPAdapter, self).send(request, **kwargs), retryable)
+
+
+def install_governor(session: requests.Session, governor: RequestGovernor) -> None:
+    """Route all HTTP(S) requests of a session through the governor."""
+    adapter = GovernedHTTPAdapter(governor)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
@@ -0,0 +1,176 @@
+"""Trigger-driven mode: reconcile the tickets of source rows as soon as the ETL writes them, via Postgres NOTIFY.
+
+The notify triggers on the protocol, trial and uploaded_data tables are created by migrations/006.
+"""
+
+import json
+import select
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Optional, Set
+
+import sqlalchemy as sa
+from loguru import logger
+
+from jira_bot.lib.query import database
+from jira_bot.lib.query.database import fetch_all_by_keys
+from jira_bot.lib.tools.constants import (
+    FIELD_CROP_SEASON_UUID,
+    FIELD_PROTOCOL_UUID,
+    FIELD_TRIAL,
+    SOURCE_LISTENER_RECONNECT_SECONDS,
+    SOURCE_NOTIFY_CHANNEL,
+    SOURCE_NOTIFY_DEBOUNCE_SECONDS,
+)
+
+if TYPE_CHECKING:
+    from jira_bot.lib.core.protocol_manager import ProtocolManager
+
+@dataclass
+class SourceChanges:
+    """Protocols and crop seasons changed by a batch of notifications."""
+
+    tables: Set[str] = field(default_factory=set)
+    protocol_uuids: Set[str] = field(default_factory=set)
+    crop_season_uuids: Set[str] = field(default_factory=set)
+
+    def __bool__(self) -> bool:
+        return bool(self.tables)
+
+
+@dataclass
+class SourceChangeBatcher:
+    """Collect notifications and release them as one batch once the debounce window has passed.
+
+    The window starts at the first notification of a batch, so an ETL load writing rows continuously cannot postpone
+    reconciliation indefinitely.
+    """
+
+    window: float = SOURCE_NOTIFY_DEBOUNCE_SECONDS
+    _changes: SourceChanges = field(default_factory=SourceChanges, init=False, repr=False)
+    _first_seen: Optional[float] = field(default=None, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def add(self, payload: str) -> None:
+        """Add a notification payload, ignoring payloads that are not from the notify triggers."""
+        try:
+            notification = json.loads(payload)
+        except json.JSONDecodeError:
+            logger.warning(f"Ignoring notification with invalid payload {payload!r}")
+            return
+        with self._lock:
+            if self._first_seen is None:
+                self._first_seen = time.monotonic()
+            self._changes.tables.add(notification.get("table"))
+            if notification.get("protocol_uuid"):
+                self._changes.protocol_uuids.add(notification["protocol_uuid"])
+            if notification.get("crop_season_uuid"):
+                self._changes.crop_season_uuids.add(notification["crop_season_uuid"])
+
+    def drain(self, force: bool = False) -> SourceChanges:
+        """Remove and return the batch if its window has passed (whatever is pending if force is set)."""
+        with self._lock:
+            if self._first_seen is None or not force and time.monotonic() - self._first_seen < self.window:
+                return SourceChanges()
+            changes, self._changes, self._first_seen = self._changes, SourceChanges(), None
+            return changes
+
+    def timeout(self) -> Optional[float]:
+        """Seconds until the pending batch is due, None if nothing is pending."""
+        with self._lock:
+            if self._first_seen is None:
+                return None
+            return max(0.0, self.window - (time.monotonic() - self._first_seen))
+
+
+@dataclass
+class SourceChangeDispatcher:
+    """Reconcile the epics of changed protocols and the subtasks of changed crop seasons through ProtocolManager."""
+
+    protocol_manager: "ProtocolManager"
+
+    def __call__(self, changes: SourceChanges) -> None:
+        engine = self.protocol_manager.engine
+        # the long-running process must not serve the changed source rows from its query cache
+        if database.query_cache is not None:
+            for table in changes.tables:
+                database.query_cache.invalidate_table(table)
+        # nor the epics, issues and subtasks loaded for an earlier batch, they may have been edited in Jira since
+        self.protocol_manager.trias_jira.identity_map.clear()
+        self.protocol_manager.failures.clear()
+
+        epics = fetch_all_by_keys(
+            engine, "epics", FIELD_PROTOCOL_UUID, changes.protocol_uuids, ["epic_key", FIELD_PROTOCOL_UUID]
+        )
+        unknown = changes.protocol_uuids - {epic.protocol_uuid for epic in epics}
+        if unknown:
+            logger.debug(f"{len(unknown)} changed protocols have no reconciled epic yet, left to the scheduled run")
+        for epic_key in sorted({epic.epic_key for epic in epics}):
+            logger.info(f"Reconciling epic {epic_key} after a protocol or trial change")
+            try:
+                self.protocol_manager.manage_single_epic(self.protocol_manager.trias_epics.get_epic_by_key(epic_key))
+            except Exception as e:
+                logger.error(f"Failed to reconcile epic {epic_key}: {e}")
+
+        trials = fetch_all_by_keys(engine, FIELD_TRIAL, FIELD_CROP_SEASON_UUID, changes.crop_season_uuids, ["uuid"])
+        issues = fetch_all_by_keys(engine, "issues", "trial_uuid", {trial.uuid for trial in trials}, ["issue_key"])
+        for issue_key in sorted({issue.issue_key for issue in issues}):
+            logger.info(f"Reconciling subtasks of {issue_key} after an upload or trial change")
+            try:
+                self.protocol_manager.manage_subtasks_for_issue(issue_key)
+            except Exception as e:
+                logger.error(f"Failed to reconcile subtasks of {issue_key}: {e}")
+
+
+@dataclass
+class SourceListener:
+    """LISTEN on the source change channel and dispatch debounced batches of changes.
+
+    Notifications are read on a dedicated autocommit connection. A lost connection is re-established after
+    reconnect_delay; changes notified while it was down are picked up by the scheduled run.
+    """
+
+    engine: sa.engine
+    dispatch: SourceChangeDispatcher
+    batcher: SourceChangeBatcher = field(default_factory=SourceChangeBatcher)
+    channel: str = SOURCE_NOTIFY_CHANNEL
+    reconnect_delay: float = SOURCE_LISTENER_RECONNECT_SECONDS
+    poll_interval: float = 60.0
+
+    def listen_forever(self, stop: Optional[threading.Event] = None) -> None:
+        """Listen until stop is set (forever by default), reconnecting after connection errors."""
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            try:
+                self.listen(stop)
+            except Exception as e:
+                logger.error(f"Source listener connection lost: {e}")
+                stop.wait(self.reconnect_delay)
+        self.flush(force=True)
+
+    def listen(self, stop: threading.Event) -> None:
+        """Listen on one connection until stop is set."""
+        with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as con:
+            con.execute(sa.text(f"LISTEN {self.channel}"))
+            connection = con.connection.driver_connection
+            logger.info(f"Listening for source changes on channel {self.channel}")
+            while not stop.is_set():
+                timeout = self.batcher.timeout()
+                timeout = self.poll_interval if timeout is None else timeout
+                readable, _, _ = select.select([connection], [], [], timeout)
+                if readable:
+                    connection.poll()
+                    while connection.notifies:
+                        self.batcher.add(connection.notifies.pop(0).payload)
+                self.flush()
+
+    def flush(self, force: bool = False) -> None:
+        """Dispatch the pending batch if its debounce window has passed."""
+        changes = self.batcher.drain(force)
+        if changes:
+            logger.info(
+                f"Source changes in {', '.join(sorted(filter(None, changes.tables)))}: "
+                f"{len(changes.protocol_uuids)} protocols, {len(changes.crop_season_uuids)} crop seasons"
+            )
+            self.dispatch(changes)
@@ -0,0 +1,118 @@
+"""Run-wide cache of Jira user lookups by email."""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Dict, Iterable, Optional, Tuple
+
+from loguru import logger
+
+from jira_bot.lib.tools.constants import (
+    SEARCH_MAX_WORKERS,
+    USER_CACHE_TTL_HOURS,
+    USER_DIRECTORY_SNAPSHOT_PATH,
+    USER_NEGATIVE_CACHE_TTL_MINUTES,
+)
+
+# user key and name as returned by search_user, None for emails that do not resolve to a user
+User = Optional[Tuple[str, str]]
+
+
+@dataclass
+class UserDirectory:
+    """TTL cache of email -> Jira user, including emails that do not resolve.
+
+    Entries expire on wall-clock time so a snapshot written with save() can be loaded by the next run.
+    """
+
+    ttl: timedelta = timedelta(hours=USER_CACHE_TTL_HOURS)
+    negative_ttl: timedelta = timedelta(minutes=USER_NEGATIVE_CACHE_TTL_MINUTES)
+    snapshot_path: Optional[str] = USER_DIRECTORY_SNAPSHOT_PATH
+
+    def __post_init__(self):
+        self._entries: Dict[str, Tuple[User, float]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if self.snapshot_path and os.path.exists(self.snapshot_path):
+            self.load(self.snapshot_path)
+
+    def get(self, jira_connection, email: str) -> User:
+        """Look up a user by email, searching Jira only if the email is not cached or its entry expired."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(email)
+            if entry is not None and entry[1] > now:
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        return self._resolve(jira_connection, email)
+
+    def _resolve(self, jira_connection, email: str) -> User:
+        users = jira_connection.search_users(user=email)
+        user = (users[0].key, users[0].name) if users else None
+        ttl = self.ttl if user is not None else self.negative_ttl
+        with self._lock:
+            self._entries[email] = (user, time.time() + ttl.total_seconds())
+        return user
+
+    def prefetch(self, jira_connection, emails: Iterable[Optional[str]], max_workers: int = SEARCH_MAX_WORKERS) -> None:
+        """Resolve all distinct emails that are not cached yet, concurrently."""
+        now = time.time()
+        with self._lock:
+            missing = sorted(
+                {email for email in emails if email and (email not in self._entries or self._entries[email][1] <= now)}
+            )
+        if not missing:
+            return
+        logger.info(f"Resolving {len(missing)} Jira users")
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(lambda email: self._try_resolve(jira_connection, email), missing)
+            for email, result in zip(missing, results):
+                if isinstance(result, Exception):
+                    logger.warning(f"Failed to resolve Jira user {email}: {result}")
+
+    def _try_resolve(self, jira_connection, email: str):
+        try:
+            return self._resolve(jira_connection, email)
+        except Exception as e:
+            return e
+
+    def load(self, path: str) -> None:
+        """Load the unexpired entries of a snapshot."""
+        try:
+            with open(path) as snapshot:
+                entries = json.load(snapshot)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to load user directory snapshot {path}: {e}")
+            return
+        now = time.time()
+        with self._lock:
+            for email, (user, expires) in entries.items():
+                if expires > now:
+                    self._entries[email] = (tuple(user) if user else None, expires)
+
+    def save(self, path: Optional[str] = None) -> None:
+        """Write the unexpired entries to the snapshot file, if one is configured."""
+        path = path or self.snapshot_path
+        if not path:
+            return
+        now = time.time()
+        with self._lock:
+            entries = {email: entry for email, entry in self._entries.items() if entry[1] > now}
+        try:
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w") as snapshot:
+                json.dump(entries, snapshot)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to save user directory snapshot {path}: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        """Cache hits, misses and number of cached emails."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
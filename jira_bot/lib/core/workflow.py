@@ -0,0 +1,105 @@
+"""Shortest-path planning over the Jira workflows of the Trias project."""
+
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from jira_bot.lib.tools.constants import (
+    STATUS_MAPPING,
+    SUBTASKS_STATUS_MAPPING,
+    SUBTASKS_WORKFLOW,
+    TRANSITION_TARGET_STATUS,
+    WORKFLOW_TRANSITIONS,
+)
+
+# a planned hop: transition ID to execute and the status it leads to
+Hop = Tuple[int, str]
+
+
+@dataclass
+class WorkflowPlanner:
+    """Precomputed shortest transition paths between all statuses of a workflow.
+
+    Statuses are identified by their ID. A transition whose target status is not in the status mapping (e.g. the
+    sub-task "Done") leads to a status identified by its name.
+    """
+
+    transitions: Dict[str, Dict[str, int]]
+    status_mapping: Dict[str, str]
+    _paths: Dict[str, Dict[str, List[Hop]]] = field(default_factory=dict, init=False, repr=False)
+
+    def __post_init__(self):
+        graph = {
+            status_id: [(transition_id, self.status_id(name)) for name, transition_id in edges.items()]
+            for status_id, edges in self.transitions.items()
+        }
+        for source in graph:
+            self._paths[source] = self._breadth_first_paths(graph, source)
+
+    def status_id(self, status_name: str) -> str:
+        """ID of a status or of the target status of a transition, falls back to the name if it is not mapped."""
+        status_name = TRANSITION_TARGET_STATUS.get(status_name, status_name)
+        return self.status_mapping.get(status_name, status_name)
+
+    @staticmethod
+    def _breadth_first_paths(graph: Dict[str, List[Hop]], source: str) -> Dict[str, List[Hop]]:
+        paths: Dict[str, List[Hop]] = {source: []}
+        queue = deque([source])
+        while queue:
+            status_id = queue.popleft()
+            for transition_id, next_status_id in graph.get(status_id, []):
+                if next_status_id not in paths:
+                    paths[next_status_id] = paths[status_id] + [(transition_id, next_status_id)]
+                    queue.append(next_status_id)
+        return paths
+
+    def plan(self, current_status_id: str, target_status: str) -> List[Hop]:
+        """Shortest sequence of transitions from the current status to the target status.
+
+        :param current_status_id: ID of the current status.
+        :param target_status: Name of the target status.
+        :return: Transitions to execute in order, empty if the issue already has the target status.
+        """
+        target_status_id = self.status_id(target_status)
+        if current_status_id == target_status_id:
+            return []
+        if current_status_id not in self._paths:
+            raise ValueError(f"No transition defined for status ID {current_status_id}")
+        path: Optional[List[Hop]] = self._paths[current_status_id].get(target_status_id)
+        if path is None:
+            raise ValueError(f"No transition path from status ID {current_status_id} to {target_status}")
+        return path
+
+
+@dataclass
+class TransitionMetadataCache:
+    """Transitions Jira offers per issue type and status, fetched once per status from the /transitions endpoint."""
+
+    _transitions: Dict[Tuple[str, str], Dict[str, str]] = field(default_factory=dict, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def available(self, jira_connection, issue_key: str, issue_type: str, status_id: str) -> Dict[str, str]:
+        """Map of transition ID to target status ID available from a status.
+
+        :param jira_connection: Jira connection, used on the first lookup of the status.
+        :param issue_key: Key of an issue in that status.
+        :param issue_type: Name of the issue type, workflows differ between types.
+        :param status_id: ID of the status.
+        """
+        cache_key = (issue_type, status_id)
+        with self._lock:
+            if cache_key in self._transitions:
+                return self._transitions[cache_key]
+        transitions = {
+            str(transition["id"]): str(transition.get("to", {}).get("id"))
+            for transition in jira_connection.transitions(issue_key)
+        }
+        with self._lock:
+            self._transitions[cache_key] = transitions
+        return transitions
+
+
+STANDARD_WORKFLOW = WorkflowPlanner(WORKFLOW_TRANSITIONS, STATUS_MAPPING)
+SUBTASK_WORKFLOW = WorkflowPlanner(SUBTASKS_WORKFLOW, SUBTASKS_STATUS_MAPPING)
+TRANSITION_METADATA = TransitionMetadataCache()
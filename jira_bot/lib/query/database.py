@@ -1,3 +1,4 @@
+import json
 import pandas as pd
 import sqlalchemy as sa
 import typing as t
@@ -8,6 +9,19 @@ from loguru import logger
 from datetime import datetime as dt
 from datetime import timezone
 import geopandas as gpd
+import threading
+import time
+from collections import OrderedDict
+from psycopg2.extras import execute_values
+
+from jira_bot.lib.query.fingerprint import content_fingerprint
+from jira_bot.lib.tools.constants import (
+    CHANGE_LOG_TABLE,
+    FINGERPRINT_COLUMN,
+    QUERY_CACHE_DEFAULT_TTL_SECONDS,
+    QUERY_CACHE_MAX_ENTRIES,
+    QUERY_CACHE_TABLE_TTL_SECONDS,
+)
 
 
 class DBCredentials(BaseModel):
@@ -61,6 +75,198 @@ def get_engine(database: str, read_session: boto3.Session, db_parameters: dict =
     return engine
 
 
+class QueryCache:
+    """LRU cache of single-table query results with per-table TTLs.
+
+    Empty results are cached as well. Entries are keyed by (query kind, table, column, value) and returned as copies,
+    so callers can modify the frames they get. Writes through bulk_upsert invalidate the written table.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = QUERY_CACHE_MAX_ENTRIES,
+        default_ttl: float = QUERY_CACHE_DEFAULT_TTL_SECONDS,
+        table_ttls: t.Optional[t.Dict[str, float]] = None,
+    ):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.table_ttls = QUERY_CACHE_TABLE_TTL_SECONDS if table_ttls is None else table_ttls
+        self._entries: "OrderedDict[tuple, t.Tuple[t.Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def table_key(table_name: str) -> str:
+        return table_name.split(".")[-1]
+
+    @staticmethod
+    def _copy(result: t.Any) -> t.Any:
+        # frames are mutable, rows (and lists of rows, copied shallowly) are not
+        if isinstance(result, pd.DataFrame):
+            return result.copy()
+        return list(result) if isinstance(result, list) else result
+
+    def get_or_load(self, key: tuple, load: t.Callable[[], t.Any]) -> t.Any:
+        """Return the cached result of a query, loading and caching it if missing or expired."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._copy(entry[0])
+            self.misses += 1
+        df = load()
+        ttl = self.table_ttls.get(key[1], self.default_ttl)
+        with self._lock:
+            self._entries[key] = (self._copy(df), time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return df
+
+    def invalidate_table(self, table_name: str) -> None:
+        """Drop all cached results of a table."""
+        table = self.table_key(table_name)
+        with self._lock:
+            for key in [key for key in self._entries if key[1] == table]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> t.Dict[str, float]:
+        """Hits, misses, hit rate and number of cached results."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "entries": len(self._entries),
+            }
+
+
+# cache used by get_record_by_* and fetch_*, off unless a run installs one with set_query_cache. Only the bot's own
+# tables are invalidated on writes, so a cache must not outlive the run that installed it
+query_cache: t.Optional[QueryCache] = None
+
+
+def set_query_cache(cache: t.Optional[QueryCache]) -> None:
+    """Install the cache used by get_record_by_*, or disable caching with None."""
+    global query_cache
+    query_cache = cache
+
+
+def cached_query(kind: t.Hashable, table_name: str, column_name: str, value: t.Any, load: t.Callable[[], t.Any]):
+    """Run a single-table lookup through the query cache, if one is installed."""
+    if query_cache is None:
+        return load()
+    return query_cache.get_or_load((kind, QueryCache.table_key(table_name), column_name, value), load)
+
+
+def select_list(columns: t.Optional[t.Sequence[str]]) -> str:
+    """SQL select list of a column projection, all columns if None."""
+    return ", ".join(f'"{column}"' for column in columns) if columns else "*"
+
+
+def fetch_one(
+    engine: sa.engine,
+    table_name: str,
+    column_name: str,
+    value: t.Any,
+    columns: t.Optional[t.Sequence[str]] = None,
+) -> t.Optional[sa.Row]:
+    """Retrieve the first record matching a value as a row, without building a DataFrame.
+
+    Args:
+        engine (sa.engine): SQLAlchemy engine
+        table_name (str): Name of the table to query
+        column_name (str): Name of the column to filter by
+        value (Any): Value to filter by
+        columns (Sequence[str], optional): Columns to select, all columns if None
+
+    Returns:
+        Optional[sa.Row]: Named-tuple like row (attribute access, _asdict(), _mapping), None if not found
+    """
+
+    def load() -> t.Optional[sa.Row]:
+        query = f'SELECT {select_list(columns)} FROM {table_name} WHERE "{column_name}" = :value LIMIT 1'
+        with engine.connect() as con:
+            row = con.execute(sa.text(query), {"value": value}).first()
+        if row is None:
+            logger.info(f"Record with {column_name} {value} not found in {table_name}.")
+        return row
+
+    return cached_query(("one", tuple(columns or ())), table_name, column_name, value, load)
+
+
+def fetch_all(
+    engine: sa.engine,
+    table_name: str,
+    column_name: str,
+    value: t.Any,
+    columns: t.Optional[t.Sequence[str]] = None,
+) -> t.List[sa.Row]:
+    """Retrieve all records matching a value as rows, without building a DataFrame.
+
+    Args:
+        engine (sa.engine): SQLAlchemy engine
+        table_name (str): Name of the table to query
+        column_name (str): Name of the column to filter by
+        value (Any): Value to filter by
+        columns (Sequence[str], optional): Columns to select, all columns if None
+
+    Returns:
+        List[sa.Row]: Matching rows
+    """
+
+    def load() -> t.List[sa.Row]:
+        query = f'SELECT {select_list(columns)} FROM {table_name} WHERE "{column_name}" = :value'
+        with engine.connect() as con:
+            rows = con.execute(sa.text(query), {"value": value}).all()
+        if not rows:
+            logger.info(f"No records found for {column_name} {value} in {table_name}.")
+        return rows
+
+    return cached_query(("all", tuple(columns or ())), table_name, column_name, value, load)
+
+
+def fetch_all_by_keys(
+    engine: sa.engine,
+    table_name: str,
+    column_name: str,
+    values: t.Iterable[t.Any],
+    columns: t.Optional[t.Sequence[str]] = None,
+) -> t.List[sa.Row]:
+    """Retrieve all records whose column matches any of the given values, in a single query.
+
+    Args:
+        engine (sa.engine): SQLAlchemy engine
+        table_name (str): Name of the table to query
+        column_name (str): Name of the column to filter by
+        values (Iterable): Values to filter by
+        columns (Sequence[str], optional): Columns to select, all columns if None
+
+    Returns:
+        List[sa.Row]: Matching rows, empty if no value is given
+    """
+    keys = sorted({value for value in values if value is not None and not pd.isna(value)})
+    if not keys:
+        return []
+    # an expanding IN list behaves like = ANY(:keys), but each key is an untyped literal that Postgres coerces to
+    # the column type, so it also works for uuid columns and keeps using their indexes
+    query = sa.text(f'SELECT {select_list(columns)} FROM {table_name} WHERE "{column_name}" IN :keys').bindparams(
+        sa.bindparam("keys", expanding=True)
+    )
+    with engine.connect() as con:
+        rows = con.execute(query, {"keys": keys}).all()
+    logger.debug(f"Loaded {len(rows)} records of {len(keys)} keys from {table_name}.")
+    return rows
+
+
 def get_record_by_name(engine: sa.engine, table_name: str, column_name: str, value: str) -> pd.DataFrame:
     """Retrieve record information from the database by name.
 
@@ -73,12 +279,15 @@ def get_record_by_name(engine: sa.engine, table_name: str, column_name: str, val
     Returns:
         pd.DataFrame: Record information from the database
     """
-    query = f"SELECT * FROM {table_name} WHERE {column_name} = :value LIMIT 1"
-    with engine.connect() as con:
-        df = pd.read_sql_query(sql=sa.text(query), params={"value": value}, con=con)
-    if df.empty:
-        logger.info(f"Record with {column_name} {value} not found in {table_name}.")
-    return df
+    def load() -> pd.DataFrame:
+        query = f"SELECT * FROM {table_name} WHERE {column_name} = :value LIMIT 1"
+        with engine.connect() as con:
+            df = pd.read_sql_query(sql=sa.text(query), params={"value": value}, con=con)
+        if df.empty:
+            logger.info(f"Record with {column_name} {value} not found in {table_name}.")
+        return df
+
+    return cached_query("first", table_name, column_name, value, load)
 
 
 def get_record_by_id(engine: sa.engine, table_name: str, column_name: str, value: str) -> pd.DataFrame:
@@ -93,12 +302,15 @@ def get_record_by_id(engine: sa.engine, table_name: str, column_name: str, value
     Returns:
         pd.DataFrame: Record information from the database
     """
-    query = f"SELECT * FROM {table_name} WHERE {column_name} = :value LIMIT 1"
-    with engine.connect() as con:
-        df = pd.read_sql_query(sql=sa.text(query), params={"value": value}, con=con)
-    if df.empty:
-        logger.info(f"Record with {column_name} {value} not found in {table_name}.")
-    return df
+    def load() -> pd.DataFrame:
+        query = f"SELECT * FROM {table_name} WHERE {column_name} = :value LIMIT 1"
+        with engine.connect() as con:
+            df = pd.read_sql_query(sql=sa.text(query), params={"value": value}, con=con)
+        if df.empty:
+            logger.info(f"Record with {column_name} {value} not found in {table_name}.")
+        return df
+
+    return cached_query("first", table_name, column_name, value, load)
 
 
 def get_record_by_uuid(engine: sa.engine, table_name: str, column_name: str, value: str) -> pd.DataFrame:
@@ -113,12 +325,15 @@ def get_record_by_uuid(engine: sa.engine, table_name: str, column_name: str, val
     Returns:
         pd.DataFrame: Record information from the database
     """
-    query = f'SELECT * FROM {table_name} WHERE "{column_name}" = :value'
-    with engine.connect() as con:
-        df = pd.read_sql_query(sql=sa.text(query), params={"value": value}, con=con)
-    if df.empty:
-        logger.info(f"No records found for {column_name} {value} in {table_name}.")
-    return df
+    def load() -> pd.DataFrame:
+        query = f'SELECT * FROM {table_name} WHERE "{column_name}" = :value'
+        with engine.connect() as con:
+            df = pd.read_sql_query(sql=sa.text(query), params={"value": value}, con=con)
+        if df.empty:
+            logger.info(f"No records found for {column_name} {value} in {table_name}.")
+        return df
+
+    return cached_query("all", table_name, column_name, value, load)
 
 
 def query_farm_field_names(engine: sa.engine, uuid: str, entity: str) -> str:
@@ -133,26 +348,15 @@ def query_farm_field_names(engine: sa.engine, uuid: str, entity: str) -> str:
         str: The name of the farm or field, or an empty string if not found.
     """
     if entity == "farm":
-        table_name = "public.farm"
-        select_columns = "name"
+        row = fetch_one(engine, "public.farm", "uuid", uuid, ["name"])
     else:
-        table_name = "public.fields"
-        select_columns = 'name, "farmUuid"'  # Ensure the correct column name is used
+        row = fetch_one(engine, "public.fields", "uuid", uuid, ["name", "farmUuid"])
 
-    with engine.connect() as con:
-        sql_query = sa.text(
-            f"""
-            SELECT {select_columns} FROM {table_name}
-            WHERE "uuid" = :uuid
-            """
-        )
-        result = pd.read_sql_query(sql=sql_query, con=con, params={"uuid": uuid})
-
-    if not result.empty:
+    if row is not None:
         if entity == "farm":
-            return result["name"].iloc[0]
+            return row.name
         else:
-            return result["name"].iloc[0], result["farmUuid"].iloc[0]
+            return row.name, row.farmUuid
 
     logger.info(f"No name found for {entity} with UUID {uuid}.")
     return "" if entity == "farm" else ("", "")
@@ -181,207 +385,198 @@ def get_feature(
     return feature
 
 
-def upsert_epic(engine: sa.engine, epic_df: pd.DataFrame) -> None:
+# column layout of the tables maintained by the bot, used to build the bulk upsert statements
+UPSERT_TABLES = {
+    "epics": {
+        "columns": [
+            "protocol_uuid", "last_updated", "epic_id", "epic_key", "summary", "version", "protocol_id",
+            "requestor_email", "assignee_email", "trial_engineer_email", "protocol_sheet", "year_of_harvest",
+            "country", "crop", "business_case", "trial_type", "trial_objective", "budget", "paid_costs",
+            "forcasted_costs", "planned_trials", "executed_trials", "sponsor", "cost_sheet", "url_field",
+            "components", "created", "updated", "last_viewed", "watch_count", "labels", "status_name", "status_id",
+            "status_category", "creator_email", "comments_count", "due_date", "update_timestamp", "fingerprint",
+        ],
+        "conflict_column": "epic_key",
+        "id_column": "epic_id",
+        "date_columns": ["created", "updated", "last_viewed", "last_updated", "due_date", "update_timestamp"],
+    },
+    "issues": {
+        "columns": [
+            "trial_uuid", "trial_id", "created", "version", "updated", "last_viewed", "watch_count", "labels",
+            "status_name", "status_id", "status_category", "summary", "creator_email", "comments_count", "due_date",
+            "issue_id", "issue_key", "trial_engineer_email", "last_updated", "epic_link", "requestor_email",
+            "assignee_email", "subtask_ids", "subtask_keys", "update_timestamp", "fingerprint",
+        ],
+        "conflict_column": "issue_id",
+        "id_column": "issue_id",
+        "date_columns": ["created", "updated", "last_viewed", "update_timestamp", "due_date", "last_updated"],
+    },
+    "sub_tasks": {
+        "table": "public.sub_tasks",
+        "columns": [
+            "parent_issue", "subtask_key", "file_uuid", "trial_id", "created", "updated", "last_viewed",
+            "watch_count", "labels", "status_name", "status_category", "status_id", "summary", "version",
+            "creator_email", "comments_count", "trial_engineer_email", "assignee_email", "update_timestamp",
+            "fingerprint",
+        ],
+        "conflict_column": "subtask_key",
+        "id_column": "subtask_key",
+        "date_columns": ["created", "updated", "last_viewed", "update_timestamp"],
+    },
+}
+
+
+def bulk_upsert(
+    engine: sa.engine,
+    table_name: str,
+    records: t.List[dict],
+    new_version_ids: t.Iterable[t.Any] = (),
+    page_size: int = 500,
+) -> None:
+    """Upsert many records of a bot table with one statement per page, committed in a single transaction.
+
+    The version is maintained by the database: new records start at 0, existing records keep their version unless
+    their ID is in new_version_ids, in which case it is incremented first. The content fingerprint of every record is
+    computed here, before any value is converted for the database.
+
+    Args:
+        engine (sa.engine): The database engine.
+        table_name (str): One of the tables in UPSERT_TABLES.
+        records (List[dict]): Records to upsert, keyed by column name. A version key is ignored.
+        new_version_ids (Iterable): IDs (id_column values) of existing records to bump to a new version.
+        page_size (int): Rows per INSERT statement.
+    Returns:
+        None"""
+    spec = UPSERT_TABLES[table_name]
+    table = spec.get("table", table_name)
+    columns = spec["columns"]
+    data_columns = [column for column in columns if column != "version"]
+    update_timestamp = dt.now(timezone.utc)
+
+    # the same key twice in one INSERT ... ON CONFLICT is an error, the last record of a key wins
+    rows_by_key = {}
+    for record in records:
+        row = {**record, "update_timestamp": update_timestamp}
+        row[FINGERPRINT_COLUMN] = content_fingerprint(table_name, record)
+        for date_column in spec["date_columns"]:
+            if isinstance(row.get(date_column), dt):
+                row[date_column] = row[date_column].strftime("%Y-%m-%d %H:%M:%S")
+        rows_by_key[row.get(spec["conflict_column"], len(rows_by_key))] = row
+    if not rows_by_key:
+        return
+    rows = [tuple(row.get(column) for column in data_columns) + (0,) for row in rows_by_key.values()]
+
+    column_list = ", ".join(f'"{column}"' for column in data_columns + ["version"])
+    update_list = ", ".join(
+        f'"{column}" = EXCLUDED."{column}"' for column in data_columns if column != spec["conflict_column"]
+    )
+    insert_statement = (
+        f'INSERT INTO {table} ({column_list}) VALUES %s ON CONFLICT ("{spec["conflict_column"]}") '
+        f"DO UPDATE SET {update_list}"
+    )
+    new_version_ids = list(new_version_ids)
+
+    with engine.begin() as con:
+        cursor = con.connection.cursor()
+        if new_version_ids:
+            # a tuple is sent as a list of untyped literals, which Postgres coerces to the type of the id column
+            cursor.execute(
+                f'UPDATE {table} SET "version" = "version" + 1 WHERE "{spec["id_column"]}" IN %s',
+                (tuple(new_version_ids),),
+            )
+        execute_values(cursor, insert_statement, rows, page_size=page_size)
+    if query_cache is not None:
+        query_cache.invalidate_table(table_name)
+    logger.debug(f"Upserted {len(rows)} records into {table_name}, {len(new_version_ids)} new versions.")
+
+
+def update_changed_columns(
+    engine: sa.engine,
+    table_name: str,
+    changed_records: t.List[t.Tuple[dict, t.Dict[str, t.Any]]],
+    new_version_ids: t.Iterable[t.Any] = (),
+) -> None:
+    """Write only the changed columns of existing records and log their changes, in a single transaction.
+
+    Each record gets one UPDATE of its changed columns, its update timestamp and fingerprint. The old and new values
+    are appended to the change log table (migrations/003_change_log.sql) as one JSON object per record.
+
+    Args:
+        engine (sa.engine): The database engine.
+        table_name (str): One of the tables in UPSERT_TABLES.
+        changed_records (List[Tuple[dict, dict]]): Records keyed by column name, each with its field changes
+            (FieldChange with the stored and the new value) keyed by column name.
+        new_version_ids (Iterable): IDs (id_column values) of records whose version is incremented.
+    Returns:
+        None"""
+    spec = UPSERT_TABLES[table_name]
+    table = spec.get("table", table_name)
+    id_column = spec["id_column"]
+    update_timestamp = dt.now(timezone.utc)
+    new_version_ids = {str(record_id) for record_id in new_version_ids}
+    log_rows = []
+
+    with engine.begin() as con:
+        for record, changes in changed_records:
+            columns = [
+                column for column in changes if column in spec["columns"] and column not in (id_column, "version")
+            ]
+            if not columns:
+                continue
+            values = {column: record.get(column) for column in columns}
+            for date_column in spec["date_columns"]:
+                if isinstance(values.get(date_column), dt):
+                    values[date_column] = values[date_column].strftime("%Y-%m-%d %H:%M:%S")
+            assignments = [f'"{column}" = :{column}' for column in columns]
+            assignments += ['"update_timestamp" = :update_timestamp', f'"{FINGERPRINT_COLUMN}" = :fingerprint']
+            if str(record.get(id_column)) in new_version_ids:
+                assignments.append('"version" = "version" + 1')
+            con.execute(
+                sa.text(f'UPDATE {table} SET {", ".join(assignments)} WHERE "{id_column}" = :record_id'),
+                {
+                    **values,
+                    "update_timestamp": update_timestamp,
+                    "fingerprint": content_fingerprint(table_name, record),
+                    "record_id": record.get(id_column),
+                },
+            )
+            log_rows.append(
+                {
+                    "table_name": table_name,
+                    "record_id": str(record.get(id_column)),
+                    "changes": json.dumps({column: list(changes[column]) for column in columns}, default=str),
+                    "changed_at": update_timestamp,
+                }
+            )
+        if log_rows:
+            con.execute(
+                sa.text(
+                    f"INSERT INTO {CHANGE_LOG_TABLE} (table_name, record_id, changes, changed_at) "
+                    "VALUES (:table_name, :record_id, CAST(:changes AS JSONB), :changed_at)"
+                ),
+                log_rows,
+            )
+    if query_cache is not None:
+        query_cache.invalidate_table(table_name)
+    logger.debug(f"Updated the changed columns of {len(log_rows)} records in {table_name}.")
+
+
+def upsert_epic(engine: sa.engine, epic_df: pd.DataFrame, new_version_ids: t.Iterable[t.Any] = ()) -> None:
     """Upsert the epic information into the database.
     Args:
         engine (sa.engine): The database engine.
         epic_df (pd.DataFrame): The DataFrame containing epic information.
+        new_version_ids (Iterable): Epic IDs whose version is incremented.
     Returns:
         None"""
-    insert_statement = sa.text(
-        """
-        INSERT INTO epics ("protocol_uuid", "last_updated", "epic_id", "epic_key", "summary", "version", 
-            "protocol_id", "requestor_email", "assignee_email", "trial_engineer_email", "protocol_sheet", 
-            "year_of_harvest", "country", "crop", "business_case", "trial_type", "trial_objective", "budget", "paid_costs", "forcasted_costs","planned_trials", "executed_trials", 
-            "sponsor", "cost_sheet", "url_field", "components", "created", 
-            "updated", "last_viewed", "watch_count", "labels", "status_name", "status_id",          "status_category", "creator_email", "comments_count", "due_date", "update_timestamp"
-        ) VALUES (
-            :protocol_uuid, :last_updated, :epic_id, :epic_key, :summary, :version, 
-            :protocol_id, :requestor_email, :assignee_email, :trial_engineer_email, :protocol_sheet, 
-            :year_of_harvest, :country, :crop, :business_case, :trial_type, :trial_objective, :budget, :paid_costs, :forcasted_costs, :planned_trials, :executed_trials,
-            :sponsor, :cost_sheet, :url_field, :components, :created, 
-            :updated, :last_viewed, :watch_count, :labels, :status_name, :status_id,
-            :status_category, :creator_email, :comments_count, :due_date, :update_timestamp
-        ) ON CONFLICT ("epic_key") DO UPDATE SET
-            "protocol_uuid" = EXCLUDED."protocol_uuid",
-            "last_updated" = EXCLUDED."last_updated",
-            "epic_id" = EXCLUDED."epic_id",
-            "summary" = EXCLUDED."summary",
-            "version" = EXCLUDED."version",
-            "protocol_id" = EXCLUDED."protocol_id",
-            "assignee_email" = EXCLUDED."assignee_email",
-            "trial_engineer_email" = EXCLUDED."trial_engineer_email",
-            "requestor_email" = EXCLUDED."requestor_email",
-            "protocol_sheet" = EXCLUDED."protocol_sheet",
-            "year_of_harvest" = EXCLUDED."year_of_harvest",
-            "country" = EXCLUDED."country",
-            "crop" = EXCLUDED."crop",
-            "business_case" = EXCLUDED."business_case",
-            "trial_type" = EXCLUDED."trial_type",
-            "trial_objective" = EXCLUDED."trial_objective",
-            "budget" = EXCLUDED."budget",
-            "paid_costs" = EXCLUDED."paid_costs",
-            "forcasted_costs" = EXCLUDED."forcasted_costs",
-            "planned_trials" = EXCLUDED."planned_trials",
-            "executed_trials" = EXCLUDED."executed_trials",
-            "sponsor" = EXCLUDED."sponsor",
-            "cost_sheet" = EXCLUDED."cost_sheet",
-            "url_field" = EXCLUDED."url_field",
-            "components" = EXCLUDED."components",
-            "created" = EXCLUDED."created",
-            "updated" = EXCLUDED."updated",
-            "last_viewed" = EXCLUDED."last_viewed",
-            "watch_count" = EXCLUDED."watch_count",
-            "labels" = EXCLUDED."labels",
-            "status_name" = EXCLUDED."status_name",
-            "status_id" = EXCLUDED."status_id",
-            "status_category" = EXCLUDED."status_category",
-            "creator_email" = EXCLUDED."creator_email",
-            "comments_count" = EXCLUDED."comments_count",
-            "due_date" = EXCLUDED."due_date",
-            "update_timestamp" = EXCLUDED."update_timestamp";
-        """
-    )
+    bulk_upsert(engine, "epics", epic_df.to_dict("records"), new_version_ids)
 
-    with engine.connect() as con:
-        for _, epic in epic_df.iterrows():
-            epic_dict = epic.to_dict()
-            epic_dict["update_timestamp"] = dt.now(timezone.utc)
-            for date_column in ["created", "updated", "last_viewed", "last_updated", "due_date", "update_timestamp"]:
-                if isinstance(epic_dict[date_column], dt):
-                    epic_dict[date_column] = epic_dict[date_column].strftime("%Y-%m-%d %H:%M:%S")
-            logger.debug(f"Upserting epic with data: {epic_dict}")
-            con.execute(insert_statement, epic_dict)
-            con.commit()
-
-
-def upsert_trial(engine: sa.engine, trial_df: pd.DataFrame) -> None:
-    insert_statement = sa.text(
-        """
-        INSERT INTO issues (
-            "trial_uuid", "trial_id", "created", "version", "updated", "last_viewed", "watch_count", 
-            "labels", "status_name", "status_id", "status_category", "summary", "creator_email", 
-            "comments_count", "due_date", "issue_id", "issue_key", 
-            "trial_engineer_email", "last_updated", "epic_link", "requestor_email", "assignee_email", "subtask_ids", "subtask_keys", "update_timestamp"
-        ) VALUES (
-            :trial_uuid, :trial_id, :created, :version, :updated, :last_viewed, :watch_count, 
-            :labels, :status_name, :status_id, :status_category, :summary, :creator_email, 
-            :comments_count, :due_date, :issue_id, :issue_key, 
-            :trial_engineer_email, :last_updated, :epic_link, :requestor_email, :assignee_email, :subtask_ids, :subtask_keys, :update_timestamp
-        ) ON CONFLICT ("uuid") DO UPDATE SET
-            "trial_uuid" = EXCLUDED."trial_uuid",
-            "trial_id" = EXCLUDED."trial_id",
-            "created" = EXCLUDED."created",
-            "version" = EXCLUDED."version",
-            "updated" = EXCLUDED."updated",
-            "last_viewed" = EXCLUDED."last_viewed",
-            "watch_count" = EXCLUDED."watch_count",
-            "labels" = EXCLUDED."labels",
-            "status_name" = EXCLUDED."status_name",
-            "status_id" = EXCLUDED."status_id",
-            "status_category" = EXCLUDED."status_category",
-            "summary" = EXCLUDED."summary",
-            "creator_email" = EXCLUDED."creator_email",
-            "comments_count" = EXCLUDED."comments_count",
-            "due_date" = EXCLUDED."due_date",
-            "issue_id" = EXCLUDED."issue_id",
-            "issue_key" = EXCLUDED."issue_key",
-            "trial_engineer_email" = EXCLUDED."trial_engineer_email",
-            "last_updated" = EXCLUDED."last_updated",
-            "epic_link" = EXCLUDED."epic_link",
-            "requestor_email" = EXCLUDED."requestor_email",
-            "assignee_email" = EXCLUDED."assignee_email",
-            "subtask_ids" = EXCLUDED."subtask_ids",
-            "subtask_keys" = EXCLUDED."subtask_keys",
-            "update_timestamp" = EXCLUDED."update_timestamp"
-            ;
-        """
-    )
-    with engine.connect() as con:
-        for _, trial in trial_df.iterrows():
-            issue_dict = trial.to_dict()
-            issue_dict["update_timestamp"] = dt.now(timezone.utc)
-            for date_column in ["created", "updated", "last_viewed", "update_timestamp", "due_date", "last_updated"]:
-                if isinstance(issue_dict[date_column], dt):
-                    issue_dict[date_column] = issue_dict[date_column].strftime("%Y-%m-%d %H:%M:%S")
-            logger.debug(f"Upserting issue with data: {issue_dict}")
-            con.execute(insert_statement, issue_dict)
-            con.commit()
-
-
-def upsert_subtask(engine: sa.engine, subtask_df: pd.DataFrame) -> None:
-    insert_statement = sa.text(
-        """           
-        INSERT INTO public.sub_tasks (
-            parent_issue,
-            subtask_key,
-            file_uuid,
-            trial_id,
-            created,
-            updated,
-            last_viewed,
-            watch_count,
-            labels,
-            status_name,
-            status_category,
-            status_id,
-            summary,
-            version,
-            creator_email,
-            comments_count,
-            trial_engineer_email,
-            assignee_email,
-            update_timestamp
-        ) VALUES (
-            :parent_issue,
-            :subtask_key,
-            :file_uuid,
-            :trial_id,
-            :created,
-            :updated,
-            :last_viewed,
-            :watch_count,
-            :labels,
-            :status_name,
-            :status_category,
-            :status_id,
-            :summary,
-            :version,
-            :creator_email,
-            :comments_count,
-            :trial_engineer_email,
-            :assignee_email,
-            :update_timestamp
-        )
-        ON CONFLICT (subtask_key) DO UPDATE SET
-            parent_issue = EXCLUDED.parent_issue,
-            subtask_key = EXCLUDED.subtask_key,
-            file_uuid = EXCLUDED.file_uuid,
-            trial_id = EXCLUDED.trial_id,
-            created = EXCLUDED.created,
-            updated = EXCLUDED.updated,
-            last_viewed = EXCLUDED.last_viewed,
-            watch_count = EXCLUDED.watch_count,
-            labels = EXCLUDED.labels,
-            status_name = EXCLUDED.status_name,
-            status_category = EXCLUDED.status_category,
-            status_id = EXCLUDED.status_id,
-            summary = EXCLUDED.summary,
-            version = EXCLUDED.version,
-            creator_email = EXCLUDED.creator_email,
-            comments_count = EXCLUDED.comments_count,
-            trial_engineer_email = EXCLUDED.trial_engineer_email,
-            assignee_email = EXCLUDED.assignee_email,
-            update_timestamp = EXCLUDED.update_timestamp;
-        """
-    )
-    with engine.connect() as con:
-        for _, subtask in subtask_df.iterrows():
-            subtask_dict = subtask.to_dict()
-            subtask_dict["update_timestamp"] = dt.now(timezone.utc)
-            for date_column in ["created", "updated", "last_viewed", "update_timestamp"]:
-                if isinstance(subtask_dict[date_column], dt):
-                    subtask_dict[date_column] = subtask_dict[date_column].strftime("%Y-%m-%d %H:%M:%S")
-            logger.debug(f"Upserting issue with data: {subtask_dict}")
-            con.execute(insert_statement, subtask_dict)
-            con.commit()
+
+def upsert_trial(engine: sa.engine, trial_df: pd.DataFrame, new_version_ids: t.Iterable[t.Any] = ()) -> None:
+    """Upsert the issue information of trials into the database."""
+    bulk_upsert(engine, "issues", trial_df.to_dict("records"), new_version_ids)
+
+
+def upsert_subtask(engine: sa.engine, subtask_df: pd.DataFrame, new_version_ids: t.Iterable[t.Any] = ()) -> None:
+    """Upsert the subtask information into the database."""
+    bulk_upsert(engine, "sub_tasks", subtask_df.to_dict("records"), new_version_ids)
@@ -0,0 +1,146 @@
+"""Content fingerprints of the epics, issues and sub_tasks mirror tables, used as a cheap change check."""
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+import sqlalchemy as sa
+from loguru import logger
+
+from jira_bot.lib.tools.comparator import COMPARATORS, FieldChange
+from jira_bot.lib.tools.constants import (
+    EPIC_FIELDS,
+    EPIC_SCHEMA,
+    FINGERPRINT_COLUMN,
+    ISSUE_FIELDS,
+    ISSUE_SCHEMA,
+    SUBTASK_FIELDS,
+    SUBTASK_SCHEMA,
+)
+
+# fields hashed per table, the schema gives the type each value is canonicalized as
+FINGERPRINT_TABLES = {
+    "epics": {"table": "epics", "key": "epic_id", "fields": EPIC_FIELDS, "schema": EPIC_SCHEMA},
+    "issues": {"table": "issues", "key": "issue_id", "fields": ISSUE_FIELDS, "schema": ISSUE_SCHEMA},
+    "sub_tasks": {"table": "public.sub_tasks", "key": "file_uuid", "fields": SUBTASK_FIELDS, "schema": SUBTASK_SCHEMA},
+}
+
+
+def canonical_value(value: Any, dtype: str) -> Any:
+    """Canonical JSON value of a field, following the same type rules as the comparator converters."""
+    if isinstance(value, (list, tuple, set)) or hasattr(value, "tolist") and not pd.api.types.is_scalar(value):
+        return sorted(str(item) for item in value)
+    if value is None or pd.isna(value):
+        return None
+    dtype = dtype.upper()
+    if "TIMESTAMP" in dtype or "DATE" in dtype:
+        timestamp = pd.to_datetime(value, errors="coerce")
+        return None if pd.isna(timestamp) else timestamp.strftime("%Y-%m-%d %H:%M:%S")
+    if "INTEGER" in dtype or "NUMERIC" in dtype:
+        number = pd.to_numeric(value, errors="coerce")
+        if pd.isna(number):
+            return None
+        return int(number) if "INTEGER" in dtype or float(number).is_integer() else float(number)
+    return str(value)
+
+
+def content_fingerprint(table_name: str, record: dict) -> str:
+    """Fingerprint of the tracked fields of a record of one of the FINGERPRINT_TABLES.
+
+    :param table_name: epics, issues or sub_tasks.
+    :param record: Record keyed by field name, missing fields count as empty.
+    :return: Hex digest of the canonicalized field values.
+    """
+    spec = FINGERPRINT_TABLES[table_name]
+    values = [canonical_value(record.get(name), spec["schema"].get(name, "TEXT")) for name in spec["fields"]]
+    return hashlib.md5(json.dumps(values, separators=(",", ":")).encode()).hexdigest()
+
+
+@dataclass
+class FingerprintIndex:
+    """Stored fingerprints of the mirror tables, loaded with one query per table.
+
+    The fingerprint column is added by migrations/002_fingerprint_columns.sql. Rows written before it existed have no
+    fingerprint and are reported as unknown, the caller then falls back to the full field comparison. compare() runs
+    that comparison for a whole batch of tickets up front and keeps the field changes together with the fingerprint of
+    the ticket they were computed for.
+    """
+
+    fingerprints: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    compared: Dict[str, Dict[str, Tuple[str, Dict[str, FieldChange]]]] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, engine: sa.engine) -> "FingerprintIndex":
+        """Load the fingerprints of all rows of the mirror tables.
+
+        :param engine: SQLAlchemy engine.
+        :return: The populated index.
+        """
+        index = cls()
+        with engine.connect() as con:
+            for table_name, spec in FINGERPRINT_TABLES.items():
+                rows = con.execute(
+                    sa.text(
+                        f'SELECT "{spec["key"]}", "{FINGERPRINT_COLUMN}" FROM {spec["table"]} '
+                        f'WHERE "{FINGERPRINT_COLUMN}" IS NOT NULL'
+                    )
+                ).all()
+                index.fingerprints[table_name] = {str(key): fingerprint for key, fingerprint in rows}
+        logger.info(
+            "Loaded fingerprints: "
+            + ", ".join(f"{table_name}={len(rows)}" for table_name, rows in index.fingerprints.items())
+        )
+        return index
+
+    def compare(self, engine: sa.engine, table_name: str, records: Iterable[dict]) -> None:
+        """Compare all records whose fingerprint does not match with their mirror rows in one batch.
+
+        :param engine: SQLAlchemy engine.
+        :param table_name: epics, issues or sub_tasks.
+        :param records: Current field values of the tickets.
+        """
+        spec = FINGERPRINT_TABLES[table_name]
+        pending = {}
+        for record in records:
+            fingerprint = content_fingerprint(table_name, record)
+            key = str(record.get(spec["key"]))
+            if self.fingerprints.get(table_name, {}).get(key) != fingerprint:
+                pending[key] = (fingerprint, record)
+        if not pending:
+            return
+        query = sa.text(f'SELECT * FROM {spec["table"]} WHERE "{spec["key"]}" IN :keys').bindparams(
+            sa.bindparam("keys", expanding=True)
+        )
+        with engine.connect() as con:
+            db_rows = con.execute(query, {"keys": sorted(pending)}).all()
+        differences = COMPARATORS[table_name].diff([record for _, record in pending.values()], db_rows)
+        # tickets without a mirror row are left to the caller, which handles them as new
+        db_keys = {str(row._mapping[spec["key"]]) for row in db_rows}
+        compared = self.compared.setdefault(table_name, {})
+        for key, changes in differences.items():
+            if key in db_keys:
+                compared[key] = (pending[key][0], changes)
+        logger.info(f"Compared {len(pending)} {table_name} records with the database, {len(db_keys)} found.")
+
+    def changes(self, table_name: str, record: dict) -> Optional[Dict[str, FieldChange]]:
+        """Changes of a record against its mirror row, as far as known without a query.
+
+        :param table_name: epics, issues or sub_tasks.
+        :param record: Current field values of the ticket.
+        :return: No changes if the fingerprint matches, the compared changes if the ticket was compared in its
+            current state, None otherwise.
+        """
+        fingerprint = content_fingerprint(table_name, record)
+        key = str(record.get(FINGERPRINT_TABLES[table_name]["key"]))
+        if self.fingerprints.get(table_name, {}).get(key) == fingerprint:
+            return {}
+        compared_fingerprint, changes = self.compared.get(table_name, {}).get(key, (None, None))
+        return changes if compared_fingerprint == fingerprint else None
+
+    def remember(self, table_name: str, record: dict) -> None:
+        """Record the fingerprint of a record that was just written."""
+        key = str(record.get(FINGERPRINT_TABLES[table_name]["key"]))
+        self.fingerprints.setdefault(table_name, {})[key] = content_fingerprint(table_name, record)
+        self.compared.get(table_name, {}).pop(key, None)
@@ -0,0 +1,143 @@
+"""Persistent store of the raw Jira issues seen by the bot, synced incrementally by `updated` watermark."""
+
+import hashlib
+import json
+import re
+from dataclasses import dataclass
+from datetime import datetime as dt
+from datetime import timedelta, timezone
+from typing import TYPE_CHECKING, List, Optional
+
+import sqlalchemy as sa
+from loguru import logger
+
+from jira_bot.lib.core.jira_records import iter_raw_issues
+from jira_bot.lib.tools.constants import FULL_RESYNC_INTERVAL_HOURS, SYNC_WATERMARK_OVERLAP_MINUTES
+
+if TYPE_CHECKING:
+    from jira_bot.lib.core.jira_connections import TriasJira
+
+ORDER_BY_PATTERN = re.compile(r"\s+order\s+by\s+", re.IGNORECASE)
+
+
+def sync_scope(jql_query: str, fields: Optional[List[str]]) -> str:
+    """Stable identifier for the result set of a JQL query with a given field projection."""
+    return hashlib.md5(f"{jql_query}|{','.join(fields or [])}".encode()).hexdigest()
+
+
+def jira_wall_time(timestamp: Optional[str]) -> Optional[dt]:
+    """Wall-clock time of a Jira timestamp, JQL date literals are interpreted in that same user timezone."""
+    if not timestamp:
+        return None
+    return dt.strptime(timestamp, "%Y-%m-%dT%H:%M:%S.%f%z").replace(tzinfo=None)
+
+
+def delta_jql(jql_query: str, watermark: dt) -> str:
+    """Restrict a JQL query to issues updated since the watermark, keeping any ORDER BY clause at the end."""
+    query, *order_by = ORDER_BY_PATTERN.split(jql_query, maxsplit=1)
+    delta = f'({query}) AND updated >= "{watermark:%Y/%m/%d %H:%M}"'
+    return f"{delta} ORDER BY {order_by[0]}" if order_by else delta
+
+
+@dataclass
+class IssueStore:
+    """Postgres-backed store of raw Jira issues per search scope, plus a sync watermark per scope.
+
+    The tables are created by migrations/001_issue_store.sql. Issues that leave a scope (moved to another epic or
+    out of the filter) are only dropped by the next full resync, and every new query is a new scope that starts
+    with a full download, so the store pays off for the same searches repeated between resyncs.
+    """
+
+    engine: sa.engine
+    full_resync_interval: timedelta = timedelta(hours=FULL_RESYNC_INTERVAL_HOURS)
+
+    def sync(self, trias_jira: "TriasJira", jql_query: str, fields: Optional[List[str]] = None) -> List[dict]:
+        """Bring the stored results of a JQL query up to date and return all of them as raw issues.
+
+        A full search replaces the scope when it has never been synced or the last full sync is older than
+        full_resync_interval (this drops deleted and moved issues). Otherwise only issues updated since the watermark
+        are fetched and merged into the stored results.
+        """
+        scope = sync_scope(jql_query, fields)
+        now = dt.now(timezone.utc)
+        with self.engine.connect() as con:
+            state = con.execute(
+                sa.text("SELECT watermark, last_full_sync FROM jira_sync_state WHERE scope = :scope"),
+                {"scope": scope},
+            ).first()
+
+        full_sync = (
+            state is None
+            or state.watermark is None
+            or state.last_full_sync is None
+            or now - state.last_full_sync >= self.full_resync_interval
+        )
+        if full_sync:
+            search_jql = jql_query
+        else:
+            search_jql = delta_jql(jql_query, state.watermark - timedelta(minutes=SYNC_WATERMARK_OVERLAP_MINUTES))
+        # the raw JSON is all the store keeps, so no jira Issue resources are built for the results
+        raw_issues = list(iter_raw_issues(trias_jira, search_jql, fields))
+
+        watermarks = [jira_wall_time(raw.get("fields", {}).get("updated")) for raw in raw_issues]
+        watermark = max(filter(None, watermarks + [None if full_sync else state.watermark]), default=None)
+
+        with self.engine.begin() as con:
+            if full_sync:
+                con.execute(sa.text("DELETE FROM jira_issue_store WHERE scope = :scope"), {"scope": scope})
+            if raw_issues:
+                con.execute(
+                    sa.text(
+                        """
+                        INSERT INTO jira_issue_store (scope, issue_key, raw, updated)
+                        VALUES (:scope, :issue_key, CAST(:raw AS JSONB), :updated)
+                        ON CONFLICT (scope, issue_key) DO UPDATE SET
+                            raw = EXCLUDED.raw,
+                            updated = EXCLUDED.updated
+                        """
+                    ),
+                    [
+                        {"scope": scope, "issue_key": raw["key"], "raw": json.dumps(raw), "updated": updated}
+                        for raw, updated in zip(raw_issues, watermarks)
+                    ],
+                )
+            con.execute(
+                sa.text(
+                    """
+                    INSERT INTO jira_sync_state (scope, jql, watermark, last_full_sync, last_sync)
+                    VALUES (:scope, :jql, :watermark, :now, :now)
+                    ON CONFLICT (scope) DO UPDATE SET
+                        jql = EXCLUDED.jql,
+                        watermark = EXCLUDED.watermark,
+                        last_full_sync = CASE WHEN :full_sync THEN EXCLUDED.last_full_sync
+                            ELSE jira_sync_state.last_full_sync END,
+                        last_sync = EXCLUDED.last_sync
+                    """
+                ),
+                {"scope": scope, "jql": jql_query, "watermark": watermark, "now": now, "full_sync": full_sync},
+            )
+            rows = con.execute(
+                sa.text("SELECT raw FROM jira_issue_store WHERE scope = :scope ORDER BY issue_key"), {"scope": scope}
+            ).all()
+
+        logger.info(
+            f"{'Full' if full_sync else 'Incremental'} sync fetched {len(raw_issues)} issues from Jira, "
+            f"serving {len(rows)} from the issue store."
+        )
+        return [row.raw for row in rows]
+
+    def prune(self, older_than: timedelta) -> None:
+        """Delete scopes (e.g. old hierarchy chunks) that have not been synced for a while."""
+        cutoff = dt.now(timezone.utc) - older_than
+        with self.engine.begin() as con:
+            con.execute(
+                sa.text(
+                    """
+                    DELETE FROM jira_issue_store WHERE scope IN (
+                        SELECT scope FROM jira_sync_state WHERE last_sync < :cutoff
+                    )
+                    """
+                ),
+                {"cutoff": cutoff},
+            )
+            con.execute(sa.text("DELETE FROM jira_sync_state WHERE last_sync < :cutoff"), {"cutoff": cutoff})
@@ -0,0 +1,177 @@
+"""High-water mark of the source tables reconciled by the last successful run, for incremental runs."""
+
+from dataclasses import dataclass, field
+from datetime import datetime as dt
+from datetime import timedelta, timezone
+from typing import TYPE_CHECKING, Iterable, List, Optional, Set
+
+import sqlalchemy as sa
+from loguru import logger
+
+from jira_bot.lib.query.database import fetch_all_by_keys
+from jira_bot.lib.tools.constants import (
+    FIELD_CROP_SEASON_UUID,
+    FIELD_LAST_UPDATED,
+    FIELD_NAME,
+    FIELD_PROTOCOL,
+    FIELD_PROTOCOL_UUID,
+    FIELD_TRIAL,
+    FIELD_UUID,
+    RECONCILE_FULL_SWEEP_INTERVAL_HOURS,
+    RECONCILE_WATERMARK_OVERLAP_MINUTES,
+    UPLOADED_CROPSEASON_UUID,
+    UPLOADED_DATA_TABLE,
+)
+
+if TYPE_CHECKING:
+    from jira_bot.lib.core.jira_connections import JiraEpic, JiraIssue, JiraSubTask
+
+SOURCE_TABLES = [FIELD_PROTOCOL, FIELD_TRIAL, UPLOADED_DATA_TABLE]
+
+
+def jira_updated(entity) -> Optional[dt]:
+    """Time a Jira ticket was last updated, None if unknown."""
+    timestamp = entity.issue.raw.get("fields", {}).get("updated")
+    if not timestamp:
+        return None
+    return dt.strptime(timestamp, "%Y-%m-%dT%H:%M:%S.%f%z")
+
+
+@dataclass
+class ReconcilePlan:
+    """Which tickets a run reconciles: all of them in a full sweep, otherwise those whose sources or tickets changed.
+
+    :param full_sweep: Reconcile every ticket.
+    :param started: Start of the run, the Jira watermark of the next run.
+    :param high_water: Latest last_updated of the source tables when the run started.
+    :param jira_since: Tickets updated in Jira since then are reconciled, whatever their sources.
+    :param protocol_names: Protocols changed since the last run, directly or through one of their trials.
+    :param trial_names: Trials changed since the last run, directly or through their uploaded data.
+    """
+
+    full_sweep: bool
+    started: dt
+    high_water: Optional[dt] = None
+    jira_since: Optional[dt] = None
+    protocol_names: Set[str] = field(default_factory=set)
+    trial_names: Set[str] = field(default_factory=set)
+
+    def updated_in_jira(self, entities: Iterable) -> bool:
+        """Whether any of the tickets was updated in Jira since the last run."""
+        return any((updated := jira_updated(entity)) is not None and updated >= self.jira_since for entity in entities)
+
+    def includes_epic(self, epic: "JiraEpic") -> bool:
+        """Whether the epic and the trials of its protocol are reconciled."""
+        return self.full_sweep or epic.protocol_id in self.protocol_names or self.updated_in_jira([epic])
+
+    def includes_issue(self, issue: "JiraIssue", subtasks: Optional[List["JiraSubTask"]] = None) -> bool:
+        """Whether the subtasks of the issue are reconciled."""
+        return (
+            self.full_sweep
+            or issue.summary in self.trial_names
+            or issue.trial_id in self.trial_names
+            or self.updated_in_jira([issue, *(subtasks or [])])
+        )
+
+
+@dataclass
+class ReconcileState:
+    """Postgres-backed watermark of the protocol, trial and uploaded_data rows reconciled by the last successful run.
+
+    A run reconciles everything when there is no watermark yet or the last full sweep is older than
+    full_sweep_interval (a safety net for changes that do not touch last_updated). Otherwise only the tickets whose
+    source rows changed since the watermark, or which were updated in Jira since the last run, are reconciled.
+    The state table is created by migrations/005_reconcile_state.sql.
+    """
+
+    engine: sa.engine
+    name: str = "sources"
+    full_sweep_interval: timedelta = timedelta(hours=RECONCILE_FULL_SWEEP_INTERVAL_HOURS)
+    overlap: timedelta = timedelta(minutes=RECONCILE_WATERMARK_OVERLAP_MINUTES)
+
+    def plan(self) -> ReconcilePlan:
+        """Plan the run: a full sweep, or the protocols and trials changed since the last successful run."""
+        started = dt.now(timezone.utc)
+        with self.engine.connect() as con:
+            state = con.execute(
+                sa.text("SELECT watermark, last_run, last_full_sweep FROM jira_reconcile_state WHERE name = :name"),
+                {"name": self.name},
+            ).first()
+            high_waters = [
+                con.execute(sa.text(f'SELECT max("{FIELD_LAST_UPDATED}") FROM {table}')).scalar()
+                for table in SOURCE_TABLES
+            ]
+        high_water = max(filter(None, high_waters), default=None)
+
+        if (
+            state is None
+            or state.watermark is None
+            or state.last_run is None
+            or state.last_full_sweep is None
+            or started - state.last_full_sweep >= self.full_sweep_interval
+        ):
+            logger.info("Reconciling all tickets (full sweep).")
+            return ReconcilePlan(full_sweep=True, started=started, high_water=high_water)
+
+        since = state.watermark - self.overlap
+        plan = ReconcilePlan(
+            full_sweep=False,
+            started=started,
+            high_water=max(filter(None, [high_water, state.watermark])),
+            jira_since=state.last_run - self.overlap,
+        )
+        self.collect_changes(plan, since)
+        logger.info(
+            f"Reconciling changes since {since}: {len(plan.protocol_names)} protocols, {len(plan.trial_names)} trials."
+        )
+        return plan
+
+    def collect_changes(self, plan: ReconcilePlan, since: dt) -> None:
+        """Add the protocols and trials changed since the given time to the plan, also those of changed uploads."""
+        protocols = self.changed_rows(FIELD_PROTOCOL, [FIELD_NAME], since)
+        trials = self.changed_rows(FIELD_TRIAL, [FIELD_NAME, FIELD_PROTOCOL_UUID], since)
+        uploads = self.changed_rows(UPLOADED_DATA_TABLE, [UPLOADED_CROPSEASON_UUID], since)
+        crop_season_uuids = {upload[0] for upload in uploads}
+        trials += fetch_all_by_keys(
+            self.engine, FIELD_TRIAL, FIELD_CROP_SEASON_UUID, crop_season_uuids, [FIELD_NAME, FIELD_PROTOCOL_UUID]
+        )
+        plan.trial_names = {trial.name for trial in trials}
+        plan.protocol_names = {protocol.name for protocol in protocols}
+        plan.protocol_names |= {
+            protocol.name
+            for protocol in fetch_all_by_keys(
+                self.engine, FIELD_PROTOCOL, FIELD_UUID, {trial.protocol_uuid for trial in trials}, [FIELD_NAME]
+            )
+        }
+
+    def changed_rows(self, table: str, columns: List[str], since: dt) -> List[sa.Row]:
+        """Given columns of the rows of a source table updated since the given time."""
+        column_list = ", ".join(f'"{column}"' for column in columns)
+        with self.engine.connect() as con:
+            return con.execute(
+                sa.text(f'SELECT {column_list} FROM {table} WHERE "{FIELD_LAST_UPDATED}" >= :since'), {"since": since}
+            ).all()
+
+    def commit(self, plan: ReconcilePlan) -> None:
+        """Store the watermark of a run that reconciled every ticket, the next run continues from there."""
+        with self.engine.begin() as con:
+            con.execute(
+                sa.text(
+                    """
+                    INSERT INTO jira_reconcile_state (name, watermark, last_run, last_full_sweep)
+                    VALUES (:name, :watermark, :last_run, :last_run)
+                    ON CONFLICT (name) DO UPDATE SET
+                        watermark = EXCLUDED.watermark,
+                        last_run = EXCLUDED.last_run,
+                        last_full_sweep = CASE WHEN :full_sweep THEN EXCLUDED.last_full_sweep
+                            ELSE jira_reconcile_state.last_full_sweep END
+                    """
+                ),
+                {
+                    "name": self.name,
+                    "watermark": plan.high_water,
+                    "last_run": plan.started,
+                    "full_sweep": plan.full_sweep,
+                },
+            )
+        logger.info(f"Reconcile watermark stored: {plan.high_water}")
@@ -0,0 +1,53 @@
+"""Tickets of a targeted run, given as Jira keys or as the UUIDs of their source rows."""
+
+from dataclasses import dataclass, field
+from typing import List
+
+import sqlalchemy as sa
+from loguru import logger
+
+from jira_bot.lib.query.database import fetch_all_by_keys
+from jira_bot.lib.tools.constants import FIELD_PROTOCOL_UUID, FIELD_TRIAL, FIELD_UUID
+
+
+@dataclass
+class RunTargets:
+    """Epics and issues a targeted run reconciles.
+
+    :param epic_keys: Keys of epics to reconcile with all their trials.
+    :param issue_keys: Keys of trial issues to reconcile with their subtasks.
+    :param protocol_uuids: Protocols whose epics are reconciled.
+    :param trial_uuids: Trials whose issues are reconciled, or whose epics if they have no issue yet.
+    """
+
+    epic_keys: List[str] = field(default_factory=list)
+    issue_keys: List[str] = field(default_factory=list)
+    protocol_uuids: List[str] = field(default_factory=list)
+    trial_uuids: List[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.epic_keys or self.issue_keys or self.protocol_uuids or self.trial_uuids)
+
+    def resolve(self, engine: sa.engine) -> "RunTargets":
+        """Map the protocol and trial UUIDs to ticket keys through the mirror tables, one query per table.
+
+        :param engine: SQLAlchemy engine.
+        :return: Targets with the epic and issue keys only.
+        """
+        issues = fetch_all_by_keys(engine, "issues", "trial_uuid", self.trial_uuids, ["issue_key", "trial_uuid"])
+        # a trial without an issue yet gets one when the epic of its protocol is reconciled
+        new_trial_uuids = set(self.trial_uuids) - {issue.trial_uuid for issue in issues}
+        new_trials = fetch_all_by_keys(engine, FIELD_TRIAL, FIELD_UUID, new_trial_uuids, [FIELD_PROTOCOL_UUID])
+        protocol_uuids = set(self.protocol_uuids) | {trial.protocol_uuid for trial in new_trials}
+        epics = fetch_all_by_keys(engine, "epics", FIELD_PROTOCOL_UUID, protocol_uuids, ["epic_key", "protocol_uuid"])
+
+        unresolved = protocol_uuids - {epic.protocol_uuid for epic in epics}
+        if unresolved:
+            logger.warning(f"No epic found for protocols {sorted(unresolved)}, they are left to the scheduled run.")
+        if len(new_trials) < len(new_trial_uuids):
+            logger.warning(f"{len(new_trial_uuids) - len(new_trials)} trials were not found in the trial table.")
+
+        epic_keys = sorted({*self.epic_keys, *(epic.epic_key for epic in epics)})
+        issue_keys = sorted({*self.issue_keys, *(issue.issue_key for issue in issues)})
+        logger.info(f"Targeted run of {len(epic_keys)} epics and {len(issue_keys)} issues.")
+        return RunTargets(epic_keys=epic_keys, issue_keys=issue_keys)
@@ -0,0 +1,122 @@
+"""In-memory indexes of the Trias source tables a run reconciles against."""
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import pandas as pd
+import sqlalchemy as sa
+from loguru import logger
+
+from jira_bot.lib.query.database import fetch_all_by_keys
+from jira_bot.lib.tools.constants import (
+    FARM_TABLE,
+    FIELD_NAME,
+    FIELD_PROTOCOL,
+    FIELD_PROTOCOL_UUID,
+    FIELD_TRIAL,
+    FIELD_UUID,
+    FIELDS_TABLE,
+    PROTOCOL_COLUMNS,
+    TRIAL_COLUMNS,
+    UPLOADED_CROPSEASON_UUID,
+    UPLOADED_DATA_TABLE,
+)
+
+
+def rows_to_frame(rows: List[sa.Row]) -> pd.DataFrame:
+    """Build a DataFrame from query rows, for the callers that work on frames."""
+    if not rows:
+        return pd.DataFrame()
+    return pd.DataFrame.from_records(rows, columns=list(rows[0]._fields))
+
+
+@dataclass
+class SourceIndex:
+    """Protocols, trials, uploaded data, fields and farms of a set of epics, loaded with one query per table.
+
+    Keys that were part of the preload are answered from memory, including keys without a row. Use has() to check
+    whether a key was preloaded and fall back to a database query otherwise.
+    """
+
+    protocols_by_name: Dict[str, sa.Row] = field(default_factory=dict)
+    trials_by_name: Dict[str, sa.Row] = field(default_factory=dict)
+    trials_by_protocol_uuid: Dict[str, List[sa.Row]] = field(default_factory=dict)
+    uploaded_data_by_crop_season: Dict[str, List[sa.Row]] = field(default_factory=dict)
+    field_names: Dict[str, Tuple[str, str]] = field(default_factory=dict)
+    farm_names: Dict[str, str] = field(default_factory=dict)
+    loaded_keys: Dict[str, Set[str]] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, engine: sa.engine, protocol_names: Iterable[str]) -> "SourceIndex":
+        """Load everything reachable from the given protocol names.
+
+        :param engine: SQLAlchemy engine.
+        :param protocol_names: Protocol IDs of the epics of the run.
+        :return: The populated index.
+        """
+        index = cls()
+        protocol_names = {name for name in protocol_names if name}
+        for protocol in fetch_all_by_keys(engine, FIELD_PROTOCOL, FIELD_NAME, protocol_names, PROTOCOL_COLUMNS):
+            index.protocols_by_name.setdefault(protocol.name, protocol)
+        index.loaded_keys["protocol"] = protocol_names
+
+        protocol_uuids = {protocol.uuid for protocol in index.protocols_by_name.values()}
+        trials = fetch_all_by_keys(engine, FIELD_TRIAL, FIELD_PROTOCOL_UUID, protocol_uuids, TRIAL_COLUMNS)
+        trials_by_protocol_uuid = defaultdict(list)
+        for trial in trials:
+            trials_by_protocol_uuid[trial.protocol_uuid].append(trial)
+            index.trials_by_name.setdefault(trial.name, trial)
+        index.trials_by_protocol_uuid = dict(trials_by_protocol_uuid)
+        index.loaded_keys["trials_of_protocol"] = protocol_uuids
+        index.loaded_keys["trial"] = set(index.trials_by_name)
+
+        crop_season_uuids = {trial.crop_season_uuid for trial in trials}
+        uploaded_data = fetch_all_by_keys(engine, UPLOADED_DATA_TABLE, UPLOADED_CROPSEASON_UUID, crop_season_uuids)
+        uploaded_data_by_crop_season = defaultdict(list)
+        for row in uploaded_data:
+            uploaded_data_by_crop_season[row._mapping[UPLOADED_CROPSEASON_UUID]].append(row)
+        index.uploaded_data_by_crop_season = dict(uploaded_data_by_crop_season)
+        index.loaded_keys["uploaded_data"] = crop_season_uuids
+
+        field_uuids = {trial.field_uuid for trial in trials}
+        fields = fetch_all_by_keys(engine, FIELDS_TABLE, FIELD_UUID, field_uuids, ["uuid", "name", "farmUuid"])
+        index.field_names = {row.uuid: (row.name, row.farmUuid) for row in fields}
+        index.loaded_keys["field"] = field_uuids
+
+        farm_uuids = {farm_uuid for _, farm_uuid in index.field_names.values()}
+        farms = fetch_all_by_keys(engine, FARM_TABLE, FIELD_UUID, farm_uuids, ["uuid", "name"])
+        index.farm_names = {row.uuid: row.name for row in farms}
+        index.loaded_keys["farm"] = farm_uuids
+
+        logger.info(
+            f"Preloaded {len(index.protocols_by_name)} protocols, {len(trials)} trials, {len(uploaded_data)} uploaded "
+            f"files, {len(index.field_names)} fields and {len(index.farm_names)} farms."
+        )
+        return index
+
+    def has(self, kind: str, key: str) -> bool:
+        """Whether a key of a kind (protocol, trial, trials_of_protocol, uploaded_data, field, farm) was preloaded."""
+        return key in self.loaded_keys.get(kind, ())
+
+    def protocol(self, name: str) -> Optional[sa.Row]:
+        """Protocol row by name."""
+        return self.protocols_by_name.get(name)
+
+    def trials_for_protocol(self, protocol_uuid: str) -> List[sa.Row]:
+        """Trial rows of a protocol."""
+        return self.trials_by_protocol_uuid.get(protocol_uuid, [])
+
+    def trial(self, name: str) -> Optional[sa.Row]:
+        """Trial row by name."""
+        return self.trials_by_name.get(name)
+
+    def uploaded_data(self, crop_season_uuid: str) -> pd.DataFrame:
+        """Uploaded data of a crop season, as a frame like get_record_by_uuid returns."""
+        return rows_to_frame(self.uploaded_data_by_crop_season.get(crop_season_uuid, []))
+
+    def farm_field_names(self, uuid: str, entity: str):
+        """Name of a farm, or name and farm UUID of a field, like query_farm_field_names."""
+        if entity == "farm":
+            return self.farm_names.get(uuid, "")
+        return self.field_names.get(uuid, ("", ""))
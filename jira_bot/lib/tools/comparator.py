@@ -0,0 +1,151 @@
+"""Batch comparison of Jira tickets with their rows in the bot's mirror tables."""
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Set
+
+import numpy as np
+import pandas as pd
+
+from jira_bot.lib.tools.constants import EPIC_SCHEMA, ISSUE_SCHEMA, SUBTASK_SCHEMA
+
+# columns holding lists of values whatever their schema type says, compared order-insensitively
+LIST_COLUMNS = ("components", "labels")
+
+Converter = Callable[[pd.Series], pd.Series]
+
+
+class FieldChange(NamedTuple):
+    """Value of a field in the mirror table and on the ticket."""
+
+    old: Any
+    new: Any
+
+
+def to_text(series: pd.Series) -> pd.Series:
+    """Strings, missing values stay missing."""
+    return series.astype("string")
+
+
+def to_sorted_text(series: pd.Series) -> pd.Series:
+    """Lists as the string of their sorted items, other values as strings."""
+    return series.map(
+        lambda value: str(sorted(map(str, value)))
+        if isinstance(value, (list, tuple, set, np.ndarray))
+        else value
+    ).astype("string")
+
+
+def to_number(series: pd.Series) -> pd.Series:
+    """Numbers as nullable floats, so 10, 10.0 and "10" are equal."""
+    return pd.to_numeric(series, errors="coerce").astype("Float64")
+
+
+def to_wall_clock(series: pd.Series) -> pd.Series:
+    """Timestamps and dates as naive wall-clock datetimes with second precision, ignoring any UTC offset."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        timestamps = series.dt.tz_localize(None) if series.dt.tz is not None else series
+        return timestamps.dt.floor("s")
+    if series.isna().all():
+        return pd.Series(pd.NaT, index=series.index, dtype="datetime64[ns]")
+    # the first 19 characters of Jira timestamps, str(datetime) and ISO dates are the local date and time
+    text = series.astype("string").str.slice(0, 19).str.replace("T", " ", regex=False)
+    return pd.to_datetime(text, errors="coerce", format="ISO8601")
+
+
+def compile_converter(column: str, dtype: str) -> Converter:
+    """Pick the column converter for a schema type, once per column instead of once per value."""
+    dtype = dtype.upper()
+    if "TIMESTAMP" in dtype or "DATE" in dtype:
+        return to_wall_clock
+    if "INTEGER" in dtype or "NUMERIC" in dtype:
+        return to_number
+    if dtype.endswith("[]") or column in LIST_COLUMNS:
+        return to_sorted_text
+    return to_text
+
+
+def as_records(records: Iterable[Any]) -> List[dict]:
+    """Dicts of records given as dicts or query rows."""
+    return [record if isinstance(record, dict) else record._asdict() for record in records]
+
+
+@dataclass
+class BatchComparator:
+    """Compares many tickets with their mirror rows at once, with converters compiled from a table schema.
+
+    :param schema: Column types of the mirror table, the compared fields.
+    :param key: Column identifying a ticket in both the tickets and the mirror rows.
+    """
+
+    schema: Dict[str, str]
+    key: str
+    converters: Dict[str, Converter] = field(init=False)
+
+    def __post_init__(self):
+        self.converters = {column: compile_converter(column, dtype) for column, dtype in self.schema.items()}
+
+    def normalize(self, records: Iterable[Any]) -> pd.DataFrame:
+        """One frame of the schema columns indexed by key, each column converted with its compiled converter."""
+        frame = pd.DataFrame(as_records(records), columns=list(dict.fromkeys([self.key, *self.schema])))
+        frame.index = frame[self.key].astype("string")
+        frame = frame[~frame.index.duplicated(keep="last")]
+        return pd.DataFrame({column: convert(frame[column]) for column, convert in self.converters.items()})
+
+    def compare(self, tickets: Iterable[Any], db_rows: Iterable[Any]) -> Dict[str, Set[str]]:
+        """Fields that differ between each ticket and its mirror row.
+
+        :param tickets: Current ticket values, dicts or rows keyed by schema column.
+        :param db_rows: Mirror rows of the tickets, extra columns are ignored.
+        :return: For every ticket key, the differing fields. All fields differ for a ticket without a mirror row.
+        """
+        return {key: set(changes) for key, changes in self.diff(tickets, db_rows).items()}
+
+    def diff(self, tickets: Iterable[Any], db_rows: Iterable[Any]) -> Dict[str, Dict[str, FieldChange]]:
+        """Old and new values of the fields that differ between each ticket and its mirror row.
+
+        :param tickets: Current ticket values, dicts or rows keyed by schema column.
+        :param db_rows: Mirror rows of the tickets, extra columns are ignored.
+        :return: For every ticket key, the changes of its differing fields, as stored and as on the ticket. The old
+            values of a ticket without a mirror row are None.
+        """
+        tickets, db_rows = as_records(tickets), as_records(db_rows)
+        jira = self.normalize(tickets)
+        if jira.empty:
+            return {}
+        db = self.normalize(db_rows)
+        in_db = jira.index.isin(db.index)
+        db = db.reindex(jira.index)
+        equal = (jira == db).fillna(False).astype(bool) | (jira.isna() & db.isna())
+        differs = ~equal.to_numpy(dtype=bool)
+        differs[~in_db] = True
+        columns = np.array(jira.columns)
+        ticket_by_key = {str(ticket.get(self.key)): ticket for ticket in tickets}
+        db_row_by_key = {str(row.get(self.key)): row for row in db_rows}
+        changes = {}
+        for key, row in zip(jira.index, differs):
+            ticket, db_row = ticket_by_key[key], db_row_by_key.get(key, {})
+            changes[key] = {column: FieldChange(db_row.get(column), ticket.get(column)) for column in columns[row]}
+        return changes
+
+
+def merge_changes(changes: Dict[str, FieldChange], before: dict, after: dict) -> Dict[str, FieldChange]:
+    """Add the fields modified on a ticket since its changes were computed, keeping the stored old values.
+
+    :param changes: Changes of the ticket against its mirror row, computed from before.
+    :param before: Field values of the ticket the changes were computed from.
+    :param after: Current field values of the ticket.
+    :return: Changes of after against the mirror row.
+    """
+    merged = dict(changes)
+    for column, value in after.items():
+        if column in merged:
+            merged[column] = FieldChange(merged[column].old, value)
+        elif value != before.get(column):
+            merged[column] = FieldChange(before.get(column), value)
+    return merged
+
+
+EPIC_COMPARATOR = BatchComparator(EPIC_SCHEMA, "epic_id")
+ISSUE_COMPARATOR = BatchComparator(ISSUE_SCHEMA, "issue_id")
+SUBTASK_COMPARATOR = BatchComparator(SUBTASK_SCHEMA, "file_uuid")
+COMPARATORS = {"epics": EPIC_COMPARATOR, "issues": ISSUE_COMPARATOR, "sub_tasks": SUBTASK_COMPARATOR}
@@ -32,6 +32,63 @@ ISSUE_TYPE_FIELD = "issuetype"
 RESOLUTION_FIELD = "resolution"
 EPIC_ISSUE_TYPE = "Epic"
 UNRESOLVED_RESOLUTION = "Unresolved"
+EPIC_LINK_FIELD = "Epic Link"
+PARENT_FIELD = "parent"
+KEY_FIELD = "key"
+# keep chunked `in (...)` clauses well below Jira's URL/POST size limits
+MAX_JQL_LENGTH = 6000
+SEARCH_PAGE_SIZE = 100
+SEARCH_MAX_WORKERS = 4
+ASYNC_MAX_CONNECTIONS = 20
+ASYNC_REQUEST_TIMEOUT = 30.0
+# local issue store: full resync (catches deletions/moves) after this many hours, otherwise `updated >=` deltas
+FULL_RESYNC_INTERVAL_HOURS = 6
+# minutes subtracted from the sync watermark, JQL dates only have minute precision
+SYNC_WATERMARK_OVERLAP_MINUTES = 2
+# incremental reconciliation: only tickets whose protocol, trial or uploaded_data rows changed since the last run,
+# with a full sweep of all tickets after this many hours
+RECONCILE_FULL_SWEEP_INTERVAL_HOURS = 24
+# minutes subtracted from the reconcile watermarks, for rows committed late and clock differences with Jira
+RECONCILE_WATERMARK_OVERLAP_MINUTES = 5
+# epics reconciled at the same time when a run is started with max_concurrency > 1
+RECONCILE_MAX_CONCURRENCY = 4
+# scopes not synced for this many days are pruned from the issue store
+ISSUE_STORE_RETENTION_DAYS = 7
+# user directory cache for email -> Jira user lookups; the snapshot file (optional) carries it across runs
+USER_CACHE_TTL_HOURS = 24
+USER_NEGATIVE_CACHE_TTL_MINUTES = 60
+USER_DIRECTORY_SNAPSHOT_PATH = os.environ.get("USER_DIRECTORY_SNAPSHOT_PATH")
+# query result cache of get_record_by_*; the bot's own tables are invalidated on every upsert
+QUERY_CACHE_MAX_ENTRIES = 10000
+QUERY_CACHE_DEFAULT_TTL_SECONDS = 60
+QUERY_CACHE_TABLE_TTL_SECONDS = {"epics": 900, "issues": 900, "sub_tasks": 900}
+# content hash of the tracked fields, stored on the epics, issues and sub_tasks rows
+FINGERPRINT_COLUMN = "fingerprint"
+# field-level changes written to the mirror tables, one row per updated record
+CHANGE_LOG_TABLE = "jira_change_log"
+# tickets per bulk-create request (Jira's default jira.bulk.create.limit is 50)
+BULK_CREATE_CHUNK_SIZE = 50
+# request governor for Jira calls: token bucket rate (requests/s) and AIMD-tuned requests in flight
+GOVERNOR_INITIAL_RATE = 10.0
+GOVERNOR_MIN_RATE = 0.5
+GOVERNOR_MAX_RATE = 50.0
+GOVERNOR_INITIAL_CONCURRENCY = 4
+GOVERNOR_MAX_CONCURRENCY = 16
+GOVERNOR_MAX_RETRIES = 5
+GOVERNOR_BACKOFF_BASE_SECONDS = 1.0
+GOVERNOR_BACKOFF_MAX_SECONDS = 60.0
+THROTTLED_STATUS_CODES = [429, 503]
+# webhook event mode
+WEBHOOK_PORT = 8080
+WEBHOOK_PATH = "/webhook"
+WEBHOOK_COALESCE_SECONDS = 10.0
+HANDLED_WEBHOOK_EVENTS = ["jira:issue_created", "jira:issue_updated"]
+# source change listener mode
+SOURCE_NOTIFY_CHANNEL = "jira_bot_source_changes"
+SOURCE_NOTIFY_DEBOUNCE_SECONDS = 5.0
+SOURCE_LISTENER_RECONNECT_SECONDS = 10.0
+SUBTASK_ISSUE_TYPE = "Sub-task"
+TRIAL_ISSUE_TYPE = "Trial"
 EPIC_NAME_PATTERN = r"^\d{4}-(?!XXX|XQA)\w{3}-\w{2}-\w{5}-\d{2}$"
 STATUS_WAITING = "Waiting"
 STATUS_WAITING_FOR_DATA = "Waiting for Data"
@@ -42,6 +99,13 @@ FIELD_CROP_SEASON_UUID = "crop_season_uuid"
 UPLOADED_CROPSEASON_UUID = "cropSeasonUuid"
 FIELD_FILE_UUID = "file_uuid"
 FIELD_UUID = "uuid"
+FIELD_LAST_UPDATED = "last_updated"
+FIELD_PROTOCOL_UUID = "protocol_uuid"
+FIELD_FIELD_UUID = "field_uuid"
+FIELD_FARM_UUID = "farmUuid"
+UPLOADED_DATA_TABLE = "uploaded_data"
+FARM_TABLE = "public.farm"
+FIELDS_TABLE = "public.fields"
 
 MZ_COLUMNS = ["uuid", "fieldUuid", "type", "name", "area", "replicate", "treatment", "geom"]
 
@@ -70,6 +134,54 @@ CUSTOM_FIELD_MAPPING = {
     "Trial Objective": "12507",
 }
 
+# Jira fields read by each JiraEntity property (custom fields by their CUSTOM_FIELD_MAPPING name),
+# used to request only the fields the bot needs. Keys and ids are always returned by Jira.
+PROPERTY_JIRA_FIELDS = {
+    "description": ["description"],
+    "protocol_uuid": ["description"],
+    "trial_uuid": ["description"],
+    "file_uuid": ["description"],
+    "last_updated": ["description"],
+    "summary": ["summary"],
+    "created": ["created"],
+    "updated": ["updated"],
+    "labels": ["labels"],
+    "status_name": ["status"],
+    "status_id": ["status"],
+    "status_category": ["status"],
+    "comments_count": ["comment"],
+    "due_date": ["duedate"],
+    "last_viewed": ["lastViewed"],
+    "watch_count": ["watches"],
+    "creator_email": ["creator"],
+    "assignee_email": ["assignee"],
+    "components": ["components"],
+    "subtask_ids": ["subtasks"],
+    "subtask_keys": ["subtasks"],
+    "parent_issue": ["parent"],
+    "issue_type": ["issuetype"],
+    "protocol_id": ["Protocol ID"],
+    "epic_name": ["Epic Name"],
+    "epic_link": ["Epic Link"],
+    "requestor_email": ["Requestor"],
+    "trial_engineer_email": ["Trial Engineer"],
+    "protocol_sheet": ["Protocol Sheet"],
+    "year_of_harvest": ["Year of Harvest"],
+    "business_case": ["Business Case"],
+    "trial_type": ["Trial Type"],
+    "trial_objective": ["Trial Objective"],
+    "budget": ["Budget"],
+    "paid_costs": ["Paid Costs"],
+    "planned_trials": ["Planned Trials"],
+    "executed_trials": ["Executed Trials"],
+    "forcasted_costs": ["Forcasted Costs"],
+    "country": ["Country"],
+    "crop": ["Crop"],
+    "sponsor": ["Sponsor"],
+    "cost_sheet": ["Cost Sheet"],
+    "trial_id": ["Trial-ID"],
+}
+
 EPIC_FIELDS = [
     "protocol_uuid",
     "last_updated",
@@ -181,6 +293,10 @@ TRIAL_DESC_COLUMNS = [
     "is_abandoned",
 ]
 
+# columns read from the source tables (the description tables include the keys the bot looks up)
+PROTOCOL_COLUMNS = EPIC_DESC_COLUMNS
+TRIAL_COLUMNS = TRIAL_DESC_COLUMNS
+
 STATUS_MAPPING = {
     "New Request": "1",
     "In Review": "10549",
@@ -224,6 +340,14 @@ WORKFLOW_TRANSITIONS = {
     },  # Ready to be Presented -> To be Done, Back to Analysis
 }
 
+# target status of transitions that are not named after the status they lead to
+TRANSITION_TARGET_STATUS = {
+    "Ready to be Presented": "Presenting",
+    "To be Done": "Done",
+    "Back to Data Control": "Data Control",
+    "Back to Analysis": "Analysis",
+}
+
 SUBTASKS_STATUS_MAPPING = {
     "New Request": "1",
     "In Progress": "3",
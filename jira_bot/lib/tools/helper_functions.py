@@ -14,19 +14,16 @@ import matplotlib.pyplot as plt
 import contextily as cx
 from loguru import logger
 from jira_bot.lib.query.database import (
-    get_record_by_name,
+    fetch_one,
     get_feature,
-    get_record_by_id,
-    upsert_epic,
-    upsert_trial,
-    upsert_subtask,
+    bulk_upsert,
+    update_changed_columns,
 )
 from jira_bot.lib.core.jira_connections import (
     JiraEpic,
-    JiraIssue,
     TriasJira,
 )
-from jira_bot.lib.tools.constants import MZ_COLUMNS
+from jira_bot.lib.tools.constants import MZ_COLUMNS, BULK_CREATE_CHUNK_SIZE
 
 class Trial(NamedTuple):
     """NamedTuple for a itertuple of a trial"""
@@ -37,7 +34,7 @@ class Trial(NamedTuple):
 
 def create_jira_description(
     jira_description: Optional[str],
-    db_description_result: pd.DataFrame,
+    db_description_result: Union[pd.DataFrame, NamedTuple, sa.Row, None],
     columns: list,
     epic: bool = True,
     farm_name: Optional[str] = None,
@@ -53,6 +50,9 @@ def create_jira_description(
     if farm_name:
         jira_description = f"Farm Name: {farm_name}\n" + jira_description
 
+    if db_description_result is None:
+        return jira_description
+
     if not isinstance(db_description_result, pd.DataFrame):
         db_description_result = pd.DataFrame([db_description_result._asdict()])
 
@@ -91,26 +91,6 @@ def create_jira_description(
     return jira_description
 
 
-def normalize_and_sort_data(df: pd.DataFrame, schema: dict) -> pd.DataFrame:
-    """Normalize and sort the data in the DataFrame according to the schema."""
-    for column, dtype in schema.items():
-        if column in df.columns:
-            if "VARCHAR" in dtype or "TEXT" in dtype:
-                df[column] = df[column].astype(str)
-            elif "INTEGER" in dtype:
-                df[column] = pd.to_numeric(df[column], errors="coerce").astype("Int64")
-            elif "NUMERIC" in dtype:
-                df[column] = pd.to_numeric(df[column], errors="coerce")
-            elif "TIMESTAMP" in dtype or "DATE" in dtype:
-                df[column] = pd.to_datetime(df[column], errors="coerce").dt.strftime("%Y-%m-%d %H:%M:%S")
-    if "components" in df.columns:
-        df["components"] = df["components"].apply(lambda x: str(sorted(x)) if isinstance(x, (list, set)) else x)
-    if "labels" in df.columns:
-        df["labels"] = df["labels"].apply(lambda x: str(sorted(x)) if isinstance(x, (list, set)) else x)
-    df = df[schema.keys()]
-    return df
-
-
 @dataclass
 class MapPlotter:
     """Class to plot a field boundary and plot zones with contextily."""
@@ -121,11 +101,11 @@ class MapPlotter:
     def buffer_io_plot_map(self, trial_name: str):
         """Plot the geodata and field on a map with contextily."""
         try:
-            trial = get_record_by_name(self.engine, "trial", "name", trial_name)
-            if not trial.empty:
-                field_uuid = trial.iloc[0]["field_uuid"]
+            trial = fetch_one(self.engine, "trial", "name", trial_name, ["field_uuid"])
+            if trial is not None:
+                field_uuid = trial.field_uuid
             else:
-                logger.warning("No trial found for name %s", trial_name)
+                logger.warning(f"No trial found for name {trial_name}")
                 return None
             management_zones = get_feature(self.engine, "management_zones", field_uuid, query_column="fieldUuid", to_utm=False)
             if not management_zones.empty:
@@ -175,26 +155,6 @@ class MapPlotter:
             return None
 
 
-def compare_fields(
-    jira_ticket_db: pd.DataFrame,
-    jira_dict: list[str],
-    jira_ticket: Union[JiraEpic, JiraIssue],
-    jira_schema: dict[str, str],
-) -> bool:
-    """Compare fields between JIRA ticket and database record."""
-    jira_ticket_db.drop(columns=["version", "update_timestamp"], inplace=True)
-    ticket_dict = {field: getattr(jira_ticket, field) for field in jira_dict}
-    ticket_df = pd.DataFrame([ticket_dict])
-    return normalize_sort_and_compare(ticket_df, jira_ticket_db, jira_schema)
-
-
-def normalize_sort_and_compare(jira_df: pd.DataFrame, db_df: pd.DataFrame, schema: dict) -> bool:
-    """Normalize, sort and compare the data."""
-    db_df_normalized_sorted = normalize_and_sort_data(db_df, schema)
-    jira_df_normalized_sorted = normalize_and_sort_data(jira_df, schema)
-    return not db_df_normalized_sorted.iloc[-1].equals(jira_df_normalized_sorted.iloc[-1])
-
-
 def create_labels(epic: JiraEpic) -> List[str]:
     """Create labels based on the epic information and retain original labels."""
     parts = epic.protocol_id.split("-")
@@ -207,18 +167,13 @@ def create_labels(epic: JiraEpic) -> List[str]:
 
 
 def search_user(trias_jira: TriasJira, user_email: str) -> Optional[Tuple[str, str]]:
-    """Search for a user by email and return their key and name."""
+    """Search for a user by email and return their key and name, through the run's user directory cache."""
     if user_email:
-        users = trias_jira.jira_connection.search_users(user=user_email)
-        if users:
-            user = users[0]
-            return user.key, user.name
-        return tuple()
+        return trias_jira.user_directory.get(trias_jira.jira_connection, user_email) or tuple()
     else:
         return tuple()
 
-def create_jira_ticket(
-    trias_jira: TriasJira,
+def build_jira_ticket_fields(
     project_id: str,
     summary: str,
     description: str,
@@ -227,8 +182,8 @@ def create_jira_ticket(
     labels: List[str],
     assignee: str,
     custom_fields: dict,
-) -> Optional[str]:
-    """Create a JIRA ticket with the given fields."""
+) -> dict:
+    """Build the create payload fields of a JIRA ticket."""
     fields = {
         "project": {"id": project_id},
         "summary": summary,
@@ -240,6 +195,24 @@ def create_jira_ticket(
     if parent_key:
         fields["parent"] = {"key": parent_key}
     fields.update(custom_fields)
+    return fields
+
+
+def create_jira_ticket(
+    trias_jira: TriasJira,
+    project_id: str,
+    summary: str,
+    description: str,
+    issue_type: str,
+    parent_key: Optional[str],
+    labels: List[str],
+    assignee: str,
+    custom_fields: dict,
+) -> Optional[str]:
+    """Create a JIRA ticket with the given fields."""
+    fields = build_jira_ticket_fields(
+        project_id, summary, description, issue_type, parent_key, labels, assignee, custom_fields
+    )
 
     try:
         new_issue = trias_jira.jira_connection.create_issue(fields)
@@ -250,6 +223,42 @@ def create_jira_ticket(
         return None
 
 
+@dataclass
+class BulkCreateResult:
+    """Outcome of one ticket of a bulk creation, in the order of the submitted field list."""
+
+    key: Optional[str]
+    error: Optional[str] = None
+
+
+def create_jira_tickets(
+    trias_jira: TriasJira, field_list: List[dict], chunk_size: int = BULK_CREATE_CHUNK_SIZE
+) -> List[BulkCreateResult]:
+    """Create JIRA tickets through the bulk-create endpoint, one request per chunk of tickets.
+
+    :param trias_jira: Jira connection.
+    :param field_list: Create payload fields of each ticket, see build_jira_ticket_fields.
+    :param chunk_size: Number of tickets per bulk request.
+    :return: One result per ticket, in the order of field_list. Failed tickets carry the error instead of a key.
+    """
+    results = []
+    for start in range(0, len(field_list), chunk_size):
+        chunk = field_list[start : start + chunk_size]
+        try:
+            created = trias_jira.jira_connection.create_issues(chunk, prefetch=False)
+        except Exception as e:
+            logger.error(f"Failed to bulk create {len(chunk)} tickets: {e}")
+            results.extend(BulkCreateResult(key=None, error=str(e)) for _ in chunk)
+            continue
+        for item in created:
+            if item["status"] == "Success":
+                logger.info(f"Ticket created: {item['issue'].key}")
+                results.append(BulkCreateResult(key=item["issue"].key))
+            else:
+                results.append(BulkCreateResult(key=None, error=str(item["error"])))
+    return results
+
+
 def upsert_record(
     engine: sa.engine,
     table_name: str,
@@ -258,26 +267,48 @@ def upsert_record(
     id_field: str,
     schema: dict,
     new_version: bool = False,
-):
-    """Upsert a record into the database."""
+) -> bool:
+    """Upsert a record into the database, the version is computed by the database. False if the upsert failed."""
+    logger.info(f"Upserting record {record_id} into the {table_name} table.")
+    return upsert_records(engine, table_name, [record_dict], [record_id] if new_version else [])
+
+
+def upsert_records(
+    engine: sa.engine, table_name: str, records: List[dict], new_version_ids: Optional[List[str]] = None
+) -> bool:
+    """Upsert many records of a table in one transaction.
+
+    :param engine: SQLAlchemy engine.
+    :param table_name: epics, issues or sub_tasks.
+    :param records: Records keyed by column name.
+    :param new_version_ids: IDs of existing records to store as a new version.
+    :return: False if the transaction failed and nothing was written.
+    """
+    try:
+        bulk_upsert(engine, table_name, records, new_version_ids or [])
+    except Exception as e:
+        logger.error(f"Error upserting {len(records)} records into the {table_name} table: {e}")
+        return False
+    return True
+
+
+def update_records(
+    engine: sa.engine,
+    table_name: str,
+    changed_records: List[Tuple[dict, dict]],
+    new_version_ids: Optional[List[str]] = None,
+) -> bool:
+    """Write the changed columns of existing records of a table in one transaction and log the changes.
+
+    :param engine: SQLAlchemy engine.
+    :param table_name: epics, issues or sub_tasks.
+    :param changed_records: Records keyed by column name, each with its field changes.
+    :param new_version_ids: IDs of the records to store as a new version.
+    :return: False if the transaction failed and nothing was written.
+    """
     try:
-        record_df = pd.DataFrame([record_dict])
-        # record_df = normalize_and_sort_data(record_df, schema)  # Ensure data conforms to the schema
-        existing_record = get_record_by_id(engine, table_name, id_field, record_id)
-
-        if not existing_record.empty:
-            record_df["version"] = (
-                existing_record["version"].iloc[-1] + 1 if new_version else existing_record["version"].iloc[-1]
-            )
-        else:
-            record_df["version"] = 0
-
-        logger.info(f"Upserting record {record_id} into the {table_name} table.")
-        if table_name == "epics":
-            upsert_epic(engine, record_df)
-        elif table_name == "issues":
-            upsert_trial(engine, record_df)
-        elif table_name == "sub_tasks":
-            upsert_subtask(engine, record_df)
+        update_changed_columns(engine, table_name, changed_records, new_version_ids or [])
     except Exception as e:
-        logger.error(f"Error upserting record {record_id} into the {table_name} table: {e}")
+        logger.error(f"Error updating {len(changed_records)} records of the {table_name} table: {e}")
+        return False
+    return True
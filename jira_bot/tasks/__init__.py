@@ -1,7 +1,7 @@
 from prefect import task, get_run_logger, get_client
 from prefect.runtime import flow_run
 import sqlalchemy as sa
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, List, Optional
 
 if TYPE_CHECKING:
     from jira_bot.lib.core.jira_connections import (
@@ -9,9 +9,14 @@ if TYPE_CHECKING:
         TriasEpics,
         TriasIssues,
         JiraEpic,
+        JiraHierarchy,
         JiraSubTask,
         TriasSubTasks,
     )
+    from jira_bot.lib.query.fingerprint import FingerprintIndex
+    from jira_bot.lib.query.reconcile_state import ReconcilePlan
+    from jira_bot.lib.query.run_targets import RunTargets
+    from jira_bot.lib.query.source_index import SourceIndex
 
 
 @task(name="rename-flow-run")
@@ -22,14 +27,27 @@ async def rename_flow_run(new_name: str):
         await client.update_flow_run(flow_run_id, name=new_name)
 
 @task(name="initialize-jira_bot-flow")
-def initialize(payload, logger):
-    from jira_bot.lib.core.event_handler import EventHandler
+def initialize(
+    payload: dict,
+    logger,
+    trias_jira: "TriasJira",
+    trias_epics: "TriasEpics",
+    trias_issues: "TriasIssues",
+    trias_subtasks: "TriasSubTasks",
+    engine: sa.engine,
+):
+    """Reconcile the ticket of a single webhook payload right away."""
+    from jira_bot.lib.core.event_handler import EventHandler, ProtocolManagerDispatcher
+    from jira_bot.lib.core.protocol_manager import ProtocolManager
 
     enable_loguru_support()
 
-    event_handler = EventHandler()
+    protocol_manager = ProtocolManager(trias_jira, trias_epics, trias_issues, trias_subtasks, engine)
+    event_handler = EventHandler(dispatch=ProtocolManagerDispatcher(protocol_manager))
     logger.info(f"payload received: {payload}")
-    return event_handler.handle(payload)
+    event = event_handler.handle(payload)
+    event_handler.flush(force=True)
+    return event
 
 
 def enable_loguru_support():
@@ -132,16 +150,52 @@ def get_aws_credentials(aws_region: str, mode: str = "cluster"):
 
 
 @task(name="initialize-trias-jira")
-def initialize_trias_jira(server_url: str, token: str, project_id: int) -> "TriasJira":
+def initialize_trias_jira(
+    server_url: str, token: str, project_id: int, engine: Optional[sa.engine] = None
+) -> "TriasJira":
+    """Connect to Jira, serving searches through the persistent issue store when an engine is given."""
+    from datetime import timedelta
     from jira_bot.lib.core.jira_connections import TriasJira
-
-    return TriasJira(server_url=server_url, token=token, project_id=project_id)
+    from jira_bot.lib.query.issue_store import IssueStore
+    from jira_bot.lib.tools.constants import ISSUE_STORE_RETENTION_DAYS
+
+    issue_store = None
+    if engine is not None:
+        issue_store = IssueStore(engine)
+        issue_store.prune(timedelta(days=ISSUE_STORE_RETENTION_DAYS))
+    return TriasJira(server_url=server_url, token=token, project_id=project_id, issue_store=issue_store)
+
+@task(name="resolve-jira-users")
+def resolve_jira_users(trias_jira: "TriasJira", epics: List["JiraEpic"]) -> None:
+    """Resolve the assignee, requestor and trial engineer users of all epics up front."""
+    emails = set()
+    for epic in epics:
+        emails.update((epic.assignee_email, epic.requestor_email, epic.trial_engineer_email))
+    trias_jira.user_directory.prefetch(trias_jira.jira_connection, emails)
 
 @task(name="get-trias-procotol-filter")
 def get_trias_protocol_filter(trias_jira: "TriasJira", filter_id: int) -> dict:
     
     return trias_jira.jira_connection.filter(filter_id)
 
+@task(name="search-epics-async")
+async def search_epics_async(trias_jira: "TriasJira", trias_epics: "TriasEpics", jql_query: str) -> List["JiraEpic"]:
+    """Search the epics of a JQL query with the async client, requesting all result pages at once.
+
+    The epics are bound to the synchronous client and added to its identity map, like the epics of get_epics.
+    """
+    from jira_bot.lib.core.async_jira import AsyncTriasJira
+    from jira_bot.lib.core.jira_connections import EPIC_JIRA_FIELDS
+
+    async with AsyncTriasJira(
+        trias_jira.server_url, trias_jira.token, trias_jira.project_id, governor=trias_jira.governor
+    ) as async_jira:
+        raw_epics = await async_jira.search_all(jql_query, fields=EPIC_JIRA_FIELDS)
+    epics = [trias_jira.to_issue(epic.raw) for epic in raw_epics]
+    trias_jira.remember(epics, EPIC_JIRA_FIELDS)
+    return [trias_epics.map_to_jira_epic(epic) for epic in epics]
+
+
 @task(name="initialize-trias-epics")
 def initialize_trias_epics(trias_jira: "TriasJira") -> "TriasEpics":
     from jira_bot.lib.core.jira_connections import TriasEpics
@@ -163,6 +217,61 @@ def initialize_trias_subtasks(trias_jira: "TriasJira") -> "TriasSubTasks":
     return TriasSubTasks(trias_jira=trias_jira)
 
 
+@task(name="prefetch-jira-hierarchy")
+def prefetch_jira_hierarchy(trias_jira: "TriasJira", epics: List["JiraEpic"]) -> "JiraHierarchy":
+    from jira_bot.lib.core.jira_connections import TriasHierarchy
+
+    return TriasHierarchy(trias_jira=trias_jira).prefetch(epics)
+
+
+@task(name="preload-source-tables")
+def preload_source_tables(engine: sa.engine, epics: List["JiraEpic"]) -> "SourceIndex":
+    """Load the protocols, trials, uploaded data, fields and farms of all epics with one query per table."""
+    from jira_bot.lib.query.source_index import SourceIndex
+
+    return SourceIndex.load(engine, [epic.protocol_id for epic in epics])
+
+
+@task(name="plan-reconciliation")
+def plan_reconciliation(engine: sa.engine) -> "ReconcilePlan":
+    """Decide between a full sweep and reconciling only the tickets changed since the last successful run."""
+    from jira_bot.lib.query.reconcile_state import ReconcileState
+
+    return ReconcileState(engine).plan()
+
+
+@task(name="commit-reconciliation")
+def commit_reconciliation(engine: sa.engine, plan: "ReconcilePlan") -> None:
+    """Store the watermark of the completed run."""
+    from jira_bot.lib.query.reconcile_state import ReconcileState
+
+    ReconcileState(engine).commit(plan)
+
+
+@task(name="resolve-run-targets")
+def resolve_run_targets(engine: sa.engine, targets: "RunTargets") -> "RunTargets":
+    """Resolve the protocol and trial UUIDs of a targeted run to epic and issue keys."""
+    return targets.resolve(engine)
+
+
+@task(name="preload-fingerprints")
+def preload_fingerprints(engine: sa.engine, hierarchy: "JiraHierarchy") -> "FingerprintIndex":
+    """Load the stored content fingerprints and compare all changed tickets of the hierarchy in one batch per table."""
+    from jira_bot.lib.query.fingerprint import FingerprintIndex
+    from jira_bot.lib.tools.constants import EPIC_FIELDS, ISSUE_FIELDS, SUBTASK_FIELDS
+
+    fingerprints = FingerprintIndex.load(engine)
+    tickets = {
+        "epics": (hierarchy.epics.values(), EPIC_FIELDS),
+        "issues": ([issue for issues in hierarchy.issues_by_epic.values() for issue in issues], ISSUE_FIELDS),
+        "sub_tasks": ([sub for subtasks in hierarchy.subtasks_by_issue.values() for sub in subtasks], SUBTASK_FIELDS),
+    }
+    for table_name, (entities, fields) in tickets.items():
+        records = [{field: getattr(entity, field) for field in fields} for entity in entities]
+        fingerprints.compare(engine, table_name, records)
+    return fingerprints
+
+
 @task(name="manage-epic")
 def manage_epic(
     trias_jira: "TriasJira",
@@ -171,11 +280,64 @@ def manage_epic(
     trias_subtasks: "TriasSubTasks",
     engine: sa.engine,
     epic: "JiraEpic",
-):
+    hierarchy: Optional["JiraHierarchy"] = None,
+    source_index: Optional["SourceIndex"] = None,
+    fingerprints: Optional["FingerprintIndex"] = None,
+) -> bool:
+    """Reconcile an epic and the issues of its trials, False if any of its tickets was not reconciled."""
     from jira_bot.lib.core.protocol_manager import ProtocolManager
 
-    protocol_manager = ProtocolManager(trias_jira, trias_epics, trias_issues, trias_subtasks, engine)
+    protocol_manager = ProtocolManager(
+        trias_jira, trias_epics, trias_issues, trias_subtasks, engine, hierarchy, source_index, fingerprints
+    )
     protocol_manager.manage_single_epic(epic)
+    return not protocol_manager.failures
+
+
+@task(name="manage-epics-concurrently")
+async def manage_epics_concurrently(
+    trias_jira: "TriasJira",
+    trias_epics: "TriasEpics",
+    trias_issues: "TriasIssues",
+    trias_subtasks: "TriasSubTasks",
+    engine: sa.engine,
+    epics: List["JiraEpic"],
+    hierarchy: "JiraHierarchy",
+    source_index: Optional["SourceIndex"] = None,
+    fingerprints: Optional["FingerprintIndex"] = None,
+    max_concurrency: int = 1,
+) -> List[str]:
+    """Reconcile epics, max_concurrency at a time, and return the keys of the tickets that were not reconciled."""
+    from jira_bot.lib.core.protocol_manager import ProtocolManager
+
+    protocol_manager = ProtocolManager(
+        trias_jira, trias_epics, trias_issues, trias_subtasks, engine, hierarchy, source_index, fingerprints
+    )
+    await protocol_manager.manage_epics_concurrently(epics, max_concurrency)
+    return protocol_manager.failures
+
+
+@task(name="manage-subtasks-concurrently")
+async def manage_subtasks_concurrently(
+    trias_jira: "TriasJira",
+    trias_epics: "TriasEpics",
+    trias_issues: "TriasIssues",
+    trias_subtasks: "TriasSubTasks",
+    engine: sa.engine,
+    issue_keys: List[str],
+    hierarchy: "JiraHierarchy",
+    source_index: Optional["SourceIndex"] = None,
+    fingerprints: Optional["FingerprintIndex"] = None,
+    max_concurrency: int = 1,
+) -> List[str]:
+    """Reconcile the subtasks of issues, max_concurrency issues at a time, and return the keys not reconciled."""
+    from jira_bot.lib.core.protocol_manager import ProtocolManager
+
+    protocol_manager = ProtocolManager(
+        trias_jira, trias_epics, trias_issues, trias_subtasks, engine, hierarchy, source_index, fingerprints
+    )
+    await protocol_manager.manage_subtasks_concurrently(issue_keys, max_concurrency)
+    return protocol_manager.failures
 
 
 @task(name="manage-subtasks-for-issue")
@@ -186,8 +348,41 @@ def manage_subtasks_for_issue(
     trias_subtasks: "TriasSubTasks",
     engine: sa.engine,
     issue_key: str,
-):
+    hierarchy: Optional["JiraHierarchy"] = None,
+    source_index: Optional["SourceIndex"] = None,
+    fingerprints: Optional["FingerprintIndex"] = None,
+) -> bool:
+    """Reconcile the subtasks of an issue, False if any of them was not reconciled."""
     from jira_bot.lib.core.protocol_manager import ProtocolManager
 
-    protocol_manager = ProtocolManager(trias_jira, trias_epics, trias_issues, trias_subtasks, engine)
+    protocol_manager = ProtocolManager(
+        trias_jira, trias_epics, trias_issues, trias_subtasks, engine, hierarchy, source_index, fingerprints
+    )
     protocol_manager.manage_subtasks_for_issue(issue_key)
+    return not protocol_manager.failures
+
+
+@task(name="manage-issue")
+def manage_issue(
+    trias_jira: "TriasJira",
+    trias_epics: "TriasEpics",
+    trias_issues: "TriasIssues",
+    trias_subtasks: "TriasSubTasks",
+    engine: sa.engine,
+    issue_key: str,
+) -> bool:
+    """Reconcile a trial issue and its subtasks, False if any of its tickets was not reconciled.
+
+    The issue is passed by key and loaded here (from the identity map if the flow already loaded it), prefect would
+    otherwise rebuild the JiraIssue from its fields when the task is called.
+    """
+    from loguru import logger
+    from jira_bot.lib.core.protocol_manager import ProtocolManager
+
+    issue = trias_issues.get_issue_by_key(issue_key)
+    if issue is None:
+        logger.warning(f"Issue {issue_key} not found in Jira.")
+        return False
+    protocol_manager = ProtocolManager(trias_jira, trias_epics, trias_issues, trias_subtasks, engine)
+    protocol_manager.manage_single_issue(issue)
+    return not protocol_manager.failures
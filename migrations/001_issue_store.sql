@@ -0,0 +1,16 @@
+-- Persistent store of the raw Jira issues synced by the bot, one scope per JQL query and field projection
+CREATE TABLE IF NOT EXISTS jira_issue_store (
+    scope VARCHAR(32) NOT NULL,
+    issue_key VARCHAR(255) NOT NULL,
+    raw JSONB NOT NULL,
+    updated TIMESTAMP,
+    PRIMARY KEY (scope, issue_key)
+);
+
+CREATE TABLE IF NOT EXISTS jira_sync_state (
+    scope VARCHAR(32) PRIMARY KEY,
+    jql TEXT NOT NULL,
+    watermark TIMESTAMP,
+    last_full_sync TIMESTAMP WITH TIME ZONE,
+    last_sync TIMESTAMP WITH TIME ZONE
+);
@@ -0,0 +1,4 @@
+-- Content fingerprint of the tracked fields of each mirror row, written by bulk_upsert and update_changed_columns
+ALTER TABLE epics ADD COLUMN IF NOT EXISTS "fingerprint" VARCHAR(32);
+ALTER TABLE issues ADD COLUMN IF NOT EXISTS "fingerprint" VARCHAR(32);
+ALTER TABLE public.sub_tasks ADD COLUMN IF NOT EXISTS "fingerprint" VARCHAR(32);
@@ -0,0 +1,8 @@
+-- Old and new values of the columns update_changed_columns writes, one JSON object per record and write
+CREATE TABLE IF NOT EXISTS jira_change_log (
+    id BIGSERIAL PRIMARY KEY,
+    table_name VARCHAR(32) NOT NULL,
+    record_id VARCHAR(255) NOT NULL,
+    changes JSONB NOT NULL,
+    changed_at TIMESTAMP WITH TIME ZONE NOT NULL
+);
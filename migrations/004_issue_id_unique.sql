@@ -0,0 +1,16 @@
+-- One mirror row per Jira issue: bulk_upsert resolves conflicts on issue_id and update_changed_columns updates by it.
+-- Upserts used to conflict on the row uuid, which they never set, so every full write appended a row; keep the most
+-- recently written row of each issue.
+DELETE FROM issues
+WHERE ctid IN (
+    SELECT ctid FROM (
+        SELECT ctid, ROW_NUMBER() OVER (
+            PARTITION BY issue_id ORDER BY update_timestamp DESC NULLS LAST, version DESC NULLS LAST
+        ) AS row_number
+        FROM issues
+        WHERE issue_id IS NOT NULL
+    ) ranked
+    WHERE row_number > 1
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS issues_issue_id_key ON issues (issue_id);
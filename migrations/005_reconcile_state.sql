@@ -0,0 +1,7 @@
+-- High-water mark of the source tables reconciled by the last successful run, read and stored by ReconcileState
+CREATE TABLE IF NOT EXISTS jira_reconcile_state (
+    name VARCHAR(32) PRIMARY KEY,
+    watermark TIMESTAMP,
+    last_run TIMESTAMP WITH TIME ZONE,
+    last_full_sweep TIMESTAMP WITH TIME ZONE
+);
@@ -0,0 +1,49 @@
+-- Notifications read by SourceListener (jira_listener_flow) when the ETL writes protocols, trials or uploaded data.
+-- The triggers are statement-level: one notification per distinct key a statement wrote, read from its transition
+-- table, instead of one trigger call per row of a bulk load. The payloads carry only the keys the bot maps back to
+-- tickets, NOTIFY payloads are small.
+CREATE OR REPLACE FUNCTION jira_bot_notify_source_change() RETURNS trigger AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'protocol' THEN
+        PERFORM pg_notify('jira_bot_source_changes', json_build_object(
+            'table', TG_TABLE_NAME, 'protocol_uuid', changed."uuid")::text)
+        FROM (SELECT DISTINCT "uuid" FROM changed_rows) AS changed;
+    ELSIF TG_TABLE_NAME = 'trial' THEN
+        PERFORM pg_notify('jira_bot_source_changes', json_build_object(
+            'table', TG_TABLE_NAME, 'protocol_uuid', changed."protocol_uuid",
+            'crop_season_uuid', changed."crop_season_uuid")::text)
+        FROM (SELECT DISTINCT "protocol_uuid", "crop_season_uuid" FROM changed_rows) AS changed;
+    ELSE
+        PERFORM pg_notify('jira_bot_source_changes', json_build_object(
+            'table', TG_TABLE_NAME, 'crop_season_uuid', changed."cropSeasonUuid")::text)
+        FROM (SELECT DISTINCT "cropSeasonUuid" FROM changed_rows) AS changed;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- a trigger with a transition table handles a single event, so inserts and updates get a trigger each. The row-level
+-- trigger the listener flow used to create at runtime is replaced
+DROP TRIGGER IF EXISTS jira_bot_notify_source_change ON protocol;
+DROP TRIGGER IF EXISTS jira_bot_notify_source_insert ON protocol;
+DROP TRIGGER IF EXISTS jira_bot_notify_source_update ON protocol;
+CREATE TRIGGER jira_bot_notify_source_insert AFTER INSERT ON protocol
+    REFERENCING NEW TABLE AS changed_rows FOR EACH STATEMENT EXECUTE FUNCTION jira_bot_notify_source_change();
+CREATE TRIGGER jira_bot_notify_source_update AFTER UPDATE ON protocol
+    REFERENCING NEW TABLE AS changed_rows FOR EACH STATEMENT EXECUTE FUNCTION jira_bot_notify_source_change();
+
+DROP TRIGGER IF EXISTS jira_bot_notify_source_change ON trial;
+DROP TRIGGER IF EXISTS jira_bot_notify_source_insert ON trial;
+DROP TRIGGER IF EXISTS jira_bot_notify_source_update ON trial;
+CREATE TRIGGER jira_bot_notify_source_insert AFTER INSERT ON trial
+    REFERENCING NEW TABLE AS changed_rows FOR EACH STATEMENT EXECUTE FUNCTION jira_bot_notify_source_change();
+CREATE TRIGGER jira_bot_notify_source_update AFTER UPDATE ON trial
+    REFERENCING NEW TABLE AS changed_rows FOR EACH STATEMENT EXECUTE FUNCTION jira_bot_notify_source_change();
+
+DROP TRIGGER IF EXISTS jira_bot_notify_source_change ON uploaded_data;
+DROP TRIGGER IF EXISTS jira_bot_notify_source_insert ON uploaded_data;
+DROP TRIGGER IF EXISTS jira_bot_notify_source_update ON uploaded_data;
+CREATE TRIGGER jira_bot_notify_source_insert AFTER INSERT ON uploaded_data
+    REFERENCING NEW TABLE AS changed_rows FOR EACH STATEMENT EXECUTE FUNCTION jira_bot_notify_source_change();
+CREATE TRIGGER jira_bot_notify_source_update AFTER UPDATE ON uploaded_data
+    REFERENCING NEW TABLE AS changed_rows FOR EACH STATEMENT EXECUTE FUNCTION jira_bot_notify_source_change();
@@ -0,0 +1,93 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from jira_bot.lib.core.async_jira import AsyncTriasJira
+from jira_bot.lib.core.rate_limiter import RequestGovernor
+
+TOTAL_ISSUES = 250
+
+
+class StubJiraHandler(BaseHTTPRequestHandler):
+    """Serves a paginated search and an issue endpoint, throttling the first request of each issue."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def send_json(self, status: int, body: dict, headers: dict = None) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        self.server.ports.add(self.client_address[1])
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        start, size = request["startAt"], request["maxResults"]
+        issues = [{"key": f"TEST-{i}", "fields": {}} for i in range(start, min(start + size, TOTAL_ISSUES))]
+        self.send_json(200, {"startAt": start, "total": TOTAL_ISSUES, "issues": issues})
+
+    def do_GET(self):
+        self.server.ports.add(self.client_address[1])
+        key = self.path.split("?")[0].rsplit("/", 1)[-1]
+        if key not in self.server.throttled:
+            self.server.throttled.add(key)
+            self.send_json(429, {}, {"Retry-After": "0"})
+            return
+        self.send_json(200, {"key": key, "fields": {"summary": key}})
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubJiraHandler)
+    server.ports, server.throttled = set(), set()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def client_for(server, **kwargs) -> AsyncTriasJira:
+    governor = RequestGovernor(rate=1000, max_rate=1000, backoff_base=0.01, backoff_max=0.01)
+    return AsyncTriasJira(f"http://127.0.0.1:{server.server_port}", "token", 1, governor=governor, **kwargs)
+
+
+def test_search_all_fetches_every_page(stub_server):
+    async def search():
+        async with client_for(stub_server) as async_jira:
+            return await async_jira.search_all("project = TEST", page_size=100)
+
+    issues = asyncio.run(search())
+
+    assert [issue.key for issue in issues] == [f"TEST-{i}" for i in range(TOTAL_ISSUES)]
+
+
+def test_throttled_requests_are_retried(stub_server):
+    async def get_issue():
+        async with client_for(stub_server) as async_jira:
+            return await async_jira.issue("TEST-1")
+
+    issue = asyncio.run(get_issue())
+
+    assert issue.fields.summary == "TEST-1"
+
+
+def test_requests_reuse_pooled_connections(stub_server):
+    async def get_issues():
+        async with client_for(stub_server, max_connections=2) as async_jira:
+            for _ in range(5):
+                await async_jira.search_issues("project = TEST", max_results=10)
+
+    asyncio.run(get_issues())
+
+    assert len(stub_server.ports) == 1
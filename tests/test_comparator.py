@@ -0,0 +1,74 @@
+import datetime
+from collections import namedtuple
+
+from jira_bot.lib.tools.comparator import BatchComparator, FieldChange, merge_changes
+
+SCHEMA = {"updated": "TIMESTAMP", "watch_count": "INTEGER", "labels": "TEXT[]", "summary": "TEXT"}
+Row = namedtuple("Row", ["issue_id", "updated", "watch_count", "labels", "summary", "version"])
+
+
+def ticket(issue_id: str, **values) -> dict:
+    return {
+        "issue_id": issue_id,
+        "updated": datetime.datetime(2024, 5, 1, 10, 30, 15, 500000),
+        "watch_count": 2,
+        "labels": ["b", "a"],
+        "summary": "Trial",
+        **values,
+    }
+
+
+def db_row(issue_id: str, **values) -> Row:
+    row = {
+        "issue_id": issue_id,
+        "updated": "2024-05-01T10:30:15.000+0200",
+        "watch_count": 2.0,
+        "labels": ["a", "b"],
+        "summary": "Trial",
+        "version": 3,
+    }
+    return Row(**{**row, **values})
+
+
+def test_equal_values_in_other_representations_do_not_differ():
+    comparator = BatchComparator(SCHEMA, "issue_id")
+
+    assert comparator.diff([ticket("1")], [db_row("1")]) == {"1": {}}
+
+
+def test_diff_returns_stored_and_ticket_values_of_changed_fields():
+    comparator = BatchComparator(SCHEMA, "issue_id")
+
+    changes = comparator.diff([ticket("1", summary="Trial 2", watch_count=3), ticket("2")], [db_row("1"), db_row("2")])
+
+    assert changes == {
+        "1": {"summary": FieldChange("Trial", "Trial 2"), "watch_count": FieldChange(2.0, 3)},
+        "2": {},
+    }
+
+
+def test_ticket_without_mirror_row_differs_in_every_field():
+    comparator = BatchComparator(SCHEMA, "issue_id")
+
+    changes = comparator.diff([ticket("1", summary=None)], [])
+
+    assert set(changes["1"]) == set(SCHEMA)
+    assert changes["1"]["summary"] == FieldChange(None, None)
+
+
+def test_missing_values_are_equal():
+    comparator = BatchComparator(SCHEMA, "issue_id")
+
+    assert comparator.compare([ticket("1", updated=None)], [db_row("1", updated=None)]) == {"1": set()}
+    assert comparator.diff([], [db_row("1")]) == {}
+
+
+def test_merge_changes_keeps_the_stored_values():
+    changes = {"summary": FieldChange("Old", "Trial")}
+    before = {"summary": "Trial", "description": "a"}
+    after = {"summary": "Trial 2", "description": "b"}
+
+    assert merge_changes(changes, before, after) == {
+        "summary": FieldChange("Old", "Trial 2"),
+        "description": FieldChange("a", "b"),
+    }
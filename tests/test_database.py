@@ -0,0 +1,195 @@
+from unittest.mock import MagicMock
+
+import pandas as pd
+import pytest
+import sqlalchemy as sa
+
+from jira_bot.lib.query import database
+from jira_bot.lib.query.database import QueryCache, bulk_upsert
+
+
+@pytest.fixture
+def engine() -> MagicMock:
+    return MagicMock()
+
+
+@pytest.fixture
+def executed(monkeypatch) -> list:
+    executed = []
+    monkeypatch.setattr(
+        database, "execute_values", lambda cursor, sql, rows, page_size: executed.append((sql, rows, page_size))
+    )
+    return executed
+
+
+def cursor(engine: MagicMock) -> MagicMock:
+    return engine.begin.return_value.__enter__.return_value.connection.cursor.return_value
+
+
+def test_upsert_conflicts_on_the_key_column_and_keeps_the_version(engine, executed):
+    bulk_upsert(engine, "issues", [{"issue_id": "10001", "issue_key": "TM-1", "version": 7}])
+
+    [(sql, rows, page_size)] = executed
+    assert sql.startswith("INSERT INTO issues (")
+    assert 'ON CONFLICT ("issue_id") DO UPDATE SET' in sql
+    assert '"issue_id" = EXCLUDED' not in sql
+    assert '"version" = EXCLUDED' not in sql
+    assert '"issue_key" = EXCLUDED."issue_key"' in sql
+    assert rows[0][-1] == 0
+    assert page_size == 500
+    cursor(engine).execute.assert_not_called()
+
+
+def test_upsert_bumps_the_version_of_new_version_ids_first(engine, executed):
+    bulk_upsert(engine, "sub_tasks", [{"subtask_key": "TM-2"}], new_version_ids=["TM-2"])
+
+    cursor(engine).execute.assert_called_once_with(
+        'UPDATE public.sub_tasks SET "version" = "version" + 1 WHERE "subtask_key" IN %s', (("TM-2",),)
+    )
+    assert executed[0][0].startswith("INSERT INTO public.sub_tasks (")
+
+
+def test_upsert_keeps_the_last_record_of_a_key(engine, executed):
+    bulk_upsert(engine, "epics", [{"epic_key": "TM-1", "summary": "old"}, {"epic_key": "TM-1", "summary": "new"}])
+
+    columns = [column for column in database.UPSERT_TABLES["epics"]["columns"] if column != "version"]
+    [(_, rows, _)] = executed
+    assert len(rows) == 1
+    assert rows[0][columns.index("summary")] == "new"
+    assert rows[0][columns.index("fingerprint")] is not None
+
+
+def test_upsert_of_no_records_does_not_connect(engine, executed):
+    bulk_upsert(engine, "issues", [])
+
+    engine.begin.assert_not_called()
+    assert executed == []
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(database.time, "monotonic", clock)
+    return clock
+
+
+def loader(result) -> MagicMock:
+    return MagicMock(return_value=result)
+
+
+def test_query_cache_is_off_unless_a_run_installs_one():
+    assert database.query_cache is None
+    load = loader(["row"])
+
+    database.cached_query("all", "trial", "name", "T-1", load)
+    database.cached_query("all", "trial", "name", "T-1", load)
+
+    assert load.call_count == 2
+
+
+def test_cached_results_expire_after_the_ttl_of_their_table(clock):
+    cache = QueryCache(default_ttl=60, table_ttls={"epics": 900})
+    trial, epic = loader(["trial"]), loader(["epic"])
+    cache.get_or_load(("all", "trial", "name", "T-1"), trial)
+    cache.get_or_load(("all", "epics", "epic_key", "TM-1"), epic)
+
+    clock.now = 61
+    cache.get_or_load(("all", "trial", "name", "T-1"), trial)
+    cache.get_or_load(("all", "epics", "epic_key", "TM-1"), epic)
+
+    assert trial.call_count == 2
+    assert epic.call_count == 1
+
+
+def test_least_recently_used_results_are_evicted(clock):
+    cache = QueryCache(max_entries=2)
+    loads = {key: loader([key]) for key in "abc"}
+    cache.get_or_load(("one", "trial", "name", "a"), loads["a"])
+    cache.get_or_load(("one", "trial", "name", "b"), loads["b"])
+    cache.get_or_load(("one", "trial", "name", "a"), loads["a"])
+    cache.get_or_load(("one", "trial", "name", "c"), loads["c"])
+
+    cache.get_or_load(("one", "trial", "name", "a"), loads["a"])
+    cache.get_or_load(("one", "trial", "name", "b"), loads["b"])
+
+    assert loads["a"].call_count == 1
+    assert loads["b"].call_count == 2
+    assert cache.stats()["entries"] == 2
+
+
+@pytest.mark.parametrize("empty_result", [None, [], pd.DataFrame()])
+def test_empty_results_are_cached(clock, empty_result):
+    cache = QueryCache()
+    load = loader(empty_result)
+
+    cache.get_or_load(("one", "protocol", "name", "P-9"), load)
+    result = cache.get_or_load(("one", "protocol", "name", "P-9"), load)
+
+    assert load.call_count == 1
+    assert cache.stats()["hits"] == 1
+    assert result is None if empty_result is None else len(result) == 0
+
+
+def test_cached_frames_are_returned_as_copies(clock):
+    cache = QueryCache()
+    load = loader(pd.DataFrame({"uuid": ["u-1"]}))
+
+    cache.get_or_load(("first", "trial", "uuid", "u-1"), load)["uuid"] = "changed"
+
+    assert cache.get_or_load(("first", "trial", "uuid", "u-1"), load)["uuid"].tolist() == ["u-1"]
+
+
+def test_upserts_invalidate_the_cached_results_of_their_table(engine, executed, monkeypatch):
+    cache = QueryCache()
+    monkeypatch.setattr(database, "query_cache", cache)
+    load = loader(["row"])
+    database.cached_query("all", "issues", "issue_key", "TM-1", load)
+
+    bulk_upsert(engine, "issues", [{"issue_id": "10001", "issue_key": "TM-1"}])
+    database.cached_query("all", "issues", "issue_key", "TM-1", load)
+
+    assert load.call_count == 2
+
+
+@pytest.fixture
+def sqlite_engine() -> sa.Engine:
+    engine = sa.create_engine("sqlite://")
+    with engine.begin() as con:
+        con.execute(sa.text('CREATE TABLE trial (uuid TEXT, name TEXT, protocol_uuid TEXT)'))
+        con.execute(
+            sa.text("INSERT INTO trial VALUES ('t-1', 'T-1', 'p-1'), ('t-2', 'T-2', 'p-1'), ('t-3', 'T-3', 'p-2')")
+        )
+    return engine
+
+
+def test_fetch_one_returns_the_projected_row_or_none(sqlite_engine):
+    row = database.fetch_one(sqlite_engine, "trial", "name", "T-2", ["uuid", "protocol_uuid"])
+
+    assert row._asdict() == {"uuid": "t-2", "protocol_uuid": "p-1"}
+    assert database.fetch_one(sqlite_engine, "trial", "name", "T-9") is None
+
+
+def test_fetch_all_returns_every_matching_row(sqlite_engine):
+    rows = database.fetch_all(sqlite_engine, "trial", "protocol_uuid", "p-1", ["name"])
+
+    assert sorted(row.name for row in rows) == ["T-1", "T-2"]
+    assert database.fetch_all(sqlite_engine, "trial", "protocol_uuid", "p-9") == []
+
+
+def test_fetch_all_by_keys_matches_any_key_in_one_query(sqlite_engine):
+    rows = database.fetch_all_by_keys(sqlite_engine, "trial", "uuid", ["t-1", "t-3", "t-9", None, "t-1"], ["name"])
+
+    assert sorted(row.name for row in rows) == ["T-1", "T-3"]
+
+
+def test_fetch_all_by_keys_without_keys_does_not_connect(engine):
+    assert database.fetch_all_by_keys(engine, "trial", "uuid", [None, float("nan")]) == []
+    engine.connect.assert_not_called()
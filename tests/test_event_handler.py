@@ -0,0 +1,95 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from jira_bot.lib.core.event_handler import (
+    EventCoalescer,
+    EventHandler,
+    JiraEvent,
+    ProtocolManagerDispatcher,
+    parse_webhook_payload,
+)
+
+
+def payload(key: str, issue_type: str, event: str = "jira:issue_updated", **fields) -> dict:
+    return {
+        "webhookEvent": event,
+        "user": {"name": "someone"},
+        "issue": {"key": key, "fields": {"issuetype": {"name": issue_type}, **fields}},
+    }
+
+
+def test_parse_webhook_payload():
+    event = parse_webhook_payload(payload("TM-2", "Sub-task", parent={"key": "TM-1"}))
+
+    assert event == JiraEvent("jira:issue_updated", "TM-2", "Sub-task", parent_key="TM-1")
+    assert parse_webhook_payload(payload("TM-2", "Sub-task", event="jira:issue_deleted")) is None
+
+
+def test_coalescer_releases_one_event_per_key_after_the_window():
+    coalescer = EventCoalescer(window=60)
+    coalescer.add(JiraEvent("jira:issue_created", "TM-1", "Trial"))
+    coalescer.add(JiraEvent("jira:issue_updated", "TM-1", "Trial"))
+
+    assert coalescer.drain() == []
+    assert coalescer.drain(force=True) == [JiraEvent("jira:issue_updated", "TM-1", "Trial")]
+    assert len(coalescer) == 0
+
+
+def make_protocol_manager() -> SimpleNamespace:
+    return SimpleNamespace(
+        trias_jira=SimpleNamespace(identity_map=MagicMock()),
+        failures=[],
+        trias_epics=MagicMock(),
+        trias_issues=MagicMock(),
+        manage_single_epic=MagicMock(),
+        manage_single_issue=MagicMock(),
+        manage_subtasks_for_issue=MagicMock(),
+    )
+
+
+def test_trial_events_reconcile_the_trial_ticket():
+    protocol_manager = make_protocol_manager()
+    event_handler = EventHandler(dispatch=ProtocolManagerDispatcher(protocol_manager))
+
+    event_handler.handle(payload("TM-1", "Trial"))
+    assert event_handler.flush(force=True) == 1
+
+    protocol_manager.trias_jira.identity_map.clear.assert_called_once()
+    protocol_manager.trias_issues.get_issue_by_key.assert_called_once_with("TM-1")
+    protocol_manager.manage_single_issue.assert_called_once_with(
+        protocol_manager.trias_issues.get_issue_by_key.return_value
+    )
+
+
+def test_subtask_events_reconcile_the_subtasks_of_the_parent():
+    protocol_manager = make_protocol_manager()
+    dispatch = ProtocolManagerDispatcher(protocol_manager)
+
+    dispatch(JiraEvent("jira:issue_updated", "TM-2", "Sub-task", parent_key="TM-1"))
+
+    protocol_manager.manage_subtasks_for_issue.assert_called_once_with("TM-1")
+    protocol_manager.manage_single_issue.assert_not_called()
+
+
+def test_status_transitions_are_handled():
+    event = parse_webhook_payload(
+        {
+            **payload("TM-3", "Trial"),
+            "changelog": {"items": [{"field": "status", "fromString": "Waiting", "toString": "In Progress"}]},
+        }
+    )
+
+    assert event == JiraEvent("jira:issue_updated", "TM-3", "Trial")
+
+
+def test_each_event_starts_with_an_empty_identity_map_and_no_failures():
+    protocol_manager = make_protocol_manager()
+    protocol_manager.failures.append("TM-9")
+    protocol_manager.manage_single_epic.side_effect = lambda epic: protocol_manager.failures.append("TM-1")
+    dispatch = ProtocolManagerDispatcher(protocol_manager)
+
+    dispatch(JiraEvent("jira:issue_updated", "TM-1", "Epic"))
+    dispatch(JiraEvent("jira:issue_updated", "TM-1", "Epic"))
+
+    assert protocol_manager.trias_jira.identity_map.clear.call_count == 2
+    assert protocol_manager.failures == ["TM-1"]
@@ -0,0 +1,77 @@
+import datetime
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from jira_bot.lib.core import protocol_manager
+from jira_bot.lib.core.protocol_manager import ProtocolManager
+from jira_bot.lib.query.fingerprint import FingerprintIndex, canonical_value, content_fingerprint
+from jira_bot.lib.tools.comparator import FieldChange
+
+ISSUE = {
+    "issue_id": "10001",
+    "issue_key": "TM-1",
+    "created": datetime.datetime(2024, 5, 1, 10, 30),
+    "watch_count": 2,
+    "labels": ["b", "a"],
+    "summary": "Trial 1",
+}
+
+
+def test_canonical_value_follows_the_column_type():
+    assert canonical_value("2024-05-01 10:30:00", "TIMESTAMP") == "2024-05-01 10:30:00"
+    assert canonical_value(datetime.date(2024, 5, 1), "DATE") == "2024-05-01 00:00:00"
+    assert canonical_value("2", "INTEGER") == 2
+    assert canonical_value(2.0, "NUMERIC") == 2
+    assert canonical_value(np.array(["b", "a"]), "TEXT[]") == ["a", "b"]
+    assert canonical_value(float("nan"), "TEXT") is None
+
+
+def test_fingerprint_ignores_representation_differences():
+    stored = {**ISSUE, "created": "2024-05-01 10:30:00", "watch_count": "2", "labels": ["a", "b"]}
+
+    assert content_fingerprint("issues", stored) == content_fingerprint("issues", ISSUE)
+
+
+def test_fingerprint_changes_with_a_tracked_field():
+    assert content_fingerprint("issues", {**ISSUE, "summary": "Trial 2"}) != content_fingerprint("issues", ISSUE)
+    assert content_fingerprint("issues", {**ISSUE, "not_tracked": 1}) == content_fingerprint("issues", ISSUE)
+
+
+def test_index_reports_unchanged_unknown_and_remembered_records():
+    index = FingerprintIndex(fingerprints={"issues": {"10001": content_fingerprint("issues", ISSUE)}})
+    changed = {**ISSUE, "summary": "Trial 2"}
+
+    assert index.changes("issues", ISSUE) == {}
+    assert index.changes("issues", changed) is None
+    assert index.changes("issues", {**ISSUE, "issue_id": "10002"}) is None
+
+    index.remember("issues", changed)
+    assert index.changes("issues", changed) == {}
+
+
+def make_protocol_manager(monkeypatch, written: bool) -> ProtocolManager:
+    monkeypatch.setattr(protocol_manager, "upsert_records", MagicMock(return_value=written))
+    monkeypatch.setattr(protocol_manager, "update_records", MagicMock(return_value=written))
+    return ProtocolManager(
+        MagicMock(), MagicMock(), MagicMock(), MagicMock(), MagicMock(), fingerprints=FingerprintIndex()
+    )
+
+
+def test_written_records_are_remembered(monkeypatch):
+    manager = make_protocol_manager(monkeypatch, written=True)
+    changed = {**ISSUE, "issue_id": "10002", "summary": "Trial 2"}
+
+    assert manager.write_changes("issues", [(ISSUE, None), (changed, {"summary": FieldChange("Trial", "Trial 2")})])
+
+    assert manager.fingerprints.changes("issues", ISSUE) == {}
+    assert manager.fingerprints.changes("issues", changed) == {}
+
+
+def test_records_of_a_failed_write_are_reported_and_not_remembered(monkeypatch):
+    manager = make_protocol_manager(monkeypatch, written=False)
+
+    assert not manager.write_changes("issues", [(ISSUE, None)])
+
+    assert manager.fingerprints.changes("issues", ISSUE) is None
+    assert manager.failures == ["10001"]
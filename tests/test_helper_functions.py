@@ -0,0 +1,49 @@
+from types import SimpleNamespace
+
+from jira_bot.lib.tools.helper_functions import BulkCreateResult, create_jira_tickets
+
+
+class BulkCreateJira:
+    """create_issues failing whole chunks or single tickets by summary."""
+
+    def __init__(self, failing_chunks: int = 0, failing_summaries: tuple = ()):
+        self.failing_chunks = failing_chunks
+        self.failing_summaries = failing_summaries
+        self.chunks = []
+
+    def create_issues(self, field_list, prefetch=True):
+        self.chunks.append([fields["summary"] for fields in field_list])
+        if len(self.chunks) <= self.failing_chunks:
+            raise RuntimeError("502 Bad Gateway")
+        return [
+            {"status": "Error", "error": {"summary": "invalid"}, "issue": None, "input_fields": fields}
+            if fields["summary"] in self.failing_summaries
+            else {"status": "Success", "error": None, "issue": SimpleNamespace(key=f"TM-{fields['summary']}")}
+            for fields in field_list
+        ]
+
+
+def trias_jira(jira: BulkCreateJira) -> SimpleNamespace:
+    return SimpleNamespace(jira_connection=jira)
+
+
+def test_failed_chunk_reports_its_error_for_every_ticket():
+    jira = BulkCreateJira(failing_chunks=1)
+
+    results = create_jira_tickets(trias_jira(jira), [{"summary": str(number)} for number in range(3)], chunk_size=2)
+
+    assert jira.chunks == [["0", "1"], ["2"]]
+    assert results == [
+        BulkCreateResult(key=None, error="502 Bad Gateway"),
+        BulkCreateResult(key=None, error="502 Bad Gateway"),
+        BulkCreateResult(key="TM-2"),
+    ]
+
+
+def test_mixed_results_keep_the_order_of_the_field_list():
+    jira = BulkCreateJira(failing_summaries=("1",))
+
+    results = create_jira_tickets(trias_jira(jira), [{"summary": str(number)} for number in range(3)])
+
+    assert [result.key for result in results] == ["TM-0", None, "TM-2"]
+    assert results[1].error == str({"summary": "invalid"})
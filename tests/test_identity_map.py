@@ -0,0 +1,47 @@
+from jira_bot.lib.core.jira_connections import IssueIdentityMap
+
+
+def raw(key: str, **fields) -> dict:
+    return {"key": key, "fields": fields}
+
+
+def test_lookup_hits_only_when_all_requested_fields_are_loaded():
+    identity_map = IssueIdentityMap()
+    identity_map.store(raw("TM-1", summary="Trial", status="New"), ["summary", "status"])
+
+    assert identity_map.lookup("TM-1", ["summary"])["fields"]["summary"] == "Trial"
+    assert identity_map.lookup("TM-1", ["summary", "labels"]) is None
+    assert identity_map.lookup("TM-1") is None
+    assert identity_map.lookup("TM-2", ["summary"]) is None
+    assert identity_map.stats() == {"hits": 1, "misses": 3, "issues": 1}
+
+
+def test_payloads_of_other_projections_are_merged():
+    identity_map = IssueIdentityMap()
+    identity_map.store(raw("TM-1", summary="Trial"), ["summary"])
+    identity_map.store(raw("TM-1", labels=["a"]), ["labels"])
+
+    assert identity_map.lookup("TM-1", ["summary", "labels"])["fields"] == {"summary": "Trial", "labels": ["a"]}
+
+
+def test_fully_loaded_issue_answers_any_projection():
+    identity_map = IssueIdentityMap()
+    identity_map.store(raw("TM-1", summary="Trial"))
+
+    assert identity_map.lookup("TM-1", ["summary", "labels"]) is not None
+    assert identity_map.lookup("TM-1") is not None
+
+
+def test_patch_and_invalidate():
+    identity_map = IssueIdentityMap()
+    identity_map.store(raw("TM-1", description="old", status="New"), ["description", "status"])
+
+    identity_map.patch("TM-1", {"description": "new"})
+    assert identity_map.lookup("TM-1", ["description"])["fields"]["description"] == "new"
+
+    identity_map.invalidate("TM-1", ["status"])
+    assert identity_map.lookup("TM-1", ["status"]) is None
+    assert identity_map.lookup("TM-1", ["description"]) is not None
+
+    identity_map.invalidate("TM-1")
+    assert identity_map.lookup("TM-1", ["description"]) is None
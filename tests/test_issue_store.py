@@ -0,0 +1,21 @@
+from datetime import datetime as dt
+
+from jira_bot.lib.query.issue_store import delta_jql, jira_wall_time, sync_scope
+
+
+def test_delta_jql_keeps_order_by_at_the_end():
+    jql = "project = TEST AND issuetype = Epic ORDER BY key ASC"
+
+    delta = delta_jql(jql, dt(2024, 5, 1, 10, 30))
+
+    assert delta == '(project = TEST AND issuetype = Epic) AND updated >= "2024/05/01 10:30" ORDER BY key ASC'
+
+
+def test_jira_wall_time_drops_the_timezone():
+    assert jira_wall_time("2024-05-01T10:30:15.000+0200") == dt(2024, 5, 1, 10, 30, 15)
+    assert jira_wall_time(None) is None
+
+
+def test_sync_scope_depends_on_query_and_fields():
+    assert sync_scope("project = TEST", ["summary"]) == sync_scope("project = TEST", ["summary"])
+    assert sync_scope("project = TEST", ["summary"]) != sync_scope("project = TEST", ["status"])
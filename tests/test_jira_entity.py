@@ -0,0 +1,153 @@
+from dataclasses import fields
+
+import jira.resources as jira_resources
+import pytest
+
+from jira_bot.lib.core.jira_connections import (
+    EPIC_JIRA_FIELDS,
+    ISSUE_JIRA_FIELDS,
+    SUBTASK_JIRA_FIELDS,
+    JiraEpic,
+    JiraIssue,
+    JiraSubTask,
+    parse_description_table,
+)
+from jira_bot.lib.core.jira_records import EpicRecord, IssueRecord, SubTaskRecord
+from jira_bot.lib.tools.constants import (
+    CUSTOM_FIELD_MAPPING,
+    EPIC_FIELDS,
+    ISSUE_FIELDS,
+    PROPERTY_JIRA_FIELDS,
+    SUBTASK_FIELDS,
+)
+
+DESCRIPTION = "||uuid||last_updated||\n|protocol-1|2024-05-01 10:00:00|"
+
+
+def make_epic(description: str = DESCRIPTION) -> JiraEpic:
+    raw = {"id": "1", "key": "TEST-1", "fields": {"description": description, "summary": "Epic"}}
+    return JiraEpic(jira_resources.Issue(options={"server": "http://jira"}, session=None, raw=raw))
+
+
+def test_parse_description_table():
+    assert parse_description_table(DESCRIPTION) == {"uuid": "protocol-1", "last_updated": "2024-05-01 10:00:00"}
+
+
+def test_description_is_parsed_once_per_payload():
+    epic = make_epic()
+    assert epic.protocol_uuid == "protocol-1"
+    epic.issue.raw["fields"]["description"] = "||uuid||\n|protocol-2|"
+    assert epic.protocol_uuid == "protocol-1"
+
+    epic.refresh(make_epic("||uuid||\n|protocol-2|").issue)
+    assert epic.protocol_uuid == "protocol-2"
+
+
+def test_entity_can_be_rebuilt_from_its_fields():
+    # prefect rebuilds dataclass task arguments from their fields
+    epic = make_epic()
+    assert epic.protocol_uuid == "protocol-1"
+
+    copy = type(epic)(**{f.name: getattr(epic, f.name) for f in fields(epic)})
+
+    assert copy.issue is epic.issue
+    assert copy.protocol_uuid == "protocol-1"
+
+
+# properties read from the id or key of the issue, which Jira always returns
+KEY_PROPERTIES = {"epic_id", "epic_key", "issue_id", "issue_key", "subtask_id", "subtask_key", "url_field"}
+
+STANDARD_FIELD_VALUES = {
+    "description": "||uuid||last_updated||file_uuid||\n|uuid-1|2024-05-01 10:00:00|file-1|",
+    "summary": "Summary",
+    "created": "2024-04-01T08:00:00.000+0000",
+    "updated": "2024-05-01T08:00:00.000+0000",
+    "labels": ["label"],
+    "status": {"id": "3", "name": "In Progress", "statusCategory": {"name": "In Progress"}},
+    "comment": {"total": 2, "comments": []},
+    "duedate": "2024-06-01",
+    "lastViewed": "2024-05-02T08:00:00.000+0000",
+    "watches": {"watchCount": 3},
+    "creator": {"emailAddress": "creator@trias"},
+    "assignee": {"emailAddress": "assignee@trias"},
+    "components": [{"self": "http://jira/rest/api/2/component/7", "id": "7", "name": "Component"}],
+    "subtasks": [{"id": "5", "key": "TEST-5"}],
+    "parent": {"key": "TEST-2"},
+    "issuetype": {"name": "Trial"},
+}
+
+
+def full_raw() -> dict:
+    """An issue with a value in every standard field the entities read and in every mapped custom field."""
+    values = dict(STANDARD_FIELD_VALUES)
+    for field_name in CUSTOM_FIELD_MAPPING:
+        field_id = custom_field_id(field_name)
+        values.setdefault(field_id, {"value": field_name, "emailAddress": f"{field_id}@trias"})
+    return {"id": "1", "key": "TEST-1", "fields": values}
+
+
+def custom_field_id(field_name: str) -> str:
+    field_id = CUSTOM_FIELD_MAPPING[field_name]
+    return f"customfield_{field_id}" if field_id.isdigit() else field_id
+
+
+def comparable(value):
+    # nested resources are compared by their attributes, they do not implement equality
+    return [getattr(item, "__dict__", item) for item in value] if isinstance(value, list) else value
+
+
+@pytest.mark.parametrize("properties", [EPIC_FIELDS, ISSUE_FIELDS, SUBTASK_FIELDS])
+def test_every_property_maps_to_jira_fields(properties):
+    assert set(properties) - KEY_PROPERTIES - set(PROPERTY_JIRA_FIELDS) == set()
+
+
+@pytest.mark.parametrize(
+    "entity_type, properties, projection",
+    [
+        (JiraEpic, EPIC_FIELDS + ["description", "epic_name"], EPIC_JIRA_FIELDS),
+        (JiraIssue, ISSUE_FIELDS + ["description"], ISSUE_JIRA_FIELDS),
+        (JiraSubTask, SUBTASK_FIELDS + ["description"], SUBTASK_JIRA_FIELDS),
+    ],
+)
+def test_projection_reads_the_same_values_as_all_fields(entity_type, properties, projection):
+    raw = full_raw()
+    projected_raw = {**raw, "fields": {name: value for name, value in raw["fields"].items() if name in projection}}
+    entity = entity_type(jira_resources.Issue(options={"server": "http://jira"}, session=None, raw=raw))
+    projected = entity_type(jira_resources.Issue(options={"server": "http://jira"}, session=None, raw=projected_raw))
+
+    for name in properties:
+        assert getattr(entity, name) is not None, name
+        assert comparable(getattr(projected, name)) == comparable(getattr(entity, name)), name
+
+
+def readable(value):
+    # components are jira resources on entities and ComponentRecords on records, both read by name
+    return [str(item) for item in value] if isinstance(value, list) else value
+
+
+@pytest.mark.parametrize(
+    "entity_type, record_type, properties, projection",
+    [
+        (JiraEpic, EpicRecord, EPIC_FIELDS + ["description", "epic_name"], EPIC_JIRA_FIELDS),
+        (JiraIssue, IssueRecord, ISSUE_FIELDS + ["description"], ISSUE_JIRA_FIELDS),
+        (JiraSubTask, SubTaskRecord, SUBTASK_FIELDS + ["description"], SUBTASK_JIRA_FIELDS),
+    ],
+)
+def test_records_read_the_same_values_as_entities(entity_type, record_type, properties, projection):
+    raw = full_raw()
+    raw = {**raw, "fields": {name: value for name, value in raw["fields"].items() if name in projection}}
+    entity = entity_type(jira_resources.Issue(options={"server": "http://jira"}, session=None, raw=raw))
+    record = record_type.from_raw(raw)
+
+    for name in properties:
+        assert readable(getattr(record, name)) == readable(getattr(entity, name)), name
+
+
+def test_record_components_are_read_like_jira_components():
+    raw = full_raw()
+    epic = JiraEpic(jira_resources.Issue(options={"server": "http://jira"}, session=None, raw=raw))
+    record = EpicRecord.from_raw(raw)
+
+    assert [(component.id, component.name) for component in record.components] == [
+        (component.id, component.name) for component in epic.components
+    ]
@@ -0,0 +1,248 @@
+import json
+import re
+import time
+from types import SimpleNamespace
+
+import jira.resources as jira_resources
+import pytest
+import requests
+from jira.client import ResultList
+
+from jira_bot.lib.core import jira_connections
+from jira_bot.lib.core.jira_connections import JiraEpic, TriasHierarchy, chunk_keys_for_jql
+from jira_bot.lib.core.jira_records import iter_raw_issues
+from jira_bot.lib.tools.constants import CUSTOM_FIELD_MAPPING, MAX_JQL_LENGTH
+
+EPIC_LINK = f"customfield_{CUSTOM_FIELD_MAPPING['Epic Link']}"
+
+
+class FakeJira:
+    """search_issues over an in-memory list of raw issues, matching on the keys quoted in the JQL."""
+
+    def __init__(self, issues: list):
+        self._options = {"server": "http://jira"}
+        self._session = requests.Session()
+        self.issues = issues
+        self.searches = []
+
+    def matches(self, jql: str) -> list:
+        keys = set(re.findall(r'"([A-Z]+-\d+)"', jql))
+        if jql.startswith('"Epic Link"'):
+            return [raw for raw in self.issues if raw["fields"].get(EPIC_LINK) in keys]
+        if jql.startswith('"parent"'):
+            return [raw for raw in self.issues if raw["fields"].get("parent", {}).get("key") in keys]
+        return self.issues
+
+    def search_issues(self, jql, startAt=0, maxResults=50, fields=None, use_post=False):
+        self.searches.append((jql, startAt))
+        issues = self.matches(jql)
+        page = issues[startAt : startAt + maxResults]
+        return ResultList(
+            [jira_resources.Issue(self._options, self._session, raw) for raw in page], startAt, maxResults, len(issues)
+        )
+
+
+def issue(key: str, epic_key: str) -> dict:
+    return {"id": key, "key": key, "fields": {EPIC_LINK: epic_key}}
+
+
+def subtask(key: str, issue_key: str) -> dict:
+    return {"id": key, "key": key, "fields": {"parent": {"key": issue_key}}}
+
+
+def epic(key: str) -> JiraEpic:
+    return JiraEpic(jira_resources.Issue({"server": "http://jira"}, None, {"id": key, "key": key, "fields": {}}))
+
+
+@pytest.fixture
+def connect(monkeypatch):
+    def connect(issues: list) -> jira_connections.TriasJira:
+        monkeypatch.setattr(jira_connections, "JIRA", lambda **kwargs: FakeJira(issues))
+        return jira_connections.TriasJira("http://jira", "token", 1)
+
+    return connect
+
+
+def test_chunks_stay_under_the_length_and_cover_every_key():
+    keys = [f"TM-{number}" for number in range(1, 50)]
+
+    clauses = list(chunk_keys_for_jql("parent", keys, max_length=100))
+
+    assert len(clauses) > 1
+    assert all(len(clause) <= 100 for clause in clauses)
+    assert [key for clause in clauses for key in re.findall(r'"(TM-\d+)"', clause)] == keys
+
+
+def test_a_chunk_is_split_only_when_the_next_key_does_not_fit():
+    clause = '"parent" in ("TM-1", "TM-2")'
+
+    assert list(chunk_keys_for_jql("parent", ["TM-1", "TM-2"], max_length=len(clause))) == [clause]
+    assert list(chunk_keys_for_jql("parent", ["TM-1", "TM-2"], max_length=len(clause) - 1)) == [
+        '"parent" in ("TM-1")',
+        '"parent" in ("TM-2")',
+    ]
+    assert list(chunk_keys_for_jql("parent", [])) == []
+    assert len(list(chunk_keys_for_jql("parent", [f"TM-{n}" for n in range(100)], MAX_JQL_LENGTH))) == 1
+
+
+def test_prefetch_groups_issues_under_epics_and_subtasks_under_issues(connect):
+    trias_jira = connect(
+        [
+            issue("TM-11", "TM-1"),
+            issue("TM-12", "TM-1"),
+            issue("TM-21", "TM-2"),
+            subtask("TM-111", "TM-11"),
+            subtask("TM-112", "TM-11"),
+            subtask("TM-211", "TM-21"),
+        ]
+    )
+
+    hierarchy = TriasHierarchy(trias_jira, max_jql_length=30).prefetch([epic("TM-1"), epic("TM-2"), epic("TM-3")])
+
+    assert [issue.issue_key for issue in hierarchy.issues_for_epic("TM-1")] == ["TM-11", "TM-12"]
+    assert [issue.issue_key for issue in hierarchy.issues_for_epic("TM-2")] == ["TM-21"]
+    assert hierarchy.issues_for_epic("TM-3") == []
+    assert [subtask.subtask_key for subtask in hierarchy.subtasks_for_issue("TM-11")] == ["TM-111", "TM-112"]
+    assert hierarchy.subtasks_for_issue("TM-12") == []
+    assert hierarchy.subtasks_for_issue("TM-99") is None
+    # one epic key per 30 character chunk, but two issue keys fit into one; one page each
+    assert trias_jira.jira_connection.searches == [
+        ('"Epic Link" in ("TM-1")', 0),
+        ('"Epic Link" in ("TM-2")', 0),
+        ('"Epic Link" in ("TM-3")', 0),
+        ('"parent" in ("TM-11", "TM-12")', 0),
+        ('"parent" in ("TM-21")', 0),
+    ]
+
+
+class ChangingJira(FakeJira):
+    """FakeJira whose results change after the first page was served."""
+
+    def __init__(self, issues: list, after_first_page: list, report_total: bool = True):
+        super().__init__(issues)
+        self.after_first_page = after_first_page
+        self.report_total = report_total
+
+    def search_issues(self, jql, startAt=0, maxResults=50, fields=None, use_post=False):
+        page = super().search_issues(jql, startAt, maxResults, fields, use_post)
+        if startAt == 0:
+            self.issues = self.after_first_page
+        return page if self.report_total else ResultList(page, startAt, maxResults)
+
+
+def keys(issues) -> list:
+    return [issue.key for issue in issues]
+
+
+def raw_issues(count: int) -> list:
+    return [issue(f"TM-{number}", "TM-0") for number in range(1, count + 1)]
+
+
+@pytest.mark.parametrize("prefetch", [True, False])
+def test_paginate_search_stops_when_the_total_shrinks(connect, prefetch):
+    trias_jira = connect([])
+    trias_jira.jira_connection = ChangingJira(raw_issues(5), raw_issues(3))
+
+    issues = list(trias_jira.paginate_search("project = TM", page_size=2, prefetch=prefetch))
+
+    assert keys(issues) == ["TM-1", "TM-2", "TM-3"]
+    assert [start_at for _, start_at in trias_jira.jira_connection.searches] == [0, 2]
+
+
+def test_paginate_search_follows_a_growing_total(connect):
+    trias_jira = connect([])
+    trias_jira.jira_connection = ChangingJira(raw_issues(3), raw_issues(5))
+
+    assert keys(trias_jira.paginate_search("project = TM", page_size=2)) == ["TM-1", "TM-2", "TM-3", "TM-4", "TM-5"]
+
+
+def test_paginate_search_pages_until_a_short_page_without_a_total(connect):
+    trias_jira = connect([])
+    trias_jira.jira_connection = ChangingJira(raw_issues(5), raw_issues(5), report_total=False)
+
+    assert keys(trias_jira.paginate_search("project = TM", page_size=2)) == ["TM-1", "TM-2", "TM-3", "TM-4", "TM-5"]
+    assert [start_at for _, start_at in trias_jira.jira_connection.searches] == [0, 2, 4]
+
+
+class SlowJira(FakeJira):
+    """FakeJira answering later pages first."""
+
+    def search_issues(self, jql, startAt=0, maxResults=50, fields=None, use_post=False):
+        time.sleep(0.05 / (startAt + 1))
+        return super().search_issues(jql, startAt, maxResults, fields, use_post)
+
+
+def test_search_concurrent_merges_the_pages_in_order(connect):
+    trias_jira = connect([])
+    trias_jira.jira_connection = SlowJira(raw_issues(7))
+
+    issues = trias_jira.search_concurrent("project = TM", page_size=2, max_workers=4)
+
+    assert keys(issues) == [f"TM-{number}" for number in range(1, 8)]
+    assert sorted(start_at for _, start_at in trias_jira.jira_connection.searches) == [0, 2, 4, 6]
+
+
+def test_search_concurrent_falls_back_to_paging_when_the_total_changes(connect):
+    trias_jira = connect([])
+    trias_jira.jira_connection = ChangingJira(raw_issues(5), raw_issues(6))
+
+    issues = trias_jira.search_concurrent("project = TM", page_size=2, max_workers=4)
+
+    assert keys(issues) == [f"TM-{number}" for number in range(1, 7)]
+
+
+def test_search_concurrent_falls_back_to_paging_without_a_total(connect):
+    trias_jira = connect([])
+    trias_jira.jira_connection = ChangingJira(raw_issues(5), raw_issues(5), report_total=False)
+
+    issues = trias_jira.search_concurrent("project = TM", page_size=2, max_workers=4)
+
+    assert keys(issues) == [f"TM-{number}" for number in range(1, 6)]
+    assert [start_at for _, start_at in trias_jira.jira_connection.searches] == [0, 0, 2, 4]
+
+
+class RawJira(FakeJira):
+    """FakeJira answering with the raw JSON of the search response, optionally without its total."""
+
+    def __init__(self, issues: list, report_total: bool = True):
+        super().__init__(issues)
+        self.report_total = report_total
+
+    def search_issues(self, jql, startAt=0, maxResults=50, fields=None, json_result=False, use_post=False):
+        self.searches.append((jql, startAt))
+        page = {"startAt": startAt, "maxResults": maxResults, "issues": self.issues[startAt : startAt + maxResults]}
+        if self.report_total:
+            page["total"] = len(self.issues)
+        return page
+
+
+@pytest.mark.parametrize("report_total", [True, False])
+def test_raw_search_pages_like_paginate_search(connect, report_total):
+    trias_jira = connect([])
+    trias_jira.jira_connection = RawJira(raw_issues(5), report_total)
+
+    issues = list(iter_raw_issues(trias_jira, "project = TM", page_size=2))
+
+    assert [raw["key"] for raw in issues] == [f"TM-{number}" for number in range(1, 6)]
+    assert [start_at for _, start_at in trias_jira.jira_connection.searches] == [0, 2, 4]
+
+
+def test_raw_search_without_a_total_stops_at_an_empty_page(connect):
+    trias_jira = connect([])
+    trias_jira.jira_connection = RawJira(raw_issues(4), report_total=False)
+
+    assert len(list(iter_raw_issues(trias_jira, "project = TM", page_size=2))) == 4
+    assert [start_at for _, start_at in trias_jira.jira_connection.searches] == [0, 2, 4]
+
+
+def test_issue_fields_are_updated_with_a_single_put(connect, monkeypatch):
+    trias_jira = connect([])
+    requests_sent = []
+    monkeypatch.setattr(
+        trias_jira.jira_connection._session, "put", lambda url, data: requests_sent.append((url, json.loads(data)))
+    )
+    trias_jira.jira_connection._get_url = lambda path: f"http://jira/rest/api/2/{path}"
+
+    trias_jira.update_issue_fields("TM-1", {"labels": ["a"]})
+
+    assert requests_sent == [("http://jira/rest/api/2/issue/TM-1", {"fields": {"labels": ["a"]}})]
@@ -0,0 +1,116 @@
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+pytest.importorskip("prefect")
+
+from prefect import flow  # noqa: E402
+from prefect.testing.utilities import prefect_test_harness  # noqa: E402
+from prefect.utilities.annotations import quote  # noqa: E402
+
+from jira_bot import tasks  # noqa: E402
+from jira_bot.lib.core import jira_connections  # noqa: E402
+from jira_bot.lib.core.protocol_manager import ProtocolManager  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def prefect_api():
+    with prefect_test_harness():
+        yield
+
+
+@pytest.fixture
+def trias_jira(monkeypatch) -> jira_connections.TriasJira:
+    connections = []
+
+    def connect(**kwargs):
+        search_users = lambda user: [SimpleNamespace(key=f"key-{user}", name=user)]  # noqa: E731
+        connections.append(SimpleNamespace(_session=requests.Session(), search_users=search_users))
+        return connections[-1]
+
+    monkeypatch.setattr(jira_connections, "JIRA", connect)
+    trias_jira = jira_connections.TriasJira("http://jira", "token", 1)
+    trias_jira.connections = connections
+    return trias_jira
+
+
+def test_quoted_client_is_shared_with_the_task(prefect_api, trias_jira):
+    results = []
+
+    # results are kept out of the flow's return value, prefect rebuilds dataclasses it returns as well
+    @flow
+    def run():
+        results.append(tasks.initialize_trias_epics(quote(trias_jira)))
+
+    run()
+
+    assert results[0].trias_jira is trias_jira
+    assert len(trias_jira.connections) == 1
+
+
+def test_users_resolved_by_a_task_are_cached_for_the_run(prefect_api, trias_jira):
+    epics = [
+        SimpleNamespace(assignee_email="a@trias", requestor_email="b@trias", trial_engineer_email=None),
+        SimpleNamespace(assignee_email="a@trias", requestor_email=None, trial_engineer_email=None),
+    ]
+
+    @flow
+    def run():
+        tasks.resolve_jira_users(quote(trias_jira), quote(epics))
+
+    run()
+
+    assert trias_jira.user_directory.stats()["entries"] == 2
+
+
+def test_client_passed_without_quote_can_be_rebuilt(prefect_api, trias_jira):
+    results = []
+
+    @flow
+    def run():
+        results.append(tasks.initialize_trias_epics(trias_jira))
+
+    run()
+
+    assert results[0].trias_jira.server_url == trias_jira.server_url
+
+
+def test_issue_task_loads_the_issue_by_key(prefect_api, trias_jira, monkeypatch):
+    managed = []
+    issue = SimpleNamespace(issue_key="TM-1")
+    trias_issues = SimpleNamespace(get_issue_by_key={"TM-1": issue}.get)
+    monkeypatch.setattr(ProtocolManager, "manage_single_issue", lambda self, issue: managed.append(issue))
+    results = []
+
+    @flow
+    def run():
+        for issue_key in ["TM-1", "TM-2"]:
+            results.append(tasks.manage_issue(quote(trias_jira), None, quote(trias_issues), None, None, issue_key))
+
+    run()
+
+    assert results == [True, False]
+    assert managed[0] is issue
+
+
+def test_concurrent_epic_task_returns_the_keys_not_reconciled(prefect_api, trias_jira, monkeypatch):
+    def manage_single_epic(self, epic):
+        if epic.epic_key == "TM-2":
+            self.failures.append(epic.epic_key)
+
+    monkeypatch.setattr(ProtocolManager, "manage_single_epic", manage_single_epic)
+    epics = [SimpleNamespace(epic_key=f"TM-{i}") for i in range(4)]
+    results = []
+
+    @flow
+    def run():
+        results.append(
+            tasks.manage_epics_concurrently(
+                quote(trias_jira), None, None, None, None, quote(epics), None, max_concurrency=2
+            )
+        )
+
+    run()
+
+    assert results == [["TM-2"]]
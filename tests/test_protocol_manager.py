@@ -0,0 +1,152 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pandas as pd
+
+from jira_bot.lib.core import protocol_manager as protocol_manager_module
+from jira_bot.lib.core.protocol_manager import ProtocolManager
+
+
+def make_protocol_manager(failed_keys: list) -> ProtocolManager:
+    trias_jira = SimpleNamespace(write_buffer=MagicMock(**{"flush.return_value": failed_keys}))
+    return ProtocolManager(trias_jira, MagicMock(), MagicMock(), MagicMock(), MagicMock())
+
+
+def test_errors_of_an_epic_are_reported():
+    protocol_manager = make_protocol_manager([])
+    protocol_manager.is_valid_epic_name = MagicMock(side_effect=RuntimeError("boom"))
+
+    protocol_manager.manage_single_epic(SimpleNamespace(epic_key="TM-1", protocol_id="P-1"))
+
+    assert protocol_manager.failures == ["TM-1"]
+
+
+def test_tickets_not_updated_in_jira_are_reported():
+    protocol_manager = make_protocol_manager(["TM-2"])
+
+    assert not protocol_manager.flush_ticket("TM-2")
+
+    assert protocol_manager.failures == ["TM-2"]
+
+
+def test_staged_updates_that_fail_after_an_epic_are_reported():
+    protocol_manager = make_protocol_manager(["TM-2"])
+
+    protocol_manager.manage_single_epic(SimpleNamespace(epic_key="TM-1", protocol_id="not a protocol"))
+
+    assert protocol_manager.failures == ["TM-2"]
+
+
+def test_epics_are_reconciled_concurrently_up_to_the_limit():
+    protocol_manager = make_protocol_manager([])
+    running, peak, lock = [0], [0], threading.Lock()
+
+    def manage_single_epic(epic):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+        if epic.epic_key == "TM-3":
+            protocol_manager.failures.append(epic.epic_key)
+
+    protocol_manager.manage_single_epic = manage_single_epic
+    epics = [SimpleNamespace(epic_key=f"TM-{i}") for i in range(6)]
+
+    asyncio.run(protocol_manager.manage_epics_concurrently(epics, max_concurrency=2))
+
+    assert peak[0] == 2
+    assert protocol_manager.failures == ["TM-3"]
+
+
+def test_changes_of_an_existing_epic_are_computed_once(monkeypatch):
+    monkeypatch.setattr(protocol_manager_module, "fetch_one", lambda *args: {"epic_id": 1})
+    protocol_manager = make_protocol_manager([])
+    protocol_manager.epic_changes = MagicMock(return_value={"summary": object()})
+    protocol_manager.is_protocol_updated = MagicMock(return_value=True)
+    protocol_manager.update_epic_ticket_def = MagicMock()
+
+    protocol_manager.handle_existing_protocol(SimpleNamespace(epic_key="TM-1", epic_id=1))
+
+    protocol_manager.epic_changes.assert_called_once()
+    protocol_manager.update_epic_ticket_def.assert_called_once()
+
+
+def test_subtasks_of_a_missing_issue_are_reported():
+    protocol_manager = make_protocol_manager([])
+    protocol_manager.trias_issues.get_issue_by_key.return_value = None
+
+    protocol_manager.manage_subtasks_for_issue("TM-4")
+
+    assert protocol_manager.failures == ["TM-4"]
+
+
+def test_errors_of_the_subtasks_of_an_issue_are_reported():
+    protocol_manager = make_protocol_manager([])
+    protocol_manager.handle_existing_issue = MagicMock()
+    protocol_manager.get_trial = MagicMock(side_effect=[object(), RuntimeError("boom")])
+    issue = SimpleNamespace(issue_key="TM-5", trial_id="T-1", epic_link=None)
+    protocol_manager.trias_issues.get_issue_by_key.return_value = issue
+
+    protocol_manager.manage_single_issue(issue, epic=SimpleNamespace(epic_key="TM-1"))
+
+    protocol_manager.handle_existing_issue.assert_called_once()
+    assert protocol_manager.failures == ["TM-5"]
+
+
+def bulk_create(failing_summaries: tuple) -> MagicMock:
+    return MagicMock(
+        side_effect=lambda field_list, prefetch=True: [
+            {"status": "Error", "error": "invalid", "issue": None}
+            if fields["summary"] in failing_summaries
+            else {"status": "Success", "error": None, "issue": SimpleNamespace(key=f"TM-{fields['summary']}")}
+            for fields in field_list
+        ]
+    )
+
+
+def make_creating_protocol_manager(monkeypatch, failing_summaries: tuple) -> ProtocolManager:
+    monkeypatch.setattr(protocol_manager_module, "JiraTransitionManager", MagicMock())
+    protocol_manager = make_protocol_manager([])
+    protocol_manager.trias_jira.jira_connection = MagicMock(create_issues=bulk_create(failing_summaries))
+    protocol_manager.trias_jira.user_directory = MagicMock()
+    protocol_manager.trias_jira.project_id = 1
+    protocol_manager.trias_jira.get_issue = MagicMock(
+        return_value=SimpleNamespace(fields=SimpleNamespace(labels=[], assignee=None, summary="P"))
+    )
+    protocol_manager.trias_issues.get_issue_by_key.side_effect = lambda key: SimpleNamespace(issue_key=key)
+    return protocol_manager
+
+
+def test_new_issues_map_the_bulk_results_back_to_their_trials(monkeypatch):
+    protocol_manager = make_creating_protocol_manager(monkeypatch, failing_summaries=("b",))
+    protocol_manager.build_trial_ticket_fields = lambda epic, trial, assignee: {"summary": trial.name}
+    protocol_manager.attach_images_or_maps = MagicMock()
+    protocol_manager.upsert_issues = MagicMock()
+    trials = [SimpleNamespace(name=name) for name in "abc"]
+
+    protocol_manager.create_new_issues(SimpleNamespace(epic_key="TM-1", assignee_email=None), trials)
+
+    protocol_manager.trias_jira.jira_connection.add_issues_to_epic.assert_called_once_with("TM-1", ["TM-a", "TM-c"])
+    assert [call.args for call in protocol_manager.attach_images_or_maps.call_args_list] == [
+        ("TM-a", trials[0]),
+        ("TM-c", trials[2]),
+    ]
+    upserted = protocol_manager.upsert_issues.call_args.args[0]
+    assert [issue.issue_key for issue in upserted] == ["TM-a", "TM-c"]
+    assert protocol_manager.failures == ["b"]
+
+
+def test_new_subtasks_map_the_bulk_results_back_to_their_files(monkeypatch):
+    monkeypatch.setattr(protocol_manager_module, "create_jira_description", lambda *args, **kwargs: "")
+    protocol_manager = make_creating_protocol_manager(monkeypatch, failing_summaries=("P_yield",))
+    rows = [pd.Series({"type": file_type, "file_uuid": f"{file_type}-1"}) for file_type in ("map", "yield", "soil")]
+
+    assert protocol_manager.create_subtasks_in_jira("TM-2", rows) == ["TM-P_map", None, "TM-P_soil"]
+
+    protocol_manager.trias_jira.jira_connection.create_issues.assert_called_once()
+    assert protocol_manager.failures == ["TM-2"]
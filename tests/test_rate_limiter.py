@@ -0,0 +1,95 @@
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+
+from jira_bot.lib.core.rate_limiter import GovernedHTTPAdapter, RequestGovernor, TokenBucket, parse_retry_after
+
+
+def response(status_code: int, headers: dict = None) -> MagicMock:
+    return MagicMock(status_code=status_code, headers=headers or {})
+
+
+@pytest.fixture
+def governor() -> RequestGovernor:
+    return RequestGovernor(rate=100, max_rate=200, concurrency=8, backoff_base=0, backoff_max=0)
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("2.5") == 2.5
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_token_bucket_drain_empties_the_bucket():
+    bucket = TokenBucket(rate=1000, capacity=5)
+    assert bucket.acquire() == 0.0
+
+    bucket.drain()
+
+    assert bucket.acquire() > 0
+
+
+def test_throttled_response_halves_the_limits(governor):
+    governor.acquire()
+
+    retry_after = governor.release(429, {"Retry-After": "3"})
+
+    assert retry_after == 3.0
+    assert (governor.rate, governor.concurrency) == (50, 4)
+    assert governor.metrics()["in_flight"] == 0
+
+
+def test_successful_response_raises_the_limits(governor):
+    governor.acquire()
+
+    assert governor.release(200, {}) is None
+    assert governor.rate > 100
+    assert governor.concurrency > 8
+
+
+def test_rate_limit_headers_cap_the_rate(governor):
+    governor.acquire()
+    governor.release(200, {"X-RateLimit-FillRate": "20", "X-RateLimit-Interval-Seconds": "2"})
+
+    assert governor.rate == 10
+
+
+def test_send_retries_throttled_responses_and_closes_them(governor):
+    throttled, ok = response(429, {"Retry-After": "0"}), response(200)
+    send_request = MagicMock(side_effect=[throttled, ok])
+
+    assert governor.send(send_request) is ok
+    throttled.close.assert_called_once()
+    assert governor.metrics()["retries"] == 1
+
+
+def test_send_does_not_retry_requests_that_cannot_be_replayed(governor):
+    throttled = response(429)
+    send_request = MagicMock(return_value=throttled)
+
+    assert governor.send(send_request, retryable=False) is throttled
+    assert send_request.call_count == 1
+    assert governor.metrics()["failed"] == 1
+
+
+def test_send_gives_up_after_max_retries():
+    governor = RequestGovernor(max_retries=2, backoff_base=0, backoff_max=0)
+    send_request = MagicMock(return_value=response(503))
+
+    assert governor.send(send_request).status_code == 503
+    assert send_request.call_count == 3
+
+
+def test_adapter_only_replays_bodies_sent_from_memory(monkeypatch, governor):
+    sent = []
+    monkeypatch.setattr(HTTPAdapter, "send", lambda self, request, **kwargs: sent.append(request) or response(429))
+    adapter = GovernedHTTPAdapter(governor)
+
+    adapter.send(requests.Request("POST", "http://jira/rest/api/2/issue", data=iter([b"streamed"])).prepare())
+    assert len(sent) == 1
+
+    adapter.send(requests.Request("POST", "http://jira/rest/api/2/issue", json={"fields": {}}).prepare())
+    assert len(sent) == 2 + governor.max_retries
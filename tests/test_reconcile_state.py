@@ -0,0 +1,47 @@
+from datetime import datetime as dt
+from datetime import timezone
+from types import SimpleNamespace
+
+from jira_bot.lib.query.reconcile_state import ReconcilePlan, jira_updated
+
+LAST_RUN = dt(2024, 5, 1, 10, 0, tzinfo=timezone.utc)
+
+
+def ticket(updated: str = "2024-04-01T08:00:00.000+0000", **attributes) -> SimpleNamespace:
+    return SimpleNamespace(issue=SimpleNamespace(raw={"fields": {"updated": updated}}), **attributes)
+
+
+def incremental_plan() -> ReconcilePlan:
+    return ReconcilePlan(
+        full_sweep=False, started=LAST_RUN, jira_since=LAST_RUN, protocol_names={"P-1"}, trial_names={"T-1"}
+    )
+
+
+def test_jira_updated_parses_the_offset():
+    assert jira_updated(ticket("2024-05-01T12:00:00.000+0200")) == LAST_RUN
+    assert jira_updated(ticket(None)) is None
+
+
+def test_full_sweep_includes_every_ticket():
+    plan = ReconcilePlan(full_sweep=True, started=LAST_RUN)
+
+    assert plan.includes_epic(ticket(protocol_id="P-2"))
+    assert plan.includes_issue(ticket(summary="T-2", trial_id="T-2"))
+
+
+def test_epics_of_changed_protocols_or_updated_in_jira_are_included():
+    plan = incremental_plan()
+
+    assert plan.includes_epic(ticket(protocol_id="P-1"))
+    assert plan.includes_epic(ticket("2024-05-01T10:30:00.000+0000", protocol_id="P-2"))
+    assert not plan.includes_epic(ticket(protocol_id="P-2"))
+
+
+def test_issues_of_changed_trials_or_with_subtasks_updated_in_jira_are_included():
+    plan = incremental_plan()
+    unchanged = ticket(summary="T-2", trial_id="T-2")
+
+    assert plan.includes_issue(ticket(summary="T-1", trial_id="T-1"))
+    assert plan.includes_issue(ticket(summary="other", trial_id="T-1"))
+    assert plan.includes_issue(unchanged, [ticket("2024-05-01T10:30:00.000+0000")])
+    assert not plan.includes_issue(unchanged, [ticket()])
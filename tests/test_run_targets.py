@@ -0,0 +1,34 @@
+import pytest
+import sqlalchemy as sa
+
+from jira_bot.lib.query.run_targets import RunTargets
+
+
+@pytest.fixture
+def engine() -> sa.Engine:
+    engine = sa.create_engine("sqlite://")
+    with engine.begin() as con:
+        con.execute(sa.text("CREATE TABLE issues (issue_key TEXT, trial_uuid TEXT)"))
+        con.execute(sa.text("CREATE TABLE trial (uuid TEXT, protocol_uuid TEXT)"))
+        con.execute(sa.text("CREATE TABLE epics (epic_key TEXT, protocol_uuid TEXT)"))
+        con.execute(sa.text("INSERT INTO issues VALUES ('TM-11', 't-1')"))
+        con.execute(sa.text("INSERT INTO trial VALUES ('t-1', 'p-1'), ('t-2', 'p-2')"))
+        con.execute(sa.text("INSERT INTO epics VALUES ('TM-1', 'p-1'), ('TM-2', 'p-2')"))
+    return engine
+
+
+def test_empty_targets_are_false():
+    assert not RunTargets()
+    assert RunTargets(trial_uuids=["t-1"])
+
+
+def test_protocols_resolve_to_their_epics(engine):
+    targets = RunTargets(epic_keys=["TM-3"], protocol_uuids=["p-1", "p-unknown"]).resolve(engine)
+
+    assert targets == RunTargets(epic_keys=["TM-1", "TM-3"])
+
+
+def test_trials_resolve_to_their_issues_or_the_epic_of_their_protocol(engine):
+    targets = RunTargets(issue_keys=["TM-12"], trial_uuids=["t-1", "t-2", "t-unknown"]).resolve(engine)
+
+    assert targets == RunTargets(epic_keys=["TM-2"], issue_keys=["TM-11", "TM-12"])
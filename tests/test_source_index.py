@@ -0,0 +1,105 @@
+from unittest.mock import MagicMock
+
+import pandas as pd
+import pytest
+import sqlalchemy as sa
+
+from jira_bot.lib.core.protocol_manager import ProtocolManager
+from jira_bot.lib.query import database
+from jira_bot.lib.query.source_index import SourceIndex
+from jira_bot.lib.tools.constants import PROTOCOL_COLUMNS, TRIAL_COLUMNS
+
+UPLOADED_DATA_COLUMNS = ["uuid", "cropSeasonUuid", "type", "file_name"]
+
+
+def create_table(con, table_name: str, columns: list, rows: list) -> None:
+    column_list = ", ".join(f'"{column}" TEXT' for column in columns)
+    con.execute(sa.text(f"CREATE TABLE {table_name} ({column_list})"))
+    placeholders = ", ".join(f":c{index}" for index in range(len(columns)))
+    for row in rows:
+        values = {f"c{index}": row.get(column) for index, column in enumerate(columns)}
+        con.execute(sa.text(f"INSERT INTO {table_name} VALUES ({placeholders})"), values)
+
+
+def trial(uuid: str, name: str, **values) -> dict:
+    return {"uuid": uuid, "name": name, "protocol_uuid": "p-1", **values}
+
+
+@pytest.fixture
+def engine() -> sa.Engine:
+    # one connection, so the attached public schema of the field and farm tables stays visible
+    engine = sa.create_engine("sqlite://", poolclass=sa.pool.StaticPool)
+    with engine.begin() as con:
+        con.execute(sa.text("ATTACH DATABASE ':memory:' AS public"))
+        create_table(con, "protocol", PROTOCOL_COLUMNS, [{"uuid": "p-1", "name": "P-1", "crop": "wheat"}])
+        create_table(
+            con,
+            "trial",
+            TRIAL_COLUMNS,
+            [
+                trial("t-1", "T-1", crop_season_uuid="cs-1", field_uuid="f-1"),
+                # no uploaded data and a field missing from public.fields
+                trial("t-2", "T-2", crop_season_uuid="cs-2", field_uuid="f-9"),
+            ],
+        )
+        create_table(
+            con,
+            "uploaded_data",
+            UPLOADED_DATA_COLUMNS,
+            [
+                {"uuid": "u-1", "cropSeasonUuid": "cs-1", "type": "yield", "file_name": "yield.csv"},
+                {"uuid": "u-2", "cropSeasonUuid": "cs-1", "type": "soil", "file_name": "soil.csv"},
+            ],
+        )
+        create_table(
+            con, "public.fields", ["uuid", "name", "farmUuid"], [{"uuid": "f-1", "name": "F", "farmUuid": "a-1"}]
+        )
+        create_table(con, "public.farm", ["uuid", "name"], [{"uuid": "a-1", "name": "Farm"}])
+    return engine
+
+
+@pytest.fixture
+def managers(engine, monkeypatch):
+    # the per-epic queries must hit the database, not results cached by an earlier lookup
+    monkeypatch.setattr(database, "query_cache", None)
+    per_epic = ProtocolManager(MagicMock(), MagicMock(), MagicMock(), MagicMock(), engine)
+    # P-2 has an epic but no protocol row
+    source_index = SourceIndex.load(engine, ["P-1", "P-2"])
+    preloaded = ProtocolManager(MagicMock(), MagicMock(), MagicMock(), MagicMock(), engine, source_index=source_index)
+    return per_epic, preloaded
+
+
+def test_protocols_and_trials_match_the_per_epic_queries(managers):
+    per_epic, preloaded = managers
+
+    for name in ["P-1", "P-2"]:
+        assert preloaded.get_protocol(name) == per_epic.get_protocol(name)
+    assert preloaded.get_protocol("P-2") is None
+    assert preloaded.get_trials_for_protocol("p-1") == per_epic.get_trials_for_protocol("p-1")
+    assert [trial.name for trial in preloaded.get_trials_for_protocol("p-1")] == ["T-1", "T-2"]
+    for name in ["T-1", "T-2"]:
+        assert preloaded.get_trial(name) == per_epic.get_trial(name)
+
+
+def test_uploaded_data_matches_the_per_epic_queries(managers):
+    per_epic, preloaded = managers
+
+    pd.testing.assert_frame_equal(preloaded.get_uploaded_data("cs-1"), per_epic.get_uploaded_data("cs-1"))
+    # a trial without uploads is answered from the index with an empty frame, like the query returns
+    assert preloaded.source_index.has("uploaded_data", "cs-2")
+    assert preloaded.get_uploaded_data("cs-2").empty and per_epic.get_uploaded_data("cs-2").empty
+
+
+def test_farm_and_field_names_match_the_per_epic_queries(managers):
+    per_epic, preloaded = managers
+
+    for uuid, entity in [("f-1", "field"), ("a-1", "farm"), ("f-9", "field")]:
+        assert preloaded.get_farm_field_names(uuid, entity) == per_epic.get_farm_field_names(uuid, entity)
+    assert preloaded.get_farm_field_names("f-9", "field") == ("", "")
+
+
+def test_keys_outside_the_preload_fall_back_to_the_database(managers):
+    _, preloaded = managers
+
+    assert not preloaded.source_index.has("protocol", "P-3")
+    assert not preloaded.source_index.has("trial", "T-3")
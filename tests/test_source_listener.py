@@ -0,0 +1,52 @@
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from jira_bot.lib.core import source_listener
+from jira_bot.lib.core.jira_connections import IssueIdentityMap
+from jira_bot.lib.core.source_listener import SourceChangeBatcher, SourceChangeDispatcher, SourceChanges
+
+
+def notification(table: str, **keys) -> str:
+    return json.dumps({"table": table, **keys})
+
+
+def test_batcher_merges_notifications_and_releases_them_after_the_window():
+    batcher = SourceChangeBatcher(window=60)
+    batcher.add(notification("protocol", protocol_uuid="p-1"))
+    batcher.add(notification("trial", protocol_uuid="p-1", crop_season_uuid="c-1"))
+
+    assert not batcher.drain()
+    assert 0 < batcher.timeout() <= 60
+    assert batcher.drain(force=True) == SourceChanges({"protocol", "trial"}, {"p-1"}, {"c-1"})
+    assert batcher.timeout() is None
+
+
+def test_batcher_releases_a_batch_once_its_window_has_passed():
+    batcher = SourceChangeBatcher(window=0)
+    batcher.add(notification("uploaded_data", crop_season_uuid="c-1"))
+
+    assert batcher.drain() == SourceChanges({"uploaded_data"}, set(), {"c-1"})
+    assert not batcher.drain()
+
+
+def test_batcher_ignores_invalid_payloads():
+    batcher = SourceChangeBatcher(window=0)
+    batcher.add("not json")
+
+    assert batcher.timeout() is None
+    assert not batcher.drain(force=True)
+
+
+def test_dispatcher_forgets_the_tickets_loaded_for_an_earlier_batch(monkeypatch):
+    monkeypatch.setattr(source_listener, "fetch_all_by_keys", MagicMock(return_value=[]))
+    identity_map = IssueIdentityMap()
+    identity_map.store({"key": "TM-1", "fields": {"summary": "old"}})
+    protocol_manager = SimpleNamespace(
+        engine=MagicMock(), trias_jira=SimpleNamespace(identity_map=identity_map), failures=["TM-2"]
+    )
+
+    SourceChangeDispatcher(protocol_manager)(SourceChanges({"protocol"}, {"p-1"}))
+
+    assert identity_map.lookup("TM-1") is None
+    assert protocol_manager.failures == []
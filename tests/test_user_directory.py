@@ -0,0 +1,48 @@
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from jira_bot.lib.core.user_directory import UserDirectory
+
+
+def jira_connection() -> MagicMock:
+    connection = MagicMock()
+    connection.search_users.side_effect = lambda user: (
+        [SimpleNamespace(key=f"key-{user}", name=user)] if user.endswith("@trias") else []
+    )
+    return connection
+
+
+def test_users_and_unknown_emails_are_cached():
+    directory = UserDirectory(snapshot_path=None)
+    connection = jira_connection()
+
+    for _ in range(2):
+        assert directory.get(connection, "a@trias") == ("key-a@trias", "a@trias")
+        assert directory.get(connection, "nobody@elsewhere") is None
+
+    assert connection.search_users.call_count == 2
+    assert directory.stats() == {"hits": 2, "misses": 2, "entries": 2}
+
+
+def test_expired_entries_are_resolved_again():
+    directory = UserDirectory(negative_ttl=timedelta(0), snapshot_path=None)
+    connection = jira_connection()
+
+    directory.get(connection, "nobody@elsewhere")
+    directory.get(connection, "nobody@elsewhere")
+
+    assert connection.search_users.call_count == 2
+
+
+def test_snapshot_is_loaded_by_the_next_run(tmp_path):
+    snapshot_path = str(tmp_path / "users.json")
+    directory = UserDirectory(snapshot_path=snapshot_path)
+    directory.prefetch(jira_connection(), ["a@trias", "b@trias", None])
+    directory.save()
+
+    connection = jira_connection()
+    next_run = UserDirectory(snapshot_path=snapshot_path)
+
+    assert next_run.get(connection, "b@trias") == ("key-b@trias", "b@trias")
+    connection.search_users.assert_not_called()
@@ -0,0 +1,36 @@
+import pytest
+
+from jira_bot.lib.core.workflow import STANDARD_WORKFLOW, SUBTASK_WORKFLOW, WorkflowPlanner
+
+TRANSITIONS = {
+    "1": {"B": 11, "C": 12},
+    "2": {"C": 22},
+    "3": {"D": 31, "To be Done": 32},
+    "4": {},
+}
+STATUSES = {"A": "1", "B": "2", "C": "3", "D": "4"}
+
+
+def test_plan_takes_the_shortest_path():
+    planner = WorkflowPlanner(TRANSITIONS, STATUSES)
+
+    assert planner.plan("1", "D") == [(12, "3"), (31, "4")]
+    assert planner.plan("1", "Done") == [(12, "3"), (32, "Done")]
+
+
+def test_plan_is_empty_for_the_current_status():
+    assert WorkflowPlanner(TRANSITIONS, STATUSES).plan("2", "B") == []
+
+
+def test_plan_rejects_unknown_and_unreachable_statuses():
+    planner = WorkflowPlanner(TRANSITIONS, STATUSES)
+
+    with pytest.raises(ValueError, match="No transition defined"):
+        planner.plan("99", "D")
+    with pytest.raises(ValueError, match="No transition path"):
+        planner.plan("4", "A")
+
+
+def test_project_workflows():
+    assert STANDARD_WORKFLOW.plan("1", "In Execution") == [(211, "10549"), (271, "11920"), (281, "11921")]
+    assert SUBTASK_WORKFLOW.plan("1", "Done") == [(61, "3"), (21, "10820"), (51, "Done")]
@@ -0,0 +1,93 @@
+import threading
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import jira.resources as jira_resources
+import pytest
+
+from jira_bot.lib.core.jira_connections import IssueIdentityMap, JiraIssue, JiraWriteBuffer
+
+LOADED_UPDATED = "2024-05-01T10:00:00.000+0000"
+WRITTEN_UPDATED = "2024-05-02T08:30:00.000+0000"
+
+
+def to_issue(raw: dict) -> jira_resources.Issue:
+    return jira_resources.Issue(options={"server": "http://jira"}, session=None, raw=raw)
+
+
+@pytest.fixture
+def trias_jira() -> SimpleNamespace:
+    return SimpleNamespace(
+        to_issue=to_issue,
+        identity_map=IssueIdentityMap(),
+        update_issue_fields=MagicMock(),
+        search_by_keys=MagicMock(
+            side_effect=lambda keys, fields: [
+                to_issue({"key": key, "fields": {"updated": WRITTEN_UPDATED}}) for key in keys
+            ]
+        ),
+    )
+
+
+def make_issue() -> JiraIssue:
+    return JiraIssue(to_issue({"key": "TM-1", "fields": {"description": "old", "updated": LOADED_UPDATED}}))
+
+
+def test_stage_applies_the_fields_but_keeps_the_loaded_timestamp(trias_jira):
+    write_buffer = JiraWriteBuffer(trias_jira)
+    issue = make_issue()
+
+    write_buffer.stage(issue, {"description": "new"})
+
+    assert issue.description == "new"
+    assert issue.issue.raw["fields"]["updated"] == LOADED_UPDATED
+    trias_jira.update_issue_fields.assert_not_called()
+
+
+def test_flush_writes_once_and_reads_back_the_updated_timestamp(trias_jira):
+    write_buffer = JiraWriteBuffer(trias_jira)
+    issue = make_issue()
+    write_buffer.stage(issue, {"description": "new"})
+    write_buffer.stage(issue, {"labels": ["a"]})
+
+    assert write_buffer.flush(["TM-1"]) == []
+
+    trias_jira.update_issue_fields.assert_called_once_with("TM-1", {"description": "new", "labels": ["a"]})
+    trias_jira.search_by_keys.assert_called_once_with(["TM-1"], ["updated"])
+    assert issue.issue.raw["fields"]["updated"] == WRITTEN_UPDATED
+    assert issue.description == "new"
+
+
+def test_failed_write_restores_the_entity_and_is_reported(trias_jira):
+    trias_jira.update_issue_fields.side_effect = RuntimeError("400 Bad Request")
+    write_buffer = JiraWriteBuffer(trias_jira)
+    issue = make_issue()
+    write_buffer.stage(issue, {"description": "new"})
+
+    assert write_buffer.flush() == ["TM-1"]
+
+    assert issue.description == "old"
+    trias_jira.search_by_keys.assert_not_called()
+
+
+def test_unchanged_fields_are_not_staged(trias_jira):
+    write_buffer = JiraWriteBuffer(trias_jira)
+
+    write_buffer.stage(make_issue(), {"description": "old"})
+
+    assert write_buffer.flush() == []
+    trias_jira.update_issue_fields.assert_not_called()
+
+
+def test_flush_without_keys_only_writes_the_tickets_of_the_calling_thread(trias_jira):
+    write_buffer = JiraWriteBuffer(trias_jira)
+    issue = make_issue()
+    thread = threading.Thread(target=write_buffer.stage, args=(issue, {"description": "new"}))
+    thread.start()
+    thread.join()
+
+    assert write_buffer.flush() == []
+    trias_jira.update_issue_fields.assert_not_called()
+
+    assert write_buffer.flush(["TM-1"]) == []
+    trias_jira.update_issue_fields.assert_called_once()